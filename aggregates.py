@@ -0,0 +1,276 @@
+# ******************************************************************************
+# Copyright (c) 2025. All rights reserved.
+# # This work is licensed under the Creative Commons Attribution 4.0
+# International License. To view a copy of this license,
+# visit # http://creativecommons.org/licenses/by/4.0/.
+#
+# Author: roximn <roximn148@gmail.com>
+# ******************************************************************************
+from dataclasses import dataclass, field, replace
+import itertools
+import threading
+import time
+from typing import Iterable
+
+import numpy as np
+import pandas as pd
+
+from .batch import resultFrame
+from .charts import ChartWindow, chartWindow
+from .counting import CountResult
+from .paging import FramePager, TablePage
+from .properties import charProperty, propertyValues
+from .ucd import ucdTable
+
+# ******************************************************************************
+_builds = itertools.count(1)
+_buildsLock = threading.Lock()
+
+# Columns of the frames shown, in order. The names are not kept by the
+# aggregates, only resolved for the rows shown (see `namedRows`).
+FRAME_COLUMNS = ('char', 'count', 'code', 'unicode', 'category', 'block', 'script')
+NAME_COLUMNS = ('char', 'unicode')
+
+# ******************************************************************************
+@dataclass
+class CharAggregates:
+    """Everything the panels show about the characters, computed once per
+    result.
+
+    The frame is kept compact, as code points, counts and categorical
+    properties. The `char` and `unicode` names take more memory than all the
+    rest and are resolved for the rows shown, the sorts and the searches.
+
+    Parameters:
+        frame(DataFrame): The per character frame, by code point, unnamed.
+        order(ndarray): The rows of `frame`, most frequent first.
+        blocks(DataFrame): Counts by block, in the order of `BLOCKS`.
+        scripts(DataFrame): Counts by script, in name order.
+        categories(DataFrame): Counts by general category.
+        ecdf(ndarray): Normalized cumulative frequency, least frequent first.
+        ecdfCodes(ndarray): The code points of `ecdf`.
+        build(int): Serial number of the build, across all the sessions.
+        seconds(float): Time taken by the build.
+    """
+    frame: pd.DataFrame
+    order: np.ndarray
+    blocks: pd.DataFrame
+    scripts: pd.DataFrame
+    categories: pd.DataFrame
+    ecdf: np.ndarray
+    ecdfCodes: np.ndarray
+    build: int = 0
+    seconds: float = 0.0
+    pager: FramePager = field(init=False)
+    _windows: dict = field(init=False, default_factory=dict, repr=False)
+    # Property columns and counts by property, computed when first asked for
+    _columns: dict = field(init=False, default_factory=dict, repr=False)
+    _groups: dict = field(init=False, default_factory=dict, repr=False)
+
+    def __post_init__(self):
+        self.pager = FramePager(self.frame, self.column)
+
+    def __getstate__(self):
+        # The pager and the chart windows are rebuilt where unpickled
+        state = self.__dict__.copy()
+        del state['pager']
+        state['_windows'] = {}
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.pager = FramePager(self.frame, self.column)
+
+    @property
+    def nChars(self) -> int:
+        return len(self.frame)
+
+    @property
+    def totalCount(self) -> int:
+        return int(self.frame['count'].sum()) if len(self.frame) else 0
+
+    @property
+    def nBlocks(self) -> int:
+        return len(self.blocks)
+
+    @property
+    def nScripts(self) -> int:
+        return len(self.scripts)
+
+    @property
+    def nCategories(self) -> int:
+        return len(self.categories)
+
+    @property
+    def scriptNames(self) -> list[str]:
+        return self.scripts['script'].tolist()
+
+    @property
+    def blockNames(self) -> list[str]:
+        return self.blocks['block'].tolist()
+
+    @property
+    def ranked(self) -> pd.DataFrame:
+        """The per character frame, most frequent first."""
+        return self.frame.iloc[self.order]
+
+    def ecdfLabels(self, at: np.ndarray) -> list[str]:
+        """Names of the characters at some points of `ecdf`."""
+        return ucdTable().labels(self.ecdfCodes[at])
+
+    def memoryUsage(self) -> int:
+        """Bytes taken by the frames and arrays, the memoized ones included."""
+        frames = [self.frame, self.blocks, self.scripts, self.categories,
+                  *self._groups.values(), *(w.frame for w in self._windows.values())]
+        return (sum(int(df.memory_usage(deep=True).sum()) for df in frames)
+                + sum(int(s.memory_usage(deep=True)) for s in self._columns.values())
+                + self.order.nbytes + self.ecdf.nbytes + self.ecdfCodes.nbytes)
+
+    def window(self, order: str, page: int, rows: int,
+               color: str | None = None) -> ChartWindow:
+        """A page of the characters by 'code' or 'rank' order, named, kept
+        for when the same page is shown again.
+        """
+        key = (order, page, rows, color)
+        if key not in self._windows:
+            df = self.ranked if order == 'rank' else self.frame
+            self._windows[key] = chartWindow(df, page, rows, color=color,
+                                             describe=namedRows)
+        return self._windows[key]
+
+    def page(self, page: int, size: int, sortBy: str | None = None,
+             descending: bool = False, text: str = '') -> TablePage:
+        """A page of the table of the characters, named, see `FramePager.page`."""
+        table = self.pager.page(page, size, sortBy, descending, text)
+        return replace(table, frame=namedRows(table.frame))
+
+    def column(self, name: str) -> pd.Series:
+        """A registered property or a name of the characters, aligned with
+        `frame`. The names are resolved again every time rather than kept.
+        """
+        if name in self.frame.columns:
+            return self.frame[name]
+        if name in NAME_COLUMNS:
+            return pd.Series(nameValues(name, self.frame['code'].to_numpy()),
+                             index=self.frame.index, name=name)
+        if name not in self._columns:
+            values = propertyValues(name, self.frame['code'].to_numpy())
+            self._columns[name] = pd.Series(values, index=self.frame.index, name=name)
+        return self._columns[name]
+
+    def withProperties(self, names: Iterable[str]) -> pd.DataFrame:
+        """The per character frame, named, with the columns of more
+        properties.
+        """
+        extra = {n: self.column(n) for n in names if n not in self.frame.columns}
+        return namedRows(self.frame.assign(**extra))
+
+    def groupCounts(self, name: str) -> pd.DataFrame:
+        """Counts by the values of a registered property, with the number of
+        distinct characters, in the order of the property.
+        """
+        if name not in self._groups:
+            prop = charProperty(name)
+            groups, values = pd.factorize(self.column(name).to_numpy())
+            counts = self.frame['count'].to_numpy()
+            df = pd.DataFrame({
+                name: values,
+                'count': np.bincount(groups, weights=counts,
+                                     minlength=len(values)).astype(counts.dtype),
+                'chars': np.bincount(groups, minlength=len(values)),
+            })
+            self._groups[name] = df.sort_values(name, key=prop.order,
+                                                kind='stable').reset_index(drop=True)
+        return self._groups[name]
+
+
+def nextBuild() -> int:
+    """Serial number of the next build of the aggregates."""
+    with _buildsLock:
+        return next(_builds)
+
+
+def aggregateChars(df: pd.DataFrame, build: int | None = None) -> CharAggregates:
+    """Compute the aggregates of a per character frame, with categorical
+    properties, numbered `build` or the next build if none. The names of the
+    frame are dropped.
+    """
+    t0 = time.perf_counter()
+    frame = (df.drop(columns=[c for c in NAME_COLUMNS if c in df.columns])
+             .sort_values('code', kind='stable').reset_index(drop=True))
+    order = rankOrder(frame['count'].to_numpy())
+
+    blocks = categoryTotals(frame, 'block')
+    scripts = categoryTotals(frame, 'script')
+    categories = (categoryTotals(frame, 'category')
+                  .sort_values('category', kind='stable').reset_index(drop=True))
+
+    if build is None:
+        build = nextBuild()
+    return CharAggregates(frame=frame, order=order, blocks=blocks,
+                          scripts=scripts, categories=categories,
+                          ecdf=rankedEcdf(frame['count'].to_numpy()[order]),
+                          ecdfCodes=frame['code'].to_numpy()[order][::-1],
+                          build=build, seconds=time.perf_counter() - t0)
+
+
+def categoryTotals(frame: pd.DataFrame, column: str) -> pd.DataFrame:
+    """Counts by the values of a categorical column, in the order of its
+    categories, the values without characters left out.
+    """
+    values = frame[column].cat
+    codes = values.codes.to_numpy()
+    counts = frame['count'].to_numpy()
+    size = len(values.categories)
+    present = np.flatnonzero(np.bincount(codes, minlength=size))
+    totals = np.bincount(codes, weights=counts, minlength=size).astype(counts.dtype)
+    return pd.DataFrame({column: values.categories.to_numpy(dtype=object)[present],
+                         'count': totals[present]})
+
+
+def rankOrder(counts: np.ndarray) -> np.ndarray:
+    """Indices of the counts from the largest, the ties in order."""
+    return np.argsort(-counts, kind='stable')
+
+
+def rankedEcdf(counts: np.ndarray) -> np.ndarray:
+    """Normalized cumulative frequency of ranked counts, least frequent
+    first.
+    """
+    counts = counts[::-1]
+    total = counts.sum()
+    return counts.cumsum() / total if total else np.zeros(len(counts))
+
+
+def nameValues(name: str, codes: np.ndarray) -> np.ndarray:
+    """The `char` or the `unicode` names of code points."""
+    if name == 'char':
+        return np.array([chr(c) for c in codes.tolist()], dtype=object)
+    return np.array(ucdTable().labels(codes), dtype=object)
+
+
+def namedRows(df: pd.DataFrame) -> pd.DataFrame:
+    """Rows of a per character frame with their names, the columns in the
+    order of `FRAME_COLUMNS`.
+    """
+    codes = df['code'].to_numpy()
+    df = df.assign(**{n: nameValues(n, codes) for n in NAME_COLUMNS})
+    first = [c for c in FRAME_COLUMNS if c in df.columns]
+    return df[first + [c for c in df.columns if c not in first]]
+
+
+def resultAggregates(result: CountResult, build: int) -> CharAggregates:
+    """The aggregates of a result, in a worker process of the compute
+    backend. Only the counts, and the bounds of the estimates, are used.
+    """
+    return aggregateChars(resultFrame(result, names=False), build)
+
+
+def countsOnly(result: CountResult) -> CountResult:
+    """The result without the statistics other than the counts, as sent to
+    `resultAggregates`.
+    """
+    return replace(result, clusters=None, ngrams=None, malformed=None,
+                   positions=None, lines=None, scriptRuns=None)
+
+# ******************************************************************************
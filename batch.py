@@ -0,0 +1,313 @@
+# ******************************************************************************
+# Copyright (c) 2025. All rights reserved.
+# # This work is licensed under the Creative Commons Attribution 4.0
+# International License. To view a copy of this license,
+# visit # http://creativecommons.org/licenses/by/4.0/.
+#
+# Author: roximn <roximn148@gmail.com>
+# ******************************************************************************
+from collections import deque
+from dataclasses import dataclass, replace
+import glob
+import lzma
+import os
+from pathlib import Path
+import time
+from typing import Iterable, Iterator
+import zlib
+
+import numpy as np
+import pandas as pd
+
+from .cache import ResultCache, contentKey
+from .compressed import compressionOf, iterFileBlocks
+from .corpus import CorpusCount, countBlocks
+from .counting import (BLOCK_SIZE, MAX_WORKERS, PARALLEL_MIN_BYTES, CountOptions,
+                       CountResult, charFrame, countFile, workerPool)
+from .graphemes import graphemeFrame
+from .ngrams import ngramMode
+from .properties import addProperties
+from .sampling import EstimateResult, analysisMode, estimateFile
+from .security import detectRisks
+
+# ******************************************************************************
+OUTPUT_FORMATS = ('csv', 'json', 'parquet')
+# Errors of the files that cannot be read, decoded or decompressed (bz2
+# raises OSError and EOFError), reported in their analysis
+FILE_ERRORS = (OSError, EOFError, UnicodeDecodeError, lzma.LZMAError, zlib.error)
+
+# ******************************************************************************
+@dataclass
+class FileAnalysis:
+    """The outcome of the analysis of one file, or of a whole corpus."""
+    name: str
+    result: CountResult | None = None
+    error: str | None = None
+    cached: bool = False
+    # Per file breakdown of a corpus
+    files: pd.DataFrame | None = None
+
+
+def resultFrame(result: CountResult, names: bool = True) -> pd.DataFrame:
+    """The per character frame of a result, as shown by the UI, with the
+    bounds of the estimates, and the `char` and `unicode` names if `names`.
+    """
+    df = charFrame(result.counts, names=names)
+    if isinstance(result, EstimateResult):
+        df = result.annotate(df)
+    return df
+
+
+def expandPaths(patterns: Iterable[str]) -> list[Path]:
+    """The files matching glob patterns, `**` included, or named as is,
+    without duplicates and in the given order.
+    """
+    paths, seen = [], set()
+    for pattern in patterns:
+        if glob.has_magic(pattern):
+            matches = sorted(glob.glob(pattern, recursive=True))
+        else:
+            matches = [pattern]
+        for match in matches:
+            path = Path(match)
+            if path.is_dir() or path in seen:
+                continue
+            seen.add(path)
+            paths.append(path)
+    return paths
+
+
+def fileOptions(options: CountOptions, nBytes: int) -> CountOptions:
+    """The options with the 'auto' n-gram mode resolved for a file size."""
+    return replace(options, ngrams=ngramMode(options.ngrams, nBytes))
+
+
+# ******************************************************************************
+def countPath(path: str, blockSize: int = BLOCK_SIZE,
+              options: CountOptions | None = None):
+    """Count a small file in a worker process."""
+    t0 = time.perf_counter()
+    counter, nBytes = countBlocks(iterFileBlocks(path, blockSize), options)
+    return counter, nBytes, time.perf_counter() - t0
+
+
+def analyzeFile(path: Path | str, mode: str = 'exact',
+                options: CountOptions | None = None,
+                cache: ResultCache | None = None,
+                workers: int | None = None) -> CountResult:
+    """Analyse a single file as the UTF panel does.
+
+    Gzip, bz2 and xz files are decompressed on the fly and always counted
+    exactly, they cannot be sampled.
+
+    Parameters:
+        path(Path | str): The UTF-8 file, possibly compressed.
+        mode(str): 'exact', 'estimate' or 'auto' (estimates large files).
+        options(CountOptions | None): What is counted besides the code
+            points, the n-gram mode may be 'auto'.
+        cache(ResultCache | None): Cache of the exact results.
+        workers(int | None): Number of processes, `None` picks it from the
+            file size.
+
+    Returns:
+        The result, an `EstimateResult` for estimates.
+    """
+    path = Path(path)
+    nBytes = path.stat().st_size
+    compression = compressionOf(path)
+    if compression is None and analysisMode(mode, nBytes) == 'estimate':
+        return estimateFile(path)
+
+    options = fileOptions(options or CountOptions(), nBytes)
+    key = None
+    if cache is not None:
+        key = contentKey(path, tag=options.tag())
+        result = cache.get(key)
+        if result is not None:
+            return result
+    if compression is None:
+        result = countFile(path, workers=workers, options=options)
+    else:
+        counter, textBytes, seconds = countPath(str(path), options=options)
+        result = counter.countResult(textBytes, seconds)
+    if key is not None:
+        cache.put(key, result)
+    return result
+
+
+def analyzeFiles(paths: Iterable[Path | str], mode: str = 'exact',
+                 options: CountOptions | None = None,
+                 cache: ResultCache | None = None) -> Iterator[FileAnalysis]:
+    """Analyse many files, in parallel over the shared process pool.
+
+    Small files are each counted by a worker, a bounded number of them in
+    flight, large ones are split in shards over all the workers. A file that
+    cannot be read, decoded or decompressed is reported in its analysis
+    instead of stopping the others.
+
+    Parameters:
+        paths(Iterable): The files.
+        mode(str): 'exact', 'estimate' or 'auto' (estimates large files).
+        options(CountOptions | None): What is counted besides the code
+            points, the n-gram mode may be 'auto'.
+        cache(ResultCache | None): Cache of the exact results.
+
+    Returns:
+        The analyses, in the order of the paths.
+    """
+    options = options or CountOptions()
+    pool = workerPool()
+    limit = 2 * max(1, min(os.cpu_count() or 1, MAX_WORKERS))
+    window: deque = deque()
+
+    def submit(path: Path):
+        """`(path, cache key, future, analysis)`, the last when already known."""
+        try:
+            nBytes = path.stat().st_size
+            if nBytes >= PARALLEL_MIN_BYTES or analysisMode(mode, nBytes) == 'estimate':
+                return path, None, None, None
+            fileOpts = fileOptions(options, nBytes)
+            key = contentKey(path, tag=fileOpts.tag()) if cache is not None else None
+            result = cache.get(key) if key is not None else None
+            if result is not None:
+                return path, None, None, FileAnalysis(str(path), result, cached=True)
+            future = pool.submit(countPath, str(path), BLOCK_SIZE, fileOpts)
+            return path, key, future, None
+        except OSError as e:
+            return path, None, None, FileAnalysis(str(path), error=str(e))
+
+    def collect(path: Path, key: str | None, future, ready: FileAnalysis | None):
+        if ready is not None:
+            return ready
+        try:
+            if future is None:
+                return FileAnalysis(str(path), analyzeFile(path, mode, options, cache))
+            counter, nBytes, seconds = future.result()
+            result = counter.countResult(nBytes, seconds)
+            if key is not None:
+                cache.put(key, result)
+            return FileAnalysis(str(path), result)
+        except FILE_ERRORS as e:
+            return FileAnalysis(str(path), error=str(e) or type(e).__name__)
+
+    try:
+        for path in map(Path, paths):
+            window.append(submit(path))
+            while len(window) > limit:
+                yield collect(*window.popleft())
+        while window:
+            yield collect(*window.popleft())
+    finally:
+        for _, _, future, _ in window:
+            if future is not None:
+                future.cancel()
+
+
+def analyzeCorpus(paths: Iterable[Path | str],
+                  options: CountOptions | None = None) -> FileAnalysis:
+    """Analyse files and archives together, as the UTF panel does with
+    several uploads.
+    """
+    paths = [Path(p) for p in paths]
+    uploads = [{'name': str(p), 'datapath': str(p), 'size': p.stat().st_size}
+               for p in paths]
+    options = fileOptions(options or CountOptions(),
+                          sum(u['size'] for u in uploads))
+    snapshot = CorpusCount(uploads, snapshotBytes=0, options=options).start().wait()
+    return FileAnalysis('*', snapshot.result, error=snapshot.error,
+                        files=snapshot.files)
+
+
+# ******************************************************************************
+def resultTables(analyses: Iterable[FileAnalysis],
+                 properties: Iterable[str] = ()) -> dict[str, pd.DataFrame]:
+    """The frames of the UTF panel for a set of analyses, with a `file`
+    column, the `characters` with the columns of the registered
+    `properties` as well.
+
+    Returns:
+        The `characters`, `graphemes`, `ngrams`, `malformed`, `lines` (the
+        line length histogram), `words`, `scriptRuns` (the run length
+        histogram), `transitions`, `mixedTokens`, `risks` (the invisible,
+        control and confusable characters), `collisions` (the look-alikes
+        sharing a prototype) and `files` frames.
+    """
+    chars, graphemes, ngrams, malformed, files = [], [], [], [], []
+    lines, words, risks, collisions = [], [], [], []
+    runs, transitions, mixed = [], [], []
+    properties = list(properties)
+    for analysis in analyses:
+        result = analysis.result
+        if analysis.files is not None:
+            files.append(analysis.files)
+        elif result is not None:
+            files.append(pd.DataFrame([{
+                'file': analysis.name, 'bytes': result.nBytes,
+                'count': int(result.counts.sum()),
+                'distinct': int(np.count_nonzero(result.counts)),
+                'graphemes': result.nClusters if result.clusters is not None else None,
+                'error': None}]))
+        else:
+            files.append(pd.DataFrame([{'file': analysis.name, 'bytes': 0,
+                                        'count': 0, 'distinct': 0,
+                                        'graphemes': 0, 'error': analysis.error}]))
+        if result is None:
+            continue
+
+        chars.append(addProperties(resultFrame(result), properties)
+                     .assign(file=analysis.name))
+        if result.clusters is not None:
+            graphemes.append(graphemeFrame(result.counts, result.clusters)
+                             .assign(file=analysis.name))
+        for n, table in (result.ngrams or {}).items():
+            ngrams.append(table.frame().assign(file=analysis.name, n=n))
+        if result.malformed is not None and result.malformed.count:
+            malformed.append(result.malformed.frame().assign(file=analysis.name))
+        if result.lines is not None:
+            lines.append(result.lines.lengthFrame().assign(file=analysis.name))
+            words.append(result.lines.wordFrame().assign(file=analysis.name))
+        if result.scriptRuns is not None:
+            runs.append(result.scriptRuns.lengthFrame().assign(file=analysis.name))
+            transitions.append(result.scriptRuns.transitionFrame().assign(file=analysis.name))
+            mixed.append(result.scriptRuns.tokenFrame().assign(file=analysis.name))
+        report = detectRisks(result.counts)
+        risks.append(report.chars.assign(file=analysis.name))
+        collisions.append(report.collisions.assign(file=analysis.name))
+
+    def concat(frames: list[pd.DataFrame]) -> pd.DataFrame:
+        if not frames:
+            return pd.DataFrame({'file': []})
+        df = pd.concat(frames, ignore_index=True)
+        return df[['file'] + [c for c in df.columns if c != 'file']]
+
+    return {'characters': concat(chars), 'graphemes': concat(graphemes),
+            'ngrams': concat(ngrams), 'malformed': concat(malformed),
+            'lines': concat(lines), 'words': concat(words),
+            'scriptRuns': concat(runs), 'transitions': concat(transitions),
+            'mixedTokens': concat(mixed), 'risks': concat(risks),
+            'collisions': concat(collisions), 'files': concat(files)}
+
+
+def writeTables(tables: dict[str, pd.DataFrame], directory: Path | str,
+                fmt: str = 'csv') -> list[Path]:
+    """Write the frames as `<name>.<fmt>` files into a directory.
+
+    Parquet needs `pyarrow` or `fastparquet` to be installed.
+    """
+    if fmt not in OUTPUT_FORMATS:
+        raise ValueError(f'Unknown output format: {fmt}')
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    written = []
+    for name, df in tables.items():
+        path = directory / f'{name}.{fmt}'
+        if fmt == 'csv':
+            df.to_csv(path, index=False)
+        elif fmt == 'json':
+            df.to_json(path, orient='records', force_ascii=False, indent=1)
+        else:
+            df.to_parquet(path, index=False)
+        written.append(path)
+    return written
+
+# ******************************************************************************
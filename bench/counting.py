@@ -0,0 +1,85 @@
+# ******************************************************************************
+# Copyright (c) 2025. All rights reserved.
+# # This work is licensed under the Creative Commons Attribution 4.0
+# International License. To view a copy of this license,
+# visit # http://creativecommons.org/licenses/by/4.0/.
+#
+# Author: roximn <roximn148@gmail.com>
+# ******************************************************************************
+# Compares the `Counter.update` text loop with the bincount counting engine,
+# with and without the grapheme cluster segmentation.
+#
+# Usage (from the parent directory of the repository):
+#     python -m shinomni.bench.counting [file | sizeMB]
+# ******************************************************************************
+from collections import Counter
+from pathlib import Path
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from ..counting import CountOptions, countFile
+
+
+# ******************************************************************************
+def counterPath(path: Path) -> Counter:
+    counts = Counter()
+    with path.open(mode='r', encoding='utf-8') as file:
+        while True:
+            chunk = file.read(16*1024)
+            if not chunk:
+                break
+            counts.update(chunk)
+    return counts
+
+
+def sampleFile(sizeMB: float) -> Path:
+    """Mixed latin, arabic, CJK and emoji text with all kinds of newlines."""
+    rng = np.random.default_rng(0)
+    alphabet = (list('abcdefghijklmnopqrstuvwxyz ABCDEF.,;0123456789') * 4
+                + [chr(c) for c in range(0x621, 0x64B)]
+                + [chr(c) for c in rng.integers(0x4E00, 0x9FFF, 200)]
+                + ['\U0001F600', '\U0001F44D', '\r\n', '\r', '\n', '\t'])
+    pieces = rng.choice(len(alphabet), 1 << 16)
+    unit = ''.join(alphabet[i] for i in pieces).encode('utf-8')
+
+    tmp = Path(tempfile.mkstemp(suffix='.txt')[1])
+    with tmp.open('wb') as file:
+        for _ in range(max(1, int(sizeMB * 1e6) // len(unit))):
+            file.write(unit)
+    return tmp
+
+
+# ******************************************************************************
+def main():
+    arg = sys.argv[1] if len(sys.argv) > 1 else '64'
+    generated = not Path(arg).exists()
+    path = sampleFile(float(arg)) if generated else Path(arg)
+    size = path.stat().st_size
+
+    t0 = time.perf_counter()
+    expected = counterPath(path)
+    tCounter = time.perf_counter() - t0
+    codePoints = countFile(path, options=CountOptions(graphemes=False, lines=False))
+    result = countFile(path, options=CountOptions(lines=False))
+
+    print(f'file:           {path} ({size/1e6:,.1f} MB)')
+    print(f'Counter loop:   {tCounter:8.2f} s  {size/1e6/tCounter:8.1f} MB/s')
+    print(f'bincount:       {codePoints.seconds:8.2f} s  {codePoints.throughput:8.1f} MB/s'
+          f'  (x{tCounter/codePoints.seconds:.1f})')
+    print(f'  + graphemes:  {result.seconds:8.2f} s  {result.throughput:8.1f} MB/s'
+          f'  ({result.nClusters:,} clusters)')
+
+    codes = np.flatnonzero(result.counts)
+    same = (len(codes) == len(expected)
+            and all(expected[chr(c)] == result.counts[c] for c in codes.tolist()))
+    print(f'counts:         {"identical" if same else "DIFFERENT"}')
+
+    if generated:
+        path.unlink()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+# ******************************************************************************
+# Copyright (c) 2025. All rights reserved.
+# # This work is licensed under the Creative Commons Attribution 4.0
+# International License. To view a copy of this license,
+# visit # http://creativecommons.org/licenses/by/4.0/.
+#
+# Author: roximn <roximn148@gmail.com>
+# ******************************************************************************
+# Measures the cost of the line, word and whitespace statistics over the
+# counting pass, best of a few runs on a single worker.
+#
+# Usage (from the parent directory of the repository):
+#     python -m shinomni.bench.lines [file | sizeMB] [runs]
+# ******************************************************************************
+from pathlib import Path
+import sys
+
+from ..counting import CountOptions, countFile
+from .counting import sampleFile
+
+# Largest acceptable extra time of the statistics
+BUDGET = 0.20
+
+# ******************************************************************************
+def bestOf(path: Path, options: CountOptions, runs: int):
+    return min((countFile(path, workers=1, options=options) for _ in range(runs)),
+               key=lambda r: r.seconds)
+
+
+def main():
+    arg = sys.argv[1] if len(sys.argv) > 1 else '64'
+    runs = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    generated = not Path(arg).exists()
+    path = sampleFile(float(arg)) if generated else Path(arg)
+    size = path.stat().st_size
+
+    base = bestOf(path, CountOptions(lines=False), runs)
+    result = bestOf(path, CountOptions(lines=True), runs)
+    stats = result.lines
+    overhead = result.seconds / base.seconds - 1
+
+    print(f'file:           {path} ({size/1e6:,.1f} MB)')
+    print(f'counting:       {base.seconds:8.2f} s  {base.throughput:8.1f} MB/s')
+    print(f'  + lines:      {result.seconds:8.2f} s  {result.throughput:8.1f} MB/s'
+          f'  ({overhead:+.1%}, {"within" if overhead <= BUDGET else "OVER"} '
+          f'the {BUDGET:.0%} budget)')
+    print(f'lines:          {stats.lines:,} (max {stats.maxLength:,}, '
+          f'mean {stats.meanLength:,.1f}), {stats.trailing:,} with trailing whitespace')
+    print(f'line ends:      LF {stats.lf:,}, CR LF {stats.crlf:,}, CR {stats.cr:,}')
+    print(f'words:          {stats.totalWords:,} in {len(stats.words)} scripts')
+
+    if generated:
+        path.unlink()
+
+
+if __name__ == '__main__':
+    main()
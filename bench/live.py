@@ -0,0 +1,63 @@
+# ******************************************************************************
+# Copyright (c) 2025. All rights reserved.
+# # This work is licensed under the Creative Commons Attribution 4.0
+# International License. To view a copy of this license,
+# visit # http://creativecommons.org/licenses/by/4.0/.
+#
+# Author: roximn <roximn148@gmail.com>
+# ******************************************************************************
+# Measures the live updates of an edited text, a paste of the whole text and
+# single character edits at random places, aggregates included.
+#
+# Usage (from the parent directory of the repository):
+#     python -m shinomni.bench.live [file | sizeMB] [edits]
+# ******************************************************************************
+from pathlib import Path
+import random
+import sys
+import time
+
+import numpy as np
+
+from ..live import LiveCount
+from .counting import sampleFile
+
+# ******************************************************************************
+def main():
+    arg = sys.argv[1] if len(sys.argv) > 1 else '1'
+    edits = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    generated = not Path(arg).exists()
+    path = sampleFile(float(arg)) if generated else Path(arg)
+    text = path.read_text(encoding='utf-8', errors='replace')
+
+    live = LiveCount()
+    t0 = time.perf_counter()
+    result = live.update(text)
+    paste = time.perf_counter() - t0
+
+    rng = random.Random(0)
+    times = []
+    for i in range(edits):
+        pos = rng.randrange(len(text) + 1)
+        if i % 2:
+            text = text[:pos] + rng.choice('aé中\n') + text[pos:]
+        else:
+            text = text[:pos] + text[pos + 1:]
+        t0 = time.perf_counter()
+        result = live.update(text)
+        times.append(time.perf_counter() - t0)
+    times = np.array(times) * 1000
+
+    print(f'text:           {path} ({len(text):,} characters, '
+          f'{result.aggregates.nChars:,} distinct)')
+    print(f'paste:          {paste * 1000:8.1f} ms')
+    print(f'edits:          {np.median(times):8.1f} ms median, '
+          f'{times.max():.1f} ms at most, {edits} edits')
+    print(f'  aggregates:   {result.aggregates.seconds * 1000:8.1f} ms')
+
+    if generated:
+        path.unlink()
+
+
+if __name__ == '__main__':
+    main()
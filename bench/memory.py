@@ -0,0 +1,105 @@
+# ******************************************************************************
+# Copyright (c) 2025. All rights reserved.
+# # This work is licensed under the Creative Commons Attribution 4.0
+# International License. To view a copy of this license,
+# visit # http://creativecommons.org/licenses/by/4.0/.
+#
+# Author: roximn <roximn148@gmail.com>
+# ******************************************************************************
+# Measures the memory held by the character aggregates of a session, the
+# compact frames against the named frames with object columns they replace,
+# and the time taken to name the rows shown.
+#
+# Usage (from the parent directory of the repository):
+#     python -m shinomni.bench.memory [file | sizeMB | all] [sessions]
+#
+# `all` counts every assigned code point once, the largest frames there are.
+# ******************************************************************************
+from pathlib import Path
+import pickle
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from ..aggregates import resultAggregates
+from ..counting import CountResult, charFrame, countFile
+from ..ucd import CODESPACE, ucdTable
+from .counting import sampleFile
+
+# ******************************************************************************
+def assignedResult() -> CountResult:
+    """Counts of all the assigned code points, surrogates and private use
+    ones left out, at random.
+    """
+    categories = ucdTable().categories(ucdTable().props)
+    assigned = ~np.isin(categories, ['Cn', 'Cs', 'Co'])
+    counts = np.zeros(CODESPACE, dtype=np.int64)
+    counts[assigned] = np.random.default_rng(0).integers(1, 1000, int(assigned.sum()))
+    return CountResult(counts=counts, nBytes=0, seconds=0.0)
+
+
+def namedAggregates(result: CountResult) -> tuple:
+    """The frames kept before: named, with object columns, and ranked as a
+    copy.
+    """
+    frame = charFrame(result.counts)
+    for column in ('category', 'block', 'script'):
+        frame[column] = frame[column].astype(object)
+    ranked = frame.sort_values('count', ascending=False, kind='stable')
+    return frame, ranked, ranked['unicode'].to_numpy()[::-1]
+
+
+def heldBytes(build, sessions: int) -> tuple[float, float, list]:
+    """Bytes held per session and peak bytes of `sessions` builds."""
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    held = [build() for _ in range(sessions)]
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return (current - base) / sessions, (peak - base), held
+
+
+# ******************************************************************************
+def main():
+    arg = sys.argv[1] if len(sys.argv) > 1 else 'all'
+    sessions = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    generated = arg != 'all' and not Path(arg).exists()
+    if arg == 'all':
+        path, result = 'all assigned code points', assignedResult()
+    else:
+        path = sampleFile(float(arg)) if generated else Path(arg)
+        result = countFile(path)
+    ucdTable().labels(np.arange(0x80))
+
+    named, namedPeak, _ = heldBytes(lambda: namedAggregates(result), sessions)
+    compact, compactPeak, held = heldBytes(lambda: resultAggregates(result, 0), sessions)
+    agg = held[0]
+
+    t0 = time.perf_counter()
+    pickled = len(pickle.dumps(agg))
+    namedPickled = len(pickle.dumps(namedAggregates(result)))
+    t1 = time.perf_counter()
+    agg.window('rank', 1, 50, color='category')
+    t2 = time.perf_counter()
+    agg.page(1, 100, 'unicode', False, 'letter')
+    t3 = time.perf_counter()
+
+    print(f'text:           {path} ({agg.nChars:,} distinct characters, {sessions} sessions)')
+    print(f'named frames:   {named / 1e6:8.2f} MB a session, {namedPeak / 1e6:.1f} MB peak')
+    print(f'compact:        {compact / 1e6:8.2f} MB a session, {compactPeak / 1e6:.1f} MB peak'
+          f'  (x{named / compact:.1f} less)')
+    print(f'  pickled:      {pickled / 1e6:8.2f} MB, named {namedPickled / 1e6:.2f} MB'
+          f'  ({(t1 - t0) * 1000:.0f} ms)')
+    print(f'  build:        {agg.seconds * 1000:8.1f} ms')
+    print(f'  chart page:   {(t2 - t1) * 1000:8.1f} ms to name 50 rows')
+    print(f'  name search:  {(t3 - t2) * 1000:8.1f} ms, every row named')
+    print(f'  held:         {agg.memoryUsage() / 1e6:8.2f} MB after both')
+
+    if generated:
+        path.unlink()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+# ******************************************************************************
+# Copyright (c) 2025. All rights reserved.
+# # This work is licensed under the Creative Commons Attribution 4.0
+# International License. To view a copy of this license,
+# visit # http://creativecommons.org/licenses/by/4.0/.
+#
+# Author: roximn <roximn148@gmail.com>
+# ******************************************************************************
+# Compares the exact n-gram counts with the bounded ones: time, number of
+# n-grams kept, the observed and guaranteed errors and the recall of the
+# most frequent n-grams.
+#
+# Usage (from the parent directory of the repository):
+#     python -m shinomni.bench.ngrams [file | sizeMB] [capacity]
+# ******************************************************************************
+from pathlib import Path
+import sys
+
+import numpy as np
+
+from ..counting import CountOptions, countFile
+from .counting import sampleFile
+
+TOP = 100
+
+# ******************************************************************************
+def main():
+    arg = sys.argv[1] if len(sys.argv) > 1 else '64'
+    capacity = int(sys.argv[2]) if len(sys.argv) > 2 else 10_000
+    generated = not Path(arg).exists()
+    path = sampleFile(float(arg)) if generated else Path(arg)
+    size = path.stat().st_size
+
+    base = countFile(path, options=CountOptions(graphemes=False))
+    exact = countFile(path, options=CountOptions(graphemes=False, ngrams='exact'))
+    bounded = countFile(path, options=CountOptions(graphemes=False, ngrams='bounded',
+                                                   ngramCapacity=capacity))
+
+    print(f'file:           {path} ({size/1e6:,.1f} MB)')
+    print(f'code points:    {base.seconds:8.2f} s  {base.throughput:8.1f} MB/s')
+    print(f'  + exact:      {exact.seconds:8.2f} s  {exact.throughput:8.1f} MB/s')
+    print(f'  + bounded:    {bounded.seconds:8.2f} s  {bounded.throughput:8.1f} MB/s'
+          f'  (capacity {capacity:,})')
+    for n, table in exact.ngrams.items():
+        approx = bounded.ngrams[n]
+        at = np.searchsorted(table.keys, approx.keys)
+        observed = int((table.counts[at] - approx.counts).max(initial=0))
+        top = table.keys[np.argsort(table.counts)[::-1][:TOP]]
+        recall = np.isin(top, approx.keys).mean()
+        print(f'{n}-grams:        {len(table.keys):,} distinct, {len(approx.keys):,} kept, '
+              f'error {observed:,} <= {approx.error:,} <= {approx.errorBound:,.0f}, '
+              f'top {TOP} recall {recall:.0%}')
+
+    if generated:
+        path.unlink()
+
+
+if __name__ == '__main__':
+    main()
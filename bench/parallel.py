@@ -0,0 +1,47 @@
+# ******************************************************************************
+# Copyright (c) 2025. All rights reserved.
+# # This work is licensed under the Creative Commons Attribution 4.0
+# International License. To view a copy of this license,
+# visit # http://creativecommons.org/licenses/by/4.0/.
+#
+# Author: roximn <roximn148@gmail.com>
+# ******************************************************************************
+# Scaling of the sharded counting over 1/2/4/8/16 worker processes.
+#
+# Usage (from the parent directory of the repository):
+#     python -m shinomni.bench.parallel [file | sizeMB]
+# ******************************************************************************
+import os
+from pathlib import Path
+import sys
+
+import numpy as np
+
+from ..counting import countFile
+from .counting import sampleFile
+
+
+# ******************************************************************************
+def main():
+    arg = sys.argv[1] if len(sys.argv) > 1 else '256'
+    generated = not Path(arg).exists()
+    path = sampleFile(float(arg)) if generated else Path(arg)
+    size = path.stat().st_size
+
+    print(f'file:    {path} ({size/1e6:,.1f} MB), {os.cpu_count()} cpu(s)')
+    base = None
+    for workers in (1, 2, 4, 8, 16):
+        result = countFile(path, workers=workers)
+        if base is None:
+            base = result
+        same = np.array_equal(base.counts, result.counts)
+        print(f'{workers:2d} worker(s): {result.seconds:8.2f} s '
+              f'{result.throughput:8.1f} MB/s  x{base.seconds/result.seconds:5.2f}'
+              f'  {"identical" if same else "DIFFERENT"}')
+
+    if generated:
+        path.unlink()
+
+
+if __name__ == '__main__':
+    main()
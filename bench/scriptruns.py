@@ -0,0 +1,61 @@
+# ******************************************************************************
+# Copyright (c) 2025. All rights reserved.
+# # This work is licensed under the Creative Commons Attribution 4.0
+# International License. To view a copy of this license,
+# visit # http://creativecommons.org/licenses/by/4.0/.
+#
+# Author: roximn <roximn148@gmail.com>
+# ******************************************************************************
+# Measures the cost of the script-run segmentation over the counting pass,
+# best of a few runs on a single worker, and the size of its state.
+#
+# Usage (from the parent directory of the repository):
+#     python -m shinomni.bench.scriptruns [file | sizeMB] [runs]
+# ******************************************************************************
+from pathlib import Path
+import pickle
+import sys
+
+from ..counting import CodeCounter, CountOptions, iterByteBlocks
+from .counting import sampleFile
+from .lines import bestOf
+
+# ******************************************************************************
+def stateBytes(path: Path) -> int:
+    """Largest pickled size of the segmenter state while counting a file."""
+    counter = CodeCounter(CountOptions(lines=False, scriptRuns=True))
+    largest = 0
+    for data in iterByteBlocks(path):
+        counter.feed(data)
+        largest = max(largest, len(pickle.dumps(counter.scriptRuns)))
+    return largest
+
+
+def main():
+    arg = sys.argv[1] if len(sys.argv) > 1 else '64'
+    runs = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    generated = not Path(arg).exists()
+    path = sampleFile(float(arg)) if generated else Path(arg)
+    size = path.stat().st_size
+
+    base = bestOf(path, CountOptions(lines=False), runs)
+    result = bestOf(path, CountOptions(lines=False, scriptRuns=True), runs)
+    stats = result.scriptRuns
+    overhead = result.seconds / base.seconds - 1
+
+    print(f'file:           {path} ({size/1e6:,.1f} MB)')
+    print(f'counting:       {base.seconds:8.2f} s  {base.throughput:8.1f} MB/s')
+    print(f'  + runs:       {result.seconds:8.2f} s  {result.throughput:8.1f} MB/s'
+          f'  ({overhead:+.1%})')
+    print(f'runs:           {stats.runs:,} of {len(stats.scripts)} scripts, '
+          f'{int(stats.transitions.sum()):,} script changes')
+    print(f'mixed tokens:   {stats.mixed:,}, {len(stats.tokens):,} kept '
+          f'(error {stats.error:,}, capacity {stats.capacity:,})')
+    print(f'state:          {stateBytes(path) / 1e6:,.1f} MB at most')
+
+    if generated:
+        path.unlink()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+# ******************************************************************************
+# Copyright (c) 2025. All rights reserved.
+# # This work is licensed under the Creative Commons Attribution 4.0
+# International License. To view a copy of this license,
+# visit # http://creativecommons.org/licenses/by/4.0/.
+#
+# Author: roximn <roximn148@gmail.com>
+# ******************************************************************************
+# Compares the per row `DataFrame.apply` enrichment with the table lookup.
+#
+# Usage (from the parent directory of the repository):
+#     python -m shinomni.bench.ucd [nChars]
+# ******************************************************************************
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+import unicodedataplus as unicodedata
+
+from ..utils import BLOCKS, findBlock
+from ..ucd import ucdTable, tablesDir, NO_BLOCK
+
+
+# ******************************************************************************
+def applyPath(cdf: pd.DataFrame) -> pd.DataFrame:
+    cdf['unicode'] = cdf['char'].apply(lambda x: f'U+{ord(x):04X} {unicodedata.name(x, "NO-NAME")}')
+    cdf['category'] = cdf['char'].apply(lambda x: unicodedata.category(x))
+    cdf['block'] = cdf['code'].apply(lambda x: BLOCKS[findBlock(x)].name if findBlock(x) >= 0 else NO_BLOCK)
+    cdf['script'] = cdf['char'].apply(lambda x: unicodedata.script(x))
+    return cdf
+
+
+def tablePath(cdf: pd.DataFrame) -> pd.DataFrame:
+    return ucdTable().describe(cdf)
+
+
+def sample(nChars: int) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    # CJK heavy mix of distinct characters with some latin and arabic
+    codes = np.unique(np.concatenate([
+        np.arange(0x20, 0x7F),
+        np.arange(0x600, 0x700),
+        rng.integers(0x4E00, 0xA000, nChars),
+        rng.integers(0x20000, 0x2A6E0, nChars // 10),
+    ]))
+    return pd.DataFrame({'char': [chr(c) for c in codes], 'code': codes})
+
+
+def timed(fn, *args) -> tuple[float, object]:
+    t0 = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - t0, result
+
+
+# ******************************************************************************
+def main():
+    nChars = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+
+    built = (tablesDir() / 'props.npy').exists()
+    tLoad, _ = timed(ucdTable)
+    print(f'table {"load" if built else "build"}: {tLoad*1000:9.1f} ms  ({tablesDir()})')
+
+    base = sample(nChars)
+    tApply, a = timed(applyPath, base.copy())
+    tTable, b = timed(tablePath, base.copy())
+
+    print(f'distinct chars:  {len(base):9,d}')
+    print(f'apply path:      {tApply*1000:9.1f} ms')
+    print(f'table path:      {tTable*1000:9.1f} ms  (x{tApply/tTable:.1f})')
+
+    for col in ('unicode', 'category', 'block', 'script'):
+        same = (a[col].to_numpy() == b[col].to_numpy()).all()
+        print(f'  {col:<10} {"identical" if same else "DIFFERENT"}')
+
+
+if __name__ == '__main__':
+    main()
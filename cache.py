@@ -0,0 +1,281 @@
+# ******************************************************************************
+# Copyright (c) 2025. All rights reserved.
+# # This work is licensed under the Creative Commons Attribution 4.0
+# International License. To view a copy of this license,
+# visit # http://creativecommons.org/licenses/by/4.0/.
+#
+# Author: roximn <roximn148@gmail.com>
+# ******************************************************************************
+from functools import lru_cache
+import hashlib
+import mmap
+import os
+from pathlib import Path
+import re
+import tempfile
+import threading
+from typing import Callable
+import zipfile
+
+import numpy as np
+
+from .counting import ANALYSIS_VERSION, CountResult
+from .lines import LineStats
+from .malformed import MalformedIndex
+from .ngrams import NgramResult
+from .positions import PositionIndex
+from .scriptruns import ScriptRunStats
+from .ucd import CACHE_DIR, CODESPACE
+
+# ******************************************************************************
+RESULTS_DIR = CACHE_DIR / 'results'
+CACHE_BUDGET = int(os.environ.get('SHINOMNI_CACHE_BUDGET', 512 * 1024 * 1024))
+
+HASH_BLOCK = 64 * 1024 * 1024
+
+# ******************************************************************************
+def contentKey(path: Path | str, version: int = ANALYSIS_VERSION,
+               progress: Callable[[int], None] | None = None,
+               tag: str = '') -> str:
+    """Hash of the file content, the analysis version and options.
+
+    Parameters:
+        path(Path | str): The file to hash.
+        version(int): The analysis version mixed into the key.
+        progress(Callable): Called with the number of bytes hashed so far
+            after every block.
+        tag(str): The analysis options mixed into the key.
+
+    Returns:
+        The key as a hex string.
+    """
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(f'shinomni-utf-v{version}:{tag}:'.encode('ascii'))
+    with Path(path).open('rb') as file:
+        size = file.seek(0, 2)
+        if size > 0:
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                for pos in range(0, size, HASH_BLOCK):
+                    digest.update(mm[pos:pos + HASH_BLOCK])
+                    if progress is not None:
+                        progress(min(pos + HASH_BLOCK, size))
+    return digest.hexdigest()
+
+
+# ******************************************************************************
+class ResultCache:
+    """On-disk cache of count results keyed by content hash.
+
+    Each entry is a small uncompressed `.npz`, so it loads in milliseconds.
+    Entries are written atomically and are shared by all the processes using
+    the same directory. The modification time of an entry is refreshed on
+    every hit and the least recently used entries are evicted once the
+    directory grows beyond `budget` bytes.
+
+    Fields of an entry:
+        code, count: The non zero counts.
+        nBytes, seconds: Size of the text and time taken.
+        cluster, clusterCount, nClusters: The multi code point grapheme
+            clusters and the number of clusters.
+        ngram<n>Key, ngram<n>Count, ngram<n>Info: The n-grams of size n, if
+            counted, the info being the total, error and capacity (-1 for
+            exact counts).
+        malformed, malformedInfo: The malformed sequences, if indexed, the
+            info being their count and bytes.
+        positions: The first occurrences, if indexed.
+        lineLengths, lineInfo, wordScript, wordCount: The line statistics,
+            if counted, the info being the longest line, the trailing
+            whitespace and the LF, CR LF and CR line ends.
+        runScript, runLengths, runCodes, transitions, mixedToken,
+        mixedCount, mixedInfo: The script runs, if segmented, the info
+            being the mixed tokens, error and capacity.
+    """
+    def __init__(self, root: Path = RESULTS_DIR, budget: int = CACHE_BUDGET):
+        self.root = root
+        self.budget = budget
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def entryPath(self, key: str) -> Path:
+        return self.root / key[:2] / f'{key}.npz'
+
+    def get(self, key: str) -> CountResult | None:
+        path = self.entryPath(key)
+        try:
+            with np.load(path) as npz:
+                codes, values = npz['code'], npz['count']
+                nBytes, seconds = int(npz['nBytes']), float(npz['seconds'])
+                clusters = dict(zip(npz['cluster'].tolist(),
+                                    npz['clusterCount'].tolist()))
+                nClusters = int(npz['nClusters'])
+                ngrams = {}
+                for name in npz.files:
+                    match = re.fullmatch(r'ngram(\d+)Key', name)
+                    if match is None:
+                        continue
+                    n = int(match[1])
+                    total, error, capacity = npz[f'ngram{n}Info'].tolist()
+                    ngrams[n] = NgramResult(n=n, keys=npz[name],
+                                            counts=npz[f'ngram{n}Count'],
+                                            total=total, error=error,
+                                            capacity=None if capacity < 0 else capacity)
+                malformed = None
+                if 'malformed' in npz.files:
+                    count, nMalformed = npz['malformedInfo'].tolist()
+                    malformed = MalformedIndex.fromEntries(npz['malformed'], count,
+                                                           nMalformed)
+                positions = None
+                if 'positions' in npz.files:
+                    positions = PositionIndex.fromEntries(npz['positions'])
+                lines = None
+                if 'lineLengths' in npz.files:
+                    maxLength, trailing, lf, crlf, cr = npz['lineInfo'].tolist()
+                    lines = LineStats(lengths=npz['lineLengths'], maxLength=maxLength,
+                                      trailing=trailing,
+                                      words=dict(zip(npz['wordScript'].tolist(),
+                                                     npz['wordCount'].tolist())),
+                                      lf=lf, crlf=crlf, cr=cr)
+                scriptRuns = None
+                if 'runScript' in npz.files:
+                    mixed, error, capacity = npz['mixedInfo'].tolist()
+                    scriptRuns = ScriptRunStats(
+                        scripts=npz['runScript'].tolist(), runLengths=npz['runLengths'],
+                        runCodes=npz['runCodes'], transitions=npz['transitions'],
+                        tokens=dict(zip(npz['mixedToken'].tolist(),
+                                        npz['mixedCount'].tolist())),
+                        mixed=mixed, error=error, capacity=capacity)
+            os.utime(path)
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return None
+        except (OSError, EOFError, KeyError, ValueError, zipfile.BadZipFile) as e:
+            # Truncated or corrupt entry, drop it and count again
+            print(f"Error reading cache entry {path.name}: {e}")
+            path.unlink(missing_ok=True)
+            with self._lock:
+                self.misses += 1
+            return None
+
+        counts = np.zeros(CODESPACE, dtype=np.int64)
+        counts[codes] = values
+        with self._lock:
+            self.hits += 1
+        return CountResult(counts=counts, nBytes=nBytes, seconds=seconds,
+                           clusters=clusters, nClusters=nClusters,
+                           ngrams=ngrams or None, malformed=malformed,
+                           positions=positions, lines=lines, scriptRuns=scriptRuns)
+
+    def sparseCounts(self, key: str) -> tuple[np.ndarray, np.ndarray] | None:
+        """The non zero `(codes, counts)` of an entry alone, None if missing
+        or unreadable. Neither a hit nor a miss.
+        """
+        try:
+            with np.load(self.entryPath(key)) as npz:
+                return npz['code'].astype(np.int64), npz['count']
+        except (OSError, EOFError, KeyError, ValueError, zipfile.BadZipFile):
+            return None
+
+    def keys(self, limit: int | None = None) -> list[tuple[str, float, int]]:
+        """`(key, mtime, size)` of the entries, most recently used first."""
+        entries = self.entries()[::-1][:limit]
+        return [(path.stem, mtime, size) for mtime, size, path in entries]
+
+    def put(self, key: str, result: CountResult):
+        path = self.entryPath(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        codes = np.flatnonzero(result.counts)
+        clusters = result.clusters or {}
+        extra = {}
+        for n, table in (result.ngrams or {}).items():
+            extra[f'ngram{n}Key'] = table.keys
+            extra[f'ngram{n}Count'] = table.counts
+            extra[f'ngram{n}Info'] = np.array(
+                [table.total, table.error,
+                 -1 if table.capacity is None else table.capacity], dtype=np.int64)
+        if result.malformed is not None:
+            extra['malformed'] = result.malformed.entries
+            extra['malformedInfo'] = np.array([result.malformed.count,
+                                                result.malformed.nBytes], dtype=np.int64)
+        if result.positions is not None:
+            extra['positions'] = result.positions.entries
+        if result.lines is not None:
+            lines = result.lines
+            extra['lineLengths'] = lines.lengths
+            extra['lineInfo'] = np.array([lines.maxLength, lines.trailing,
+                                          lines.lf, lines.crlf, lines.cr], dtype=np.int64)
+            extra['wordScript'] = np.array(list(lines.words), dtype=np.str_)
+            extra['wordCount'] = np.array(list(lines.words.values()), dtype=np.int64)
+        if result.scriptRuns is not None:
+            runs = result.scriptRuns
+            extra['runScript'] = np.array(runs.scripts, dtype=np.str_)
+            extra['runLengths'] = runs.runLengths
+            extra['runCodes'] = runs.runCodes
+            extra['transitions'] = runs.transitions
+            extra['mixedToken'] = np.array(list(runs.tokens), dtype=np.str_)
+            extra['mixedCount'] = np.array(list(runs.tokens.values()), dtype=np.int64)
+            extra['mixedInfo'] = np.array([runs.mixed, runs.error, runs.capacity],
+                                          dtype=np.int64)
+
+        fd, tmp = tempfile.mkstemp(suffix='.npz', dir=path.parent)
+        try:
+            with os.fdopen(fd, 'wb') as file:
+                np.savez(file,
+                         code=codes.astype(np.uint32),
+                         count=result.counts[codes],
+                         nBytes=np.int64(result.nBytes),
+                         seconds=np.float64(result.seconds),
+                         cluster=np.array(list(clusters), dtype=np.str_),
+                         clusterCount=np.array(list(clusters.values()),
+                                               dtype=np.int64),
+                         nClusters=np.int64(result.nClusters),
+                         **extra)
+            os.replace(tmp, path)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+
+        self.evict()
+
+    def entries(self) -> list[tuple[float, int, Path]]:
+        """`(mtime, size, path)` of all entries, least recently used first."""
+        entries = []
+        for path in self.root.glob('*/*.npz'):
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+        entries.sort()
+        return entries
+
+    def evict(self) -> int:
+        """Remove least recently used entries beyond the budget."""
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, path in entries:
+            if total <= self.budget:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            removed += 1
+        return removed
+
+    def stats(self) -> dict:
+        entries = self.entries()
+        with self._lock:
+            return {'hits': self.hits,
+                    'misses': self.misses,
+                    'entries': len(entries),
+                    'bytes': sum(size for _, size, _ in entries),
+                    'budget': self.budget}
+
+
+@lru_cache(maxsize=1)
+def resultCache() -> ResultCache:
+    """The cache shared by all the sessions of the process."""
+    return ResultCache()
+
+# ******************************************************************************
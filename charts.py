@@ -0,0 +1,156 @@
+# ******************************************************************************
+# Copyright (c) 2025. All rights reserved.
+# # This work is licensed under the Creative Commons Attribution 4.0
+# International License. To view a copy of this license,
+# visit # http://creativecommons.org/licenses/by/4.0/.
+#
+# Author: roximn <roximn148@gmail.com>
+# ******************************************************************************
+from dataclasses import dataclass
+import math
+import time
+from typing import Callable
+
+import humanize
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+# ******************************************************************************
+# Bars drawn per page of the per character charts
+CHART_ROWS = 50
+MAX_CHART_ROWS = 500
+MIN_CHART_ROWS = 10
+# Largest serialized figure sent to the browser
+PAYLOAD_BUDGET = 512 * 1024
+# Series with more points are drawn with WebGL
+WEBGL_POINTS = 1000
+# Points of the distribution curves
+CURVE_POINTS = 4000
+
+ROW_HEIGHT = 24
+MIN_HEIGHT = 200
+OTHER = 'Other'
+
+# ******************************************************************************
+@dataclass
+class ChartWindow:
+    """A page of the rows of a frame, the others summed in one row."""
+    frame: pd.DataFrame
+    page: int
+    pages: int
+    start: int
+    stop: int
+    rows: int
+    other: int
+
+    def describe(self, noun: str = 'characters') -> str:
+        text = f'{noun.capitalize()} {self.start + 1:,}–{self.stop:,} of {self.rows:,} '\
+               f'(page {self.page} of {self.pages})'
+        if self.other:
+            text += f', the other {self.other:,} in one bar'
+        return text
+
+
+def chartWindow(df: pd.DataFrame, page: int, rows: int, label: str = 'unicode',
+                value: str = 'count', color: str | None = None,
+                noun: str = 'characters',
+                describe: Callable[[pd.DataFrame], pd.DataFrame] | None = None
+                ) -> ChartWindow:
+    """The rows of a page of a sorted frame, with an "other" row summing the
+    rows of the other pages.
+
+    Parameters:
+        df(DataFrame): The rows in chart order.
+        page(int): The page, from 1, clipped to the available pages.
+        rows(int): Rows per page.
+        label(str): Column of the bar labels.
+        value(str): Column of the bar values.
+        color(str | None): Column of the bar colors, set to `OTHER` in the
+            other row.
+        noun(str): What the rows are, in the label of the other row.
+        describe(Callable | None): Adds the columns of the rows shown not
+            kept by `df`, like their names.
+
+    Returns:
+        The window.
+    """
+    rows = max(rows, 1)
+    pages = max(math.ceil(len(df) / rows), 1)
+    page = min(max(int(page or 1), 1), pages)
+    start, stop = (page - 1) * rows, min(page * rows, len(df))
+    frame = df.iloc[start:stop]
+    other = len(df) - len(frame)
+    if describe is not None:
+        frame = describe(frame)
+    if other:
+        # Blank text columns, NaN is not valid in the widget messages
+        row = {c: '' for c in frame.columns
+               if not pd.api.types.is_numeric_dtype(frame[c])}
+        row[label] = f'{OTHER} ({other:,} {noun})'
+        row[value] = df[value].sum() - frame[value].sum()
+        if color is not None:
+            row[color] = OTHER
+        frame = pd.concat([frame, pd.DataFrame([row])], ignore_index=True)
+    return ChartWindow(frame=frame, page=page, pages=pages, start=start,
+                       stop=stop, rows=len(df), other=other)
+
+
+def chartHeight(nBars: int) -> int:
+    return max(nBars * ROW_HEIGHT, MIN_HEIGHT)
+
+
+def curvePoints(n: int, points: int = CURVE_POINTS) -> np.ndarray:
+    """Indices of at most `points` evenly spread rows, with the first and the
+    last ones.
+    """
+    if n <= points:
+        return np.arange(n)
+    return np.unique(np.linspace(0, n - 1, points).round().astype(np.int64))
+
+
+# ******************************************************************************
+@dataclass
+class ChartStats:
+    """Size and build time of a figure, for the chart captions."""
+    window: ChartWindow | None
+    payload: int
+    seconds: float
+    webgl: bool = False
+
+    def describe(self, noun: str = 'characters') -> str:
+        parts = [self.window.describe(noun)] if self.window is not None else []
+        parts.append(f'{humanize.naturalsize(self.payload, binary=True)} '
+                     f'built in {self.seconds * 1000:.0f} ms'
+                     + (' (WebGL)' if self.webgl else ''))
+        return '; '.join(parts)
+
+
+def budgetedFigure(build: Callable[[ChartWindow], go.Figure],
+                   window: Callable[[int], ChartWindow], rows: int,
+                   budget: int = PAYLOAD_BUDGET) -> tuple[go.Figure, ChartStats]:
+    """Build the figure of a window, with fewer rows if its payload exceeds
+    the budget.
+
+    Parameters:
+        build(Callable): Builds the figure of a window.
+        window(Callable): The window for a number of rows per page.
+        rows(int): The requested rows per page.
+        budget(int): Largest serialized figure in bytes.
+
+    Returns:
+        The figure and its stats.
+    """
+    t0 = time.perf_counter()
+    rows = min(max(int(rows or CHART_ROWS), MIN_CHART_ROWS), MAX_CHART_ROWS)
+    while True:
+        win = window(rows)
+        fig = build(win)
+        payload = len(fig.to_json())
+        if payload <= budget or rows <= MIN_CHART_ROWS:
+            break
+        rows = max(MIN_CHART_ROWS, int(rows * budget / payload * 0.9))
+    return fig, ChartStats(window=win, payload=payload,
+                           seconds=time.perf_counter() - t0)
+
+# ******************************************************************************
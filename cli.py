@@ -0,0 +1,124 @@
+# ******************************************************************************
+# Copyright (c) 2025. All rights reserved.
+# # This work is licensed under the Creative Commons Attribution 4.0
+# International License. To view a copy of this license,
+# visit # http://creativecommons.org/licenses/by/4.0/.
+#
+# Author: roximn <roximn148@gmail.com>
+# ******************************************************************************
+# Command line interface of the UTF analysis, without the Shiny app.
+#
+# Usage:
+#     shinomni-utf [options] file|glob ...
+#     python -m shinomni.cli [options] file|glob ...
+# ******************************************************************************
+import argparse
+from pathlib import Path
+import sys
+
+import humanize
+
+from .batch import (OUTPUT_FORMATS, FileAnalysis, analyzeCorpus, analyzeFiles,
+                    expandPaths, resultTables, writeTables)
+from .cache import ResultCache
+from .counting import CountOptions
+from .ngrams import NGRAM_CAPACITY, NGRAM_MODES
+from .properties import PROPERTIES
+from .sampling import ANALYSIS_MODES
+
+# ******************************************************************************
+def parseArgs(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog='shinomni-utf',
+        description='Count the Unicode characters, grapheme clusters, '
+                    'n-grams, lines, words and script runs of UTF-8 text files, '
+                    'as the UTF panel does.')
+    parser.add_argument('paths', nargs='+', metavar='PATH',
+                        help='Files, archives or glob patterns (** included).')
+    parser.add_argument('-o', '--output', type=Path, default=Path('.'),
+                        help='Directory of the characters, graphemes, ngrams, '
+                             'malformed, lines, words, scriptRuns, transitions, '
+                             'mixedTokens, risks, collisions and files tables '
+                             '(default: %(default)s).')
+    parser.add_argument('-f', '--format', choices=OUTPUT_FORMATS, default='csv',
+                        help='Format of the tables (default: %(default)s).')
+    parser.add_argument('-m', '--mode', choices=ANALYSIS_MODES, default='exact',
+                        help='Count exactly or estimate from a sample, auto '
+                             'estimates files of 1 GB and above '
+                             '(default: %(default)s).')
+    parser.add_argument('--ngrams', choices=NGRAM_MODES, default='auto',
+                        help='N-gram counts (default: %(default)s).')
+    parser.add_argument('--ngram-capacity', type=int, default=NGRAM_CAPACITY,
+                        help='N-grams kept by bounded counts (default: %(default)s).')
+    parser.add_argument('--errors', choices=('replace', 'strict'), default='replace',
+                        help='Replace and index the malformed UTF-8 sequences, '
+                             'or fail the file (default: %(default)s).')
+    parser.add_argument('--script-runs', action='store_true',
+                        help='Segment the script runs and find the mixed-script '
+                             'tokens.')
+    parser.add_argument('-p', '--property', action='append', default=[],
+                        choices=list(PROPERTIES), dest='properties',
+                        help='Add the column of a character property to the '
+                             'characters table, repeatable.')
+    parser.add_argument('-a', '--aggregate', action='store_true',
+                        help='Count all the files together, expanding archives, '
+                             'as the UTF panel does with several uploads.')
+    parser.add_argument('--cache', type=Path, default=None, metavar='DIR',
+                        help='Cache the exact results in this directory.')
+    parser.add_argument('-q', '--quiet', action='store_true',
+                        help='Do not report every file.')
+    return parser.parse_args(argv)
+
+
+def report(analysis: FileAnalysis):
+    if analysis.error is not None:
+        print(f'{analysis.name}: error: {analysis.error}', file=sys.stderr)
+        return
+    result = analysis.result
+    print(f'{analysis.name}: {humanize.naturalsize(result.nBytes, binary=True)}, '
+          f'{int(result.counts.sum()):,} characters, '
+          f'{(result.counts > 0).sum():,} distinct'
+          + (' (cached)' if analysis.cached else f', {result.seconds:.2f} s'),
+          file=sys.stderr)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parseArgs(argv)
+    paths = expandPaths(args.paths)
+    if not paths:
+        print('No files to analyse.', file=sys.stderr)
+        return 2
+
+    options = CountOptions(ngrams=args.ngrams,
+                           ngramCapacity=max(args.ngram_capacity, 1),
+                           errors=args.errors, scriptRuns=args.script_runs)
+    if args.aggregate:
+        analyses = [analyzeCorpus(paths, options)]
+    else:
+        cache = ResultCache(args.cache) if args.cache is not None else None
+        analyses = []
+        for analysis in analyzeFiles(paths, args.mode, options, cache):
+            if not args.quiet:
+                report(analysis)
+            analyses.append(analysis)
+
+    try:
+        written = writeTables(resultTables(analyses, args.properties),
+                              args.output, args.format)
+    except (ImportError, OSError, ValueError) as e:
+        print(f'Error writing results: {e}', file=sys.stderr)
+        return 1
+    if not args.quiet:
+        for path in written:
+            print(f'Wrote {path}', file=sys.stderr)
+
+    failed = any(a.error is not None for a in analyses)
+    if args.aggregate and analyses[0].files is not None:
+        failed = failed or analyses[0].files['error'].notna().any()
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
+
+# ******************************************************************************
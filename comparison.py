@@ -0,0 +1,183 @@
+# ******************************************************************************
+# Copyright (c) 2025. All rights reserved.
+# # This work is licensed under the Creative Commons Attribution 4.0
+# International License. To view a copy of this license,
+# visit # http://creativecommons.org/licenses/by/4.0/.
+#
+# Author: roximn <roximn148@gmail.com>
+# ******************************************************************************
+from dataclasses import dataclass
+import math
+
+import numpy as np
+import pandas as pd
+
+from .ucd import CODESPACE, ucdTable
+
+# ******************************************************************************
+# Pseudo count added to every character of either text for the KL divergences
+KL_PRIOR = 0.5
+
+# ******************************************************************************
+@dataclass
+class Divergence:
+    """How far apart the character distributions of two texts are.
+
+    Parameters:
+        klAB(float): KL divergence of B from A, in bits, with `KL_PRIOR`
+            added to the counts of the characters of either text.
+        klBA(float): KL divergence of A from B, in bits.
+        js(float): Jensen-Shannon divergence in bits, between 0 and 1.
+        chi2(float): Chi-square statistic of the homogeneity of the two
+            count vectors.
+        dof(int): Degrees of freedom of `chi2`.
+        pValue(float): Approximate p-value of `chi2` (Wilson-Hilferty).
+        cramersV(float): Effect size of `chi2`, between 0 and 1, comparable
+            across text sizes unlike the p-value.
+    """
+    klAB: float
+    klBA: float
+    js: float
+    chi2: float
+    dof: int
+    pValue: float
+    cramersV: float
+
+
+def divergence(a: np.ndarray, b: np.ndarray) -> Divergence:
+    """The divergences of two aligned count vectors."""
+    a = np.asarray(a, dtype=np.float64)
+    b = np.asarray(b, dtype=np.float64)
+    # Characters of neither text take no part
+    present = (a > 0) | (b > 0)
+    a, b = a[present], b[present]
+    totalA, totalB = a.sum(), b.sum()
+    if totalA <= 0 or totalB <= 0:
+        return Divergence(0.0, 0.0, 0.0, 0.0, 0, 1.0, 0.0)
+
+    # KL with a prior, a character missing from one text would make it infinite
+    p = (a + KL_PRIOR) / (totalA + KL_PRIOR * len(a))
+    q = (b + KL_PRIOR) / (totalB + KL_PRIOR * len(b))
+    klAB = float(np.sum(p * np.log2(p / q)))
+    klBA = float(np.sum(q * np.log2(q / p)))
+
+    p, q = a / totalA, b / totalB
+    m = (p + q) / 2
+
+    def kl(x: np.ndarray) -> float:
+        nz = x > 0
+        return float(np.sum(x[nz] * np.log2(x[nz] / m[nz])))
+
+    js = (kl(p) + kl(q)) / 2
+
+    # 2 x K contingency table of the counts
+    total = totalA + totalB
+    column = a + b
+    expectedA, expectedB = column * totalA / total, column * totalB / total
+    chi2 = float(np.sum((a - expectedA) ** 2 / expectedA)
+                 + np.sum((b - expectedB) ** 2 / expectedB))
+    dof = max(len(a) - 1, 0)
+    return Divergence(klAB=klAB, klBA=klBA, js=js, chi2=chi2, dof=dof,
+                      pValue=chiSquareP(chi2, dof),
+                      cramersV=math.sqrt(chi2 / total) if total else 0.0)
+
+
+def chiSquareP(chi2: float, dof: int) -> float:
+    """Upper tail probability of the chi-square distribution by the
+    Wilson-Hilferty normal approximation.
+    """
+    if dof <= 0:
+        return 1.0
+    k = 2 / (9 * dof)
+    z = ((chi2 / dof) ** (1 / 3) - (1 - k)) / math.sqrt(k)
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+
+# ******************************************************************************
+@dataclass
+class Comparison:
+    """Two texts compared character by character.
+
+    Parameters:
+        chars(DataFrame): The characters of either text with their counts
+            (`countA`, `countB`), shares, `delta` (of the shares, B - A) and
+            `log2Ratio` (of the shares, with `KL_PRIOR`), by code point.
+        blocks(DataFrame): The same by block.
+        scripts(DataFrame): The same by script.
+        divergence(Divergence): The divergences of the characters.
+        totalA(int): Characters in A.
+        totalB(int): Characters in B.
+    """
+    chars: pd.DataFrame
+    blocks: pd.DataFrame
+    scripts: pd.DataFrame
+    divergence: Divergence
+    totalA: int
+    totalB: int
+
+    @property
+    def onlyA(self) -> int:
+        """Distinct characters of A missing from B."""
+        return int(((self.chars['countA'] > 0) & (self.chars['countB'] == 0)).sum())
+
+    @property
+    def onlyB(self) -> int:
+        """Distinct characters of B missing from A."""
+        return int(((self.chars['countB'] > 0) & (self.chars['countA'] == 0)).sum())
+
+
+def deltaFrame(df: pd.DataFrame, totalA: int, totalB: int) -> pd.DataFrame:
+    """Add the shares, their difference and log ratio to a frame of `countA`
+    and `countB` columns.
+    """
+    a = df['countA'].to_numpy(dtype=np.float64)
+    b = df['countB'].to_numpy(dtype=np.float64)
+    df['shareA'] = a / totalA if totalA else 0.0
+    df['shareB'] = b / totalB if totalB else 0.0
+    df['delta'] = df['shareB'] - df['shareA']
+    n = len(df)
+    df['log2Ratio'] = np.log2(((b + KL_PRIOR) / (totalB + KL_PRIOR * n))
+                              / ((a + KL_PRIOR) / (totalA + KL_PRIOR * n)))
+    return df
+
+
+def denseCounts(codes: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    """Counts indexed by code point from the non zero ones."""
+    dense = np.zeros(CODESPACE, dtype=np.int64)
+    dense[codes] = counts
+    return dense
+
+
+def compareCounts(a: np.ndarray, b: np.ndarray) -> Comparison:
+    """Compare the counts of two texts indexed by code point.
+
+    Parameters:
+        a(ndarray): Counts of A by code point.
+        b(ndarray): Counts of B by code point, of the same length.
+
+    Returns:
+        The comparison.
+    """
+    codes = np.flatnonzero((a > 0) | (b > 0))
+    countA, countB = a[codes], b[codes]
+    totalA, totalB = int(countA.sum()), int(countB.sum())
+    chars = pd.DataFrame({
+        'char': [chr(c) for c in codes.tolist()],
+        'code': codes.astype(np.int64),
+        'countA': countA,
+        'countB': countB,
+    })
+    chars = ucdTable().describe(chars)
+
+    def grouped(column: str) -> pd.DataFrame:
+        df = (chars.groupby(column, observed=True)[['countA', 'countB']].sum()
+              .reset_index())
+        return deltaFrame(df, totalA, totalB)
+
+    blocks, scripts = grouped('block'), grouped('script')
+    chars = deltaFrame(chars, totalA, totalB)
+    return Comparison(chars=chars, blocks=blocks, scripts=scripts,
+                      divergence=divergence(countA, countB),
+                      totalA=totalA, totalB=totalB)
+
+# ******************************************************************************
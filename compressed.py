@@ -0,0 +1,122 @@
+# ******************************************************************************
+# Copyright (c) 2025. All rights reserved.
+# # This work is licensed under the Creative Commons Attribution 4.0
+# International License. To view a copy of this license,
+# visit # http://creativecommons.org/licenses/by/4.0/.
+#
+# Author: roximn <roximn148@gmail.com>
+# ******************************************************************************
+import bz2
+import gzip
+import lzma
+from pathlib import Path
+import queue
+import threading
+from typing import BinaryIO, Iterator
+
+from .counting import BLOCK_SIZE, iterByteBlocks, iterStreamBlocks
+
+# ******************************************************************************
+# Leading bytes of the compressed formats
+MAGIC_BYTES = {
+    'gzip': b'\x1f\x8b',
+    'bz2': b'BZh',
+    'xz': b'\xfd7zXZ\x00',
+}
+# Decompressed blocks waiting to be counted
+QUEUE_BLOCKS = 4
+
+# ******************************************************************************
+def compressionOf(path: Path | str) -> str | None:
+    """The compression of a file by its magic bytes, 'gzip', 'bz2', 'xz' or
+    None for an uncompressed file.
+    """
+    with Path(path).open('rb') as file:
+        head = file.read(max(len(m) for m in MAGIC_BYTES.values()))
+    for kind, magic in MAGIC_BYTES.items():
+        if head.startswith(magic):
+            return kind
+    return None
+
+
+def openDecompressed(raw: BinaryIO, kind: str) -> BinaryIO:
+    """A binary stream of the decompressed content of a raw stream."""
+    if kind == 'gzip':
+        return gzip.GzipFile(fileobj=raw, mode='rb')
+    if kind == 'bz2':
+        return bz2.BZ2File(raw, mode='rb')
+    if kind == 'xz':
+        return lzma.LZMAFile(raw, mode='rb')
+    raise ValueError(f'Unknown compression: {kind}')
+
+
+def iterDecompressedBlocks(path: Path | str, kind: str, blockSize: int = BLOCK_SIZE,
+                           depth: int = QUEUE_BLOCKS) -> Iterator[tuple[bytes, int]]:
+    """Decompress a file on a background thread and yield its blocks split at
+    UTF-8 boundaries.
+
+    The file is read and decompressed by a thread a few blocks ahead of the
+    consumer, so that decompression overlaps with the counting (zlib, bz2
+    and lzma release the GIL). Nothing is written to disk. Closing the
+    generator stops the thread.
+
+    Parameters:
+        path(Path | str): The compressed file.
+        kind(str): The compression, as given by `compressionOf`.
+        blockSize(int): Number of decompressed bytes read at a time.
+        depth(int): Number of blocks decompressed ahead.
+
+    Returns:
+        The blocks with the number of compressed bytes read so far.
+    """
+    blocks: queue.Queue = queue.Queue(maxsize=max(depth, 1))
+    stop = threading.Event()
+    done = object()
+
+    def put(item) -> bool:
+        while not stop.is_set():
+            try:
+                blocks.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def produce():
+        try:
+            with Path(path).open('rb') as raw, openDecompressed(raw, kind) as stream:
+                for data in iterStreamBlocks(stream, blockSize):
+                    if not put((data, raw.tell())):
+                        return
+            put(done)
+        except Exception as e:
+            put(e)
+
+    thread = threading.Thread(target=produce, daemon=True,
+                              name=f'decompress-{Path(path).name}')
+    thread.start()
+    try:
+        while True:
+            item = blocks.get()
+            if item is done:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        stop.set()
+        thread.join()
+
+
+def iterFileBlocks(path: Path | str, blockSize: int = BLOCK_SIZE) -> Iterator[bytes]:
+    """Yield the blocks of a file split at UTF-8 boundaries, decompressing
+    gzip, bz2 and xz files on the fly.
+    """
+    kind = compressionOf(path)
+    if kind is None:
+        yield from iterByteBlocks(path, blockSize)
+    else:
+        for data, _ in iterDecompressedBlocks(path, kind, blockSize):
+            yield data
+
+# ******************************************************************************
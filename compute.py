@@ -0,0 +1,282 @@
+# ******************************************************************************
+# Copyright (c) 2025. All rights reserved.
+# # This work is licensed under the Creative Commons Attribution 4.0
+# International License. To view a copy of this license,
+# visit # http://creativecommons.org/licenses/by/4.0/.
+#
+# Author: roximn <roximn148@gmail.com>
+# ******************************************************************************
+import asyncio
+from collections import deque
+from concurrent.futures import CancelledError, Future, InvalidStateError
+from dataclasses import dataclass
+from functools import lru_cache
+import os
+import threading
+import time
+from typing import Callable
+
+from .counting import MAX_WORKERS, workerPool
+
+# ******************************************************************************
+# Tasks waiting for a worker, beyond which new tasks are refused
+QUEUE_LIMIT = 64
+# Tasks of a session running at the same time, the others wait their turn
+SESSION_LIMIT = 2
+# Latest waits kept for the metrics
+WAIT_HISTORY = 256
+
+# ******************************************************************************
+class QueueFull(RuntimeError):
+    """The compute queue is full, the task was refused."""
+
+
+@dataclass(frozen=True)
+class ComputeStats:
+    """Metrics of the compute backend.
+
+    Parameters:
+        queued(int): Tasks waiting for a worker, the queue depth.
+        running(int): Tasks running in the worker processes.
+        completed(int): Tasks completed, failed ones included.
+        rejected(int): Tasks refused by a full queue.
+        cancelled(int): Tasks cancelled before completing.
+        meanWait(float): Mean seconds waited by the latest tasks started.
+        maxWait(float): Longest of these waits.
+        oldestWait(float): Seconds waited so far by the oldest queued task.
+        capacity(int): Tasks running at the same time at most.
+    """
+    queued: int = 0
+    running: int = 0
+    completed: int = 0
+    rejected: int = 0
+    cancelled: int = 0
+    meanWait: float = 0.0
+    maxWait: float = 0.0
+    oldestWait: float = 0.0
+    capacity: int = 0
+
+    def describe(self) -> str:
+        return (f'Compute queue: {self.queued} waiting, {self.running} of '
+                f'{self.capacity} running, wait {self.meanWait * 1000:,.0f} ms '
+                f'on average (longest {self.maxWait * 1000:,.0f} ms), '
+                f'{self.completed:,} completed, {self.cancelled:,} cancelled, '
+                f'{self.rejected:,} refused.')
+
+
+# ******************************************************************************
+class ComputeTask:
+    """A function called in a worker process on behalf of a session.
+
+    Parameters:
+        owner(str): The session the task belongs to.
+        label(str): What the task computes, for the UI.
+        fn(Callable): A module level function, as the pool pickles it.
+        args(tuple): Its arguments.
+    """
+    def __init__(self, owner: str, label: str, fn: Callable, args: tuple):
+        self.owner = owner
+        self.label = label
+        self.fn = fn
+        self.args = args
+        self.future: Future = Future()
+        self.submitted = time.perf_counter()
+        self.started: float | None = None
+
+    @property
+    def state(self) -> str:
+        """'queued', 'running', 'done' or 'cancelled'."""
+        if self.future.cancelled() or (self.future.done()
+                                       and isinstance(self.future.exception(), CancelledError)):
+            return 'cancelled'
+        if self.future.done():
+            return 'done'
+        return 'queued' if self.started is None else 'running'
+
+    @property
+    def wait(self) -> float:
+        """Seconds waited for a worker, so far if still queued."""
+        return (self.started or time.perf_counter()) - self.submitted
+
+    def cancel(self):
+        """Drop the task if queued, discard its result if running."""
+        if not self.future.cancel():
+            try:
+                self.future.set_exception(CancelledError())
+            except InvalidStateError:
+                # Completed meanwhile
+                pass
+
+
+# ******************************************************************************
+class ComputeBackend:
+    """Heavy calculations of the sessions, run over the shared process pool
+    so that they never block the event loop.
+
+    Tasks wait in a bounded first in, first out queue, a task being refused
+    with `QueueFull` once `queueLimit` tasks are waiting. A session runs at
+    most `sessionLimit` tasks at a time, so one user cannot take all the
+    workers, its other tasks keep their place in the queue while the tasks
+    of the other sessions go ahead. Cancelled tasks leave the queue at once,
+    the result of a running task is discarded when it completes.
+    """
+    def __init__(self, capacity: int | None = None, queueLimit: int = QUEUE_LIMIT,
+                 sessionLimit: int = SESSION_LIMIT):
+        self.capacity = capacity or max(1, min(os.cpu_count() or 1, MAX_WORKERS))
+        self.queueLimit = queueLimit
+        self.sessionLimit = sessionLimit
+        self._queue: deque[ComputeTask] = deque()
+        self._running: dict[str, list[ComputeTask]] = {}
+        self._waits: deque[float] = deque(maxlen=WAIT_HISTORY)
+        self._completed = 0
+        self._rejected = 0
+        self._cancelled = 0
+        self._lock = threading.Lock()
+
+    def submit(self, owner: str, fn: Callable, *args, label: str = '') -> ComputeTask:
+        """Queue a call of `fn(*args)` in a worker process.
+
+        Raises:
+            QueueFull: When `queueLimit` tasks are already waiting.
+        """
+        task = ComputeTask(owner, label, fn, args)
+        with self._lock:
+            self._prune()
+            if len(self._queue) >= self.queueLimit:
+                self._rejected += 1
+                raise QueueFull(f'{len(self._queue)} tasks are waiting, '
+                                f'try again later')
+            self._queue.append(task)
+        task.future.add_done_callback(lambda _: self._dispatch())
+        self._dispatch()
+        return task
+
+    async def run(self, owner: str, fn: Callable, *args, label: str = ''):
+        """Call `fn(*args)` in a worker process and wait for the result,
+        cancelling the task when the caller is cancelled.
+        """
+        task = self.submit(owner, fn, *args, label=label)
+        try:
+            return await asyncio.wrap_future(task.future)
+        except asyncio.CancelledError:
+            task.cancel()
+            raise
+
+    def cancel(self, owner: str, label: str | None = None) -> int:
+        """Cancel the tasks of a session, those computing `label` only if
+        given, returning the number of tasks cancelled.
+        """
+        with self._lock:
+            tasks = [t for t in [*self._queue, *self._running.get(owner, [])]
+                     if t.owner == owner and (label is None or t.label == label)]
+        for task in tasks:
+            task.cancel()
+        return len(tasks)
+
+    def pending(self, owner: str) -> list[ComputeTask]:
+        """The tasks of a session not completed yet, queued or running."""
+        with self._lock:
+            return [t for t in [*self._running.get(owner, []), *self._queue]
+                    if t.owner == owner and not t.future.done()]
+
+    def position(self, task: ComputeTask) -> int:
+        """The number of tasks ahead of a queued one, -1 if not queued."""
+        with self._lock:
+            for i, queued in enumerate(self._queue):
+                if queued is task:
+                    return i
+        return -1
+
+    def describe(self, owner: str) -> str:
+        """The state of the pending tasks of a session, for the UI."""
+        states = []
+        for task in self.pending(owner):
+            if task.state == 'queued':
+                states.append(f'{task.label.capitalize()} queued behind '
+                              f'{self.position(task)} task(s) for {task.wait:.1f} s')
+            else:
+                states.append(f'{task.label.capitalize()} running for '
+                              f'{time.perf_counter() - task.started:.1f} s')
+        return '. '.join(states)
+
+    def stats(self) -> ComputeStats:
+        with self._lock:
+            self._prune()
+            waits = list(self._waits)
+            return ComputeStats(
+                queued=len(self._queue),
+                running=sum(len(r) for r in self._running.values()),
+                completed=self._completed, rejected=self._rejected,
+                cancelled=self._cancelled,
+                meanWait=sum(waits) / len(waits) if waits else 0.0,
+                maxWait=max(waits, default=0.0),
+                oldestWait=self._queue[0].wait if self._queue else 0.0,
+                capacity=self.capacity)
+
+    # --------------------------------------------------------------------------
+    def _prune(self):
+        """Drop the cancelled tasks from the queue, with the lock held."""
+        if any(t.future.done() for t in self._queue):
+            kept = deque(t for t in self._queue if not t.future.done())
+            self._cancelled += len(self._queue) - len(kept)
+            self._queue = kept
+
+    def _dispatch(self):
+        """Start the queued tasks the limits allow, oldest first."""
+        started = []
+        with self._lock:
+            self._prune()
+            running = sum(len(r) for r in self._running.values())
+            for task in list(self._queue):
+                if running >= self.capacity:
+                    break
+                owned = self._running.setdefault(task.owner, [])
+                if len(owned) >= self.sessionLimit:
+                    continue
+                self._queue.remove(task)
+                if not task.future.set_running_or_notify_cancel():
+                    self._cancelled += 1
+                    continue
+                task.started = time.perf_counter()
+                self._waits.append(task.wait)
+                owned.append(task)
+                running += 1
+                started.append(task)
+
+        for task in started:
+            try:
+                future = workerPool().submit(task.fn, *task.args)
+            except Exception as e:
+                self._finished(task, None, e)
+                continue
+            future.add_done_callback(lambda f, task=task: self._finished(task, f))
+
+    def _finished(self, task: ComputeTask, future: Future | None,
+                  error: BaseException | None = None):
+        with self._lock:
+            owned = self._running.get(task.owner, [])
+            if task in owned:
+                owned.remove(task)
+            if not owned:
+                self._running.pop(task.owner, None)
+            if task.future.done():
+                self._cancelled += 1
+            else:
+                self._completed += 1
+        try:
+            if future is not None and future.exception() is None:
+                task.future.set_result(future.result())
+            else:
+                task.future.set_exception(error or future.exception())
+        except InvalidStateError:
+            # Cancelled meanwhile, the result is discarded
+            pass
+        self._dispatch()
+
+
+@lru_cache(maxsize=1)
+def computeBackend() -> ComputeBackend:
+    """The backend shared by all the sessions of the process."""
+    return ComputeBackend()
+
+# ******************************************************************************
@@ -0,0 +1,223 @@
+# ******************************************************************************
+# Copyright (c) 2025. All rights reserved.
+# # This work is licensed under the Creative Commons Attribution 4.0
+# International License. To view a copy of this license,
+# visit # http://creativecommons.org/licenses/by/4.0/.
+#
+# Author: roximn <roximn148@gmail.com>
+# ******************************************************************************
+from concurrent.futures import FIRST_COMPLETED, wait
+from dataclasses import dataclass, replace
+import os
+from pathlib import Path
+import tarfile
+import zipfile
+
+import numpy as np
+import pandas as pd
+
+from .compressed import iterFileBlocks
+from .counting import (BLOCK_SIZE, MAX_WORKERS, CodeCounter, CountOptions,
+                       iterStreamBlocks)
+from .streaming import SNAPSHOT_BYTES, BackgroundCount
+
+# ******************************************************************************
+@dataclass
+class Member:
+    """A text file to count, either an upload or a member of an archive."""
+    name: str
+    source: str
+    kind: str = 'file'          # 'file', 'zip' or 'tar'
+    member: str | None = None
+    size: int = 0               # Bytes of the source accounted to the member
+
+
+def isArchive(path: Path | str) -> bool:
+    """Whether the file is a zip or a (compressed) tar archive."""
+    return zipfile.is_zipfile(path) or tarfile.is_tarfile(path)
+
+
+def listMembers(uploads: list[dict]) -> list[Member]:
+    """Expand the uploaded files into the text files to count.
+
+    Zip archives are listed by their central directory, tar archives (also
+    compressed ones) are listed as a single member and streamed when counted.
+
+    Parameters:
+        uploads(list[dict]): File infos of `input_file`, having `name`,
+            `size` and `datapath`.
+
+    Returns:
+        The members in upload order.
+    """
+    members = []
+    for upload in uploads:
+        name = upload.get('name', '<???>')
+        path = upload['datapath']
+        size = upload.get('size') or Path(path).stat().st_size
+        if zipfile.is_zipfile(path):
+            with zipfile.ZipFile(path) as zf:
+                for info in zf.infolist():
+                    if not info.is_dir():
+                        members.append(Member(name=f'{name}/{info.filename}',
+                                              source=path, kind='zip',
+                                              member=info.filename,
+                                              size=info.compress_size))
+        elif tarfile.is_tarfile(path):
+            members.append(Member(name=name, source=path, kind='tar', size=size))
+        else:
+            members.append(Member(name=name, source=path, size=size))
+    return members
+
+
+# ******************************************************************************
+def countBlocks(blocks, options: CountOptions | None = None) -> tuple[CodeCounter, int]:
+    """Count the blocks, returning the counter and the number of bytes."""
+    counter = CodeCounter(options)
+    nBytes = 0
+    for data in blocks:
+        counter.feed(data)
+        nBytes += len(data)
+    return counter, nBytes
+
+
+def countMember(member: Member, blockSize: int = BLOCK_SIZE,
+                options: CountOptions | None = None):
+    """Count a file, decompressed if needed, or a zip member in a worker
+    process."""
+    if member.kind == 'zip':
+        with zipfile.ZipFile(member.source) as zf, zf.open(member.member) as stream:
+            return countBlocks(iterStreamBlocks(stream, blockSize), options)
+    return countBlocks(iterFileBlocks(member.source, blockSize), options)
+
+
+# ******************************************************************************
+class CorpusCount(BackgroundCount):
+    """Count many files and archive members over a process pool.
+
+    Members are never extracted to disk, plain files and zip members are
+    opened by the workers themselves. Tar archives can only be read
+    sequentially, their members are streamed block by block on the
+    coordinating thread while the workers are busy with the rest. Besides
+    the aggregate counts a per-file breakdown is published in the snapshots,
+    a member that cannot be read is reported there instead of failing the
+    whole corpus.
+    """
+    def __init__(self, uploads: list[dict], snapshotBytes: int = SNAPSHOT_BYTES,
+                 workers: int | None = None, blockSize: int = BLOCK_SIZE,
+                 options: CountOptions | None = None, owner: str | None = None):
+        self.members = listMembers(uploads)
+        self.workers = workers or max(1, min(os.cpu_count() or 1, MAX_WORKERS))
+        self.blockSize = blockSize
+        # Offsets are those of a single file, the occurrences are not indexed
+        self.options = replace(options or CountOptions(), positions=False)
+        self.rows: list[dict] = []
+        self._counter = CodeCounter(self.options)
+        self._nBytes = 0
+        self._lastSnapshot = 0
+        super().__init__(sum(m.size for m in self.members), snapshotBytes, owner)
+
+    def _breakdown(self) -> pd.DataFrame:
+        return pd.DataFrame(self.rows, columns=['file', 'bytes', 'count',
+                                                'distinct', 'graphemes', 'error'])
+
+    def _advance(self, size: int):
+        self._nBytes += size
+        if self.snapshotBytes > 0 and self._nBytes - self._lastSnapshot >= self.snapshotBytes:
+            self._lastSnapshot = self._nBytes
+            self._publish(self._nBytes, self._counter, files=self._breakdown())
+        else:
+            self._publish(self._nBytes)
+
+    def _record(self, name: str, size: int, result=None, error: str | None = None):
+        """Add the counts of a member to the aggregate and the breakdown."""
+        if error is not None:
+            print(f"Error reading file: {name}: {error}")
+            self.rows.append({'file': name, 'bytes': 0, 'count': 0,
+                              'distinct': 0, 'graphemes': 0, 'error': error})
+        else:
+            counter, nBytes = result
+            self._counter.merge(counter)
+            counts = counter.result()
+            self.rows.append({'file': name, 'bytes': nBytes,
+                              'count': int(counts.sum()),
+                              'distinct': int(np.count_nonzero(counts)),
+                              'graphemes': counter.graphemes.result()[1]
+                                           if counter.graphemes else None,
+                              'error': None})
+        self._advance(size)
+
+    def _run(self):
+        pending = {}
+
+        def collect(block: bool):
+            if not pending:
+                return
+            done, _ = wait(pending, timeout=None if block else 0,
+                           return_when=FIRST_COMPLETED)
+            for future in done:
+                name, size = pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    self._record(name, size, error=str(e))
+                else:
+                    self._record(name, size, result)
+
+        try:
+            for member in self.members:
+                if self.cancelled:
+                    break
+                if member.kind == 'tar':
+                    self._countTar(member, lambda: collect(block=False))
+                    continue
+                while len(pending) >= 2 * self.workers:
+                    collect(block=True)
+                future = self._submit(countMember, member, self.blockSize,
+                                      self.options)
+                pending[future] = (member.name, member.size)
+
+            while pending and not self.cancelled:
+                collect(block=True)
+        except Exception as e:
+            print(f"Error reading file: {e}")
+            self._publish(0, done=True, error=str(e))
+            return
+        finally:
+            for future in pending:
+                future.cancel()
+
+        if not self.cancelled:
+            self._publish(self.total, self._counter, done=True,
+                          files=self._breakdown())
+
+    def _countTar(self, member: Member, poll):
+        """Stream the members of a tar archive on the calling thread."""
+        position = 0
+        try:
+            with open(member.source, 'rb') as raw, \
+                 tarfile.open(fileobj=raw, mode='r|*') as tf:
+                for info in tf:
+                    if self.cancelled:
+                        return
+                    if not info.isfile():
+                        continue
+                    name = f'{member.name}/{info.name}'
+                    try:
+                        result = countBlocks(iterStreamBlocks(tf.extractfile(info),
+                                                              self.blockSize),
+                                             self.options)
+                    except UnicodeDecodeError as e:
+                        result, error = None, str(e)
+                    else:
+                        error = None
+                    size, position = raw.tell() - position, raw.tell()
+                    self._record(name, size, result, error)
+                    poll()
+        except (OSError, EOFError, tarfile.TarError) as e:
+            self._record(member.name, member.size - position, error=str(e))
+        else:
+            # Trailing blocks of the archive
+            self._advance(member.size - position)
+
+# ******************************************************************************
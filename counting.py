@@ -0,0 +1,506 @@
+# ******************************************************************************
+# Copyright (c) 2025. All rights reserved.
+# # This work is licensed under the Creative Commons Attribution 4.0
+# International License. To view a copy of this license,
+# visit # http://creativecommons.org/licenses/by/4.0/.
+#
+# Author: roximn <roximn148@gmail.com>
+# ******************************************************************************
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+import mmap
+import multiprocessing
+import os
+from pathlib import Path
+import re
+import threading
+import time
+from typing import Iterator
+
+import numpy as np
+import pandas as pd
+
+from .graphemes import GraphemeCounter
+from .lines import LineCounter, LineStats
+from .malformed import MalformedIndex, decodeReplacing
+from .ngrams import NGRAM_CAPACITY, NGRAM_SIZES, NgramCounter, NgramResult
+from .positions import PositionIndex
+from .scriptruns import ScriptRunCounter, ScriptRunStats
+from .ucd import CODESPACE, ucdTable
+
+# ******************************************************************************
+BLOCK_SIZE = 16 * 1024 * 1024
+
+# Bumped whenever a change alters the results, invalidates cached analyses
+ANALYSIS_VERSION = 2
+
+# Files smaller than this are always counted in the calling process
+PARALLEL_MIN_BYTES = 64 * 1024 * 1024
+MAX_WORKERS = 16
+
+CR, LF = 0x0D, 0x0A
+
+# Shard bounds are moved to a grapheme cluster boundary within this distance
+SHARD_SEARCH = 1024 * 1024
+ASCII_PAIR = re.compile(rb'[\x00-\x7F]{2}')
+
+# ******************************************************************************
+def utf8Boundary(buf, pos: int) -> int:
+    """Move `pos` back to the start of the UTF-8 sequence it falls into.
+
+    Parameters:
+        buf: The bytes like object being split.
+        pos(int): The tentative split position.
+
+    Returns:
+        The nearest position at or before `pos` that does not split a
+        multi-byte sequence.
+    """
+    if pos >= len(buf):
+        return len(buf)
+    # Continuation bytes are 0b10xxxxxx, a sequence has at most three of them
+    for lead in range(pos, max(pos - 4, -1), -1):
+        if (buf[lead] & 0xC0) != 0x80:
+            return lead
+    # Stray continuation bytes of malformed text, no sequence spans `pos`
+    return pos
+
+
+def decodeBlock(data: bytes, malformed: MalformedIndex | None = None,
+                offset: int = 0) -> np.ndarray:
+    """Decode a block of UTF-8 bytes into an array of code points.
+
+    Malformed sequences raise `UnicodeDecodeError` unless an index is given,
+    they are then replaced by U+FFFD and recorded into it at the `offset` of
+    the block. Valid blocks are decoded by the same fast path either way.
+    """
+    if data.isascii():
+        return np.frombuffer(data, dtype=np.uint8)
+    try:
+        text = data.decode('utf-8')
+    except UnicodeDecodeError:
+        if malformed is None:
+            raise
+        text, ranges = decodeReplacing(data)
+        malformed.add(offset, ranges, data)
+    return np.frombuffer(text.encode('utf-32-le'), dtype='<u4')
+
+
+def iterByteBlocks(path: Path | str, blockSize: int = BLOCK_SIZE,
+                   start: int = 0, end: int | None = None) -> Iterator[bytes]:
+    """Memory map a file and yield blocks split at UTF-8 boundaries."""
+    with Path(path).open('rb') as file:
+        size = file.seek(0, 2)
+        end = size if end is None else min(end, size)
+        if start >= end:
+            return
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            pos = start
+            while pos < end:
+                stop = utf8Boundary(mm, min(pos + blockSize, end))
+                if stop <= pos:
+                    # Block smaller than a sequence, take the whole sequence
+                    stop = pos + 1
+                    while stop < end and (mm[stop] & 0xC0) == 0x80:
+                        stop += 1
+                yield mm[pos:stop]
+                pos = stop
+
+
+def utf8SequenceLength(lead: int) -> int:
+    """Length of the UTF-8 sequence starting with the given byte."""
+    if lead >= 0xF0:
+        return 4
+    if lead >= 0xE0:
+        return 3
+    if lead >= 0xC0:
+        return 2
+    return 1
+
+
+def iterStreamBlocks(stream, blockSize: int = BLOCK_SIZE) -> Iterator[bytes]:
+    """Read a binary stream and yield blocks split at UTF-8 boundaries.
+
+    A sequence left incomplete at the end of a read is carried over to the
+    next block.
+    """
+    tail = b''
+    while True:
+        chunk = stream.read(blockSize)
+        if not chunk:
+            break
+        data = tail + chunk if tail else chunk
+        lead = utf8Boundary(data, len(data) - 1)
+        cut = len(data)
+        if lead + utf8SequenceLength(data[lead]) > len(data):
+            cut = lead
+        tail = data[cut:]
+        if cut > 0:
+            yield data[:cut]
+    if tail:
+        yield tail
+
+
+# ******************************************************************************
+@dataclass(frozen=True)
+class CountOptions:
+    """What is counted besides the code points."""
+    graphemes: bool = True
+    ngrams: str = 'off'             # 'exact', 'bounded' or 'off'
+    ngramCapacity: int = NGRAM_CAPACITY
+    errors: str = 'strict'          # 'strict' or 'replace' (and index)
+    positions: bool = False         # Index the first occurrences
+    lines: bool = True              # Line, word and whitespace statistics
+    scriptRuns: bool = False        # Script runs and mixed-script tokens
+
+    def tag(self) -> str:
+        """Description of the options, part of the cache keys."""
+        tag = f'graphemes={int(self.graphemes)}'
+        if self.ngrams == 'bounded':
+            tag += f',ngrams=bounded:{self.ngramCapacity}'
+        elif self.ngrams != 'off':
+            tag += f',ngrams={self.ngrams}'
+        if self.errors != 'strict':
+            tag += f',errors={self.errors}'
+        if self.positions:
+            tag += ',positions'
+        if self.lines:
+            tag += ',lines'
+        if self.scriptRuns:
+            tag += ',scriptRuns'
+        return tag
+
+
+class CodeCounter:
+    """Histogram of code points accumulated block by block.
+
+    Carriage returns are counted as they appear, the CR LF pairs are tracked
+    separately (also across blocks) so that the counts of the universal
+    newlines mode of text files can be reproduced. The grapheme clusters,
+    the n-grams, the line statistics and the script runs are counted in the
+    same pass as selected by the options.
+
+    Counters are pickled with sparse counts, so that the workers can return
+    them cheaply. With the 'replace' errors option the malformed sequences
+    fed to the counter are replaced and indexed by their offset, with the
+    positions option the first occurrences of every code point are.
+    """
+    def __init__(self, options: CountOptions | None = None):
+        self.options = options = options or CountOptions()
+        self.counts = np.zeros(CODESPACE, dtype=np.int64)
+        self.crlf = 0
+        self.nCodes = 0
+        self._lastCode = -1
+        # Offset in the file of the next block fed
+        self.position = 0
+        self.malformed = MalformedIndex() if options.errors == 'replace' else None
+        self.positions = PositionIndex() if options.positions else None
+        self.lines = LineCounter() if options.lines else None
+        self.scriptRuns = ScriptRunCounter() if options.scriptRuns else None
+        self.graphemes = GraphemeCounter() if options.graphemes else None
+        self.ngrams = None
+        if options.ngrams != 'off':
+            self.ngrams = NgramCounter(
+                capacity=options.ngramCapacity if options.ngrams == 'bounded' else None)
+
+    def feed(self, data: bytes) -> 'CodeCounter':
+        """Decode and count a block of UTF-8 bytes following the previous
+        ones.
+        """
+        codes = decodeBlock(data, self.malformed, self.position)
+        blockCounts = self._update(codes)
+        if self.positions is not None:
+            self.positions.add(codes, self.position, len(data))
+        if self.lines is not None:
+            self.lines.update(codes, self.position, len(data), blockCounts)
+        if self.scriptRuns is not None:
+            self.scriptRuns.update(codes, self.position, len(data), blockCounts)
+        self.position += len(data)
+        return self
+
+    def update(self, codes: np.ndarray) -> 'CodeCounter':
+        self._update(codes)
+        return self
+
+    def _update(self, codes: np.ndarray) -> np.ndarray | None:
+        """Count a block of code points, returning their histogram."""
+        if len(codes) == 0:
+            return None
+        blockCounts = np.bincount(codes, minlength=CODESPACE)
+        self.counts += blockCounts
+        self.nCodes += len(codes)
+        if self._lastCode == CR and codes[0] == LF:
+            self.crlf += 1
+        cr = np.flatnonzero(codes[:-1] == CR)
+        if len(cr):
+            self.crlf += int(np.count_nonzero(codes[cr + 1] == LF))
+        self._lastCode = int(codes[-1])
+        if self.graphemes is not None:
+            self.graphemes.update(codes, blockCounts)
+        if self.ngrams is not None:
+            self.ngrams.update(codes, blockCounts)
+        return blockCounts
+
+    def merge(self, other: 'CodeCounter') -> 'CodeCounter':
+        """Add the counts of a text following this one.
+
+        The texts must not be split within a CR LF pair or a grapheme
+        cluster, as at the bounds of `shardBounds` or between files.
+        """
+        self.counts += other.counts
+        self.crlf += other.crlf
+        self.nCodes += other.nCodes
+        if other.nCodes:
+            self._lastCode = other._lastCode
+        if self.graphemes is not None and other.graphemes is not None:
+            self.graphemes.merge(other.graphemes)
+        if self.ngrams is not None and other.ngrams is not None:
+            self.ngrams.merge(other.ngrams)
+        if self.malformed is not None and other.malformed is not None:
+            self.malformed.merge(other.malformed)
+        if self.positions is not None and other.positions is not None:
+            self.positions.merge(other.positions)
+        if self.lines is not None and other.lines is not None:
+            self.lines.merge(other.lines)
+        if self.scriptRuns is not None and other.scriptRuns is not None:
+            self.scriptRuns.merge(other.scriptRuns)
+        return self
+
+    def lookahead(self, following: np.ndarray) -> 'CodeCounter':
+        """Count the n-grams continuing into the code points following the
+        text, at the end of a shard.
+        """
+        if self.ngrams is not None:
+            self.ngrams.finish(following)
+        return self
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        codes = np.flatnonzero(self.counts)
+        state['counts'] = (codes, self.counts[codes])
+        return state
+
+    def __setstate__(self, state):
+        codes, values = state['counts']
+        self.__dict__.update(state)
+        self.counts = np.zeros(CODESPACE, dtype=np.int64)
+        self.counts[codes] = values
+
+    def result(self, universalNewlines: bool = True) -> np.ndarray:
+        """The final counts, optionally translating CR LF and CR into LF."""
+        counts = self.counts.copy()
+        if universalNewlines:
+            counts[LF] += counts[CR] - self.crlf
+            counts[CR] = 0
+        return counts
+
+    def countResult(self, nBytes: int, seconds: float,
+                    universalNewlines: bool = True) -> 'CountResult':
+        """The result with the grapheme clusters and n-grams, if counted."""
+        clusters, nClusters = None, 0
+        if self.graphemes is not None:
+            clusters, nClusters = self.graphemes.result(universalNewlines)
+        lines = None
+        if self.lines is not None:
+            lines = self.lines.result(lf=int(self.counts[LF]) - self.crlf, crlf=self.crlf,
+                                      cr=int(self.counts[CR]) - self.crlf)
+        return CountResult(counts=self.result(universalNewlines),
+                           nBytes=nBytes, seconds=seconds,
+                           clusters=clusters, nClusters=nClusters,
+                           ngrams=self.ngrams.result() if self.ngrams else None,
+                           malformed=self.malformed.copy()
+                                     if self.malformed is not None else None,
+                           positions=self.positions.copy()
+                                     if self.positions is not None else None,
+                           lines=lines,
+                           scriptRuns=self.scriptRuns.result()
+                                      if self.scriptRuns is not None else None)
+
+
+# ******************************************************************************
+@dataclass
+class CountResult:
+    counts: np.ndarray
+    nBytes: int
+    seconds: float
+    # Multi code point grapheme clusters and the total number of clusters
+    clusters: dict[str, int] | None = None
+    nClusters: int = 0
+    # N-gram counts by size, always in universal newlines mode
+    ngrams: dict[int, NgramResult] | None = None
+    # Malformed sequences replaced by U+FFFD, when not strict
+    malformed: MalformedIndex | None = None
+    # First occurrences of every code point, when indexed
+    positions: PositionIndex | None = None
+    # Line, word and whitespace statistics, when counted
+    lines: LineStats | None = None
+    # Script runs, transitions and mixed-script tokens, when counted
+    scriptRuns: ScriptRunStats | None = None
+
+    @property
+    def throughput(self) -> float:
+        """Processing rate in MB/s."""
+        return self.nBytes / 1e6 / self.seconds if self.seconds > 0 else 0.0
+
+    # Pickled with sparse counts like the counters, a result is sent to a
+    # worker for every partial snapshot
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        codes = np.flatnonzero(self.counts)
+        state['counts'] = (codes, self.counts[codes])
+        return state
+
+    def __setstate__(self, state):
+        codes, values = state['counts']
+        self.__dict__.update(state)
+        self.counts = np.zeros(CODESPACE, dtype=np.int64)
+        self.counts[codes] = values
+
+
+def shardBounds(path: Path | str, nShards: int) -> list[tuple[int, int]]:
+    """Split a file into byte ranges at UTF-8 boundaries.
+
+    A CR LF pair is never split so that the shards can be counted
+    independently. The bounds are moved forward to the next pair of ASCII
+    bytes, grapheme clusters never span those, within `SHARD_SEARCH` bytes.
+
+    Parameters:
+        path(Path | str): The file to split.
+        nShards(int): The desired number of shards.
+
+    Returns:
+        List of `(start, end)` byte ranges covering the whole file.
+    """
+    with Path(path).open('rb') as file:
+        size = file.seek(0, 2)
+        if size == 0:
+            return []
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            cuts = [0]
+            for i in range(1, nShards):
+                pos = utf8Boundary(mm, size * i // nShards)
+                match = ASCII_PAIR.search(mm, max(pos - 1, 0),
+                                          min(pos + SHARD_SEARCH, size))
+                if match is not None:
+                    pos = match.start() + 1
+                if 0 < pos < size and mm[pos - 1] == CR and mm[pos] == LF:
+                    pos += 1
+                if pos > cuts[-1]:
+                    cuts.append(pos)
+            cuts.append(size)
+    return [(a, b) for a, b in zip(cuts[:-1], cuts[1:]) if b > a]
+
+
+def followingCodes(path: Path | str, pos: int, n: int) -> np.ndarray:
+    """Decode up to `n` code points starting at a UTF-8 boundary."""
+    with Path(path).open('rb') as file:
+        file.seek(pos)
+        text = file.read(4 * n).decode('utf-8', errors='ignore')[:n]
+    return np.frombuffer(text.encode('utf-32-le'), dtype='<u4')
+
+
+def countShard(path: str, start: int, end: int, blockSize: int,
+               options: CountOptions | None = None) -> CodeCounter:
+    """Count a byte range in a worker process."""
+    counter = CodeCounter(options)
+    counter.position = start
+    for data in iterByteBlocks(path, blockSize, start, end):
+        counter.feed(data)
+    if counter.ngrams is not None:
+        counter.lookahead(followingCodes(path, end, max(NGRAM_SIZES)))
+    return counter
+
+
+_pool: ProcessPoolExecutor | None = None
+_poolLock = threading.Lock()
+
+def workerPool() -> ProcessPoolExecutor:
+    """The long-lived process pool shared by all the counts.
+
+    The workers are started by a fork server, forking the multithreaded
+    server process itself is not safe. A pool broken by a dying worker is
+    replaced on the next call.
+    """
+    global _pool
+    with _poolLock:
+        if _pool is None or getattr(_pool, '_broken', False):
+            methods = multiprocessing.get_all_start_methods()
+            context = multiprocessing.get_context(
+                'forkserver' if 'forkserver' in methods else 'spawn')
+            _pool = ProcessPoolExecutor(
+                max_workers=max(1, min(os.cpu_count() or 1, MAX_WORKERS)),
+                mp_context=context)
+        return _pool
+
+
+def autoWorkers(nBytes: int) -> int:
+    """Number of worker processes worth using for a file of given size."""
+    if nBytes < PARALLEL_MIN_BYTES:
+        return 1
+    return max(1, min(os.cpu_count() or 1, MAX_WORKERS,
+                      nBytes // (PARALLEL_MIN_BYTES // 4)))
+
+
+def countFile(path: Path | str, blockSize: int = BLOCK_SIZE,
+              universalNewlines: bool = True,
+              workers: int | None = 1,
+              options: CountOptions | None = None) -> CountResult:
+    """Count the code points of a UTF-8 file.
+
+    The file is memory mapped and decoded block by block into UTF-32 arrays
+    that are histogrammed with `np.bincount`. With more than one worker the
+    file is split into that many shards, counted over the shared process
+    pool, and the partial histograms are merged.
+
+    Parameters:
+        path(Path | str): The file to count.
+        blockSize(int): Number of bytes decoded at a time.
+        universalNewlines(bool): Count line endings as text mode reading
+            does, i.e. CR LF and CR as LF.
+        workers(int | None): Number of processes, `None` picks it from the
+            file size.
+        options(CountOptions | None): What is counted besides the code
+            points, the grapheme clusters only by default.
+
+    Returns:
+        The counts indexed by code point, with the size and timing.
+    """
+    t0 = time.perf_counter()
+    nBytes = Path(path).stat().st_size
+    if workers is None:
+        workers = autoWorkers(nBytes)
+
+    counter = CodeCounter(options)
+    shards = shardBounds(path, workers) if workers > 1 else []
+    if len(shards) <= 1:
+        for data in iterByteBlocks(path, blockSize):
+            counter.feed(data)
+    else:
+        pool = workerPool()
+        futures = [pool.submit(countShard, str(path), a, b, blockSize, options)
+                   for a, b in shards]
+        try:
+            for future in futures:
+                counter.merge(future.result())
+        finally:
+            for future in futures:
+                future.cancel()
+
+    return counter.countResult(nBytes, time.perf_counter() - t0,
+                               universalNewlines)
+
+
+def charFrame(counts: np.ndarray, names: bool = True) -> pd.DataFrame:
+    """Build the per character frame from counts indexed by code point,
+    without the `char` and `unicode` columns unless `names`.
+    """
+    codes = np.flatnonzero(counts)
+    cdf = pd.DataFrame({
+        'count': counts[codes],
+        'code': codes.astype(np.int32),
+    })
+    if names:
+        cdf.insert(0, 'char', [chr(c) for c in codes.tolist()])
+    return ucdTable().describe(cdf, names=names)
+
+# ******************************************************************************
@@ -0,0 +1,351 @@
+# ******************************************************************************
+# Copyright (c) 2025. All rights reserved.
+# # This work is licensed under the Creative Commons Attribution 4.0
+# International License. To view a copy of this license,
+# visit # http://creativecommons.org/licenses/by/4.0/.
+#
+# Author: roximn <roximn148@gmail.com>
+# ******************************************************************************
+from functools import lru_cache
+import os
+from pathlib import Path
+import tempfile
+
+import numpy as np
+import pandas as pd
+import unicodedataplus as unicodedata
+
+from .ucd import CODESPACE, tablesDir, ucdTable
+
+# ******************************************************************************
+# Grapheme_Cluster_Break values, in the low nibble of the property byte. The
+# simple ones come first, a run of them breaks everywhere except CR LF.
+GCB_NAMES = ['Other', 'CR', 'LF', 'Control',
+             'Extend', 'ZWJ', 'Regional_Indicator', 'Prepend', 'SpacingMark',
+             'L', 'V', 'T', 'LV', 'LVT']
+(OTHER, CR, LF, CONTROL, EXTEND, ZWJ, RI, PREPEND, SPACING_MARK,
+ L, V, T, LV, LVT) = range(len(GCB_NAMES))
+
+GCB_MASK = 0x0F
+EXT_PICT = 0x10
+# Indic_Conjunct_Break values, in bits 5-6
+INCB_SHIFT = 5
+INCB_NAMES = ['None', 'Consonant', 'Extend', 'Linker']
+INCB_NONE, INCB_CONSONANT, INCB_EXTEND, INCB_LINKER = range(len(INCB_NAMES))
+
+# Clusters up to this many code points are grouped with one `np.unique`
+PACKED_LENGTH = 8
+KEY_FACTOR = np.uint64(0x9E3779B97F4A7C15)
+
+# ******************************************************************************
+def _breakTable() -> np.ndarray:
+    """Break opportunities between two GCB values by the pair rules GB3-GB9b.
+
+    The contextual rules GB9c, GB11 and GB12/13 are applied afterwards.
+    """
+    n = len(GCB_NAMES)
+    table = np.ones((n, n), dtype=bool)                         # GB999
+    table[:, [EXTEND, ZWJ, SPACING_MARK]] = False               # GB9, GB9a
+    table[PREPEND, :] = False                                   # GB9b
+    table[L, [L, V, LV, LVT]] = False                           # GB6
+    table[[LV, V], [[V], [T]]] = False                          # GB7
+    table[[LVT, T], T] = False                                  # GB8
+    table[:, [CR, LF, CONTROL]] = True                          # GB5
+    table[[CR, LF, CONTROL], :] = True                          # GB4
+    table[CR, LF] = False                                       # GB3
+    return table.ravel()
+
+
+BREAKS = _breakTable()
+
+
+def buildGraphemeTable(dst: Path) -> Path:
+    """Build the grapheme break property table and save it as `dst`.
+
+    One byte per code point holding the Grapheme_Cluster_Break value, the
+    Extended_Pictographic flag and the Indic_Conjunct_Break value.
+    """
+    gcbIndex = {name: i for i, name in enumerate(GCB_NAMES)}
+    incbIndex = {name: i for i, name in enumerate(INCB_NAMES)}
+    props = bytearray(CODESPACE)
+    for cp in range(CODESPACE):
+        ch = chr(cp)
+        value = gcbIndex.get(unicodedata.grapheme_cluster_break(ch), OTHER)
+        if unicodedata.is_extended_pictographic(ch):
+            value |= EXT_PICT
+        value |= incbIndex.get(unicodedata.indic_conjunct_break(ch), 0) << INCB_SHIFT
+        props[cp] = value
+
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(suffix='.npy', dir=dst.parent)
+    try:
+        with os.fdopen(fd, 'wb') as file:
+            np.save(file, np.frombuffer(props, dtype=np.uint8))
+        os.replace(tmp, dst)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+    return dst
+
+
+@lru_cache(maxsize=1)
+def graphemeTable() -> np.ndarray:
+    """The memory mapped grapheme break properties, built on first use."""
+    # The UCD tables first, they are built into a directory of their own
+    ucdTable()
+    path = tablesDir() / 'graphemes.npy'
+    if not path.exists():
+        buildGraphemeTable(path)
+    return np.load(path, mmap_mode='r')
+
+
+# ******************************************************************************
+@lru_cache(maxsize=1)
+def complexCodes() -> np.ndarray:
+    """Code points whose break class is other than Other, Control, CR or LF.
+
+    A text without them breaks between all code points except CR LF.
+    """
+    return np.flatnonzero((np.asarray(graphemeTable()) & GCB_MASK) > CONTROL)
+
+
+def _runStart(inRun: np.ndarray, pos: np.ndarray,
+              marks: np.ndarray | None = None) -> tuple[np.ndarray, np.ndarray]:
+    """Walk back from each position to the nearest one not in the run.
+
+    The walks are stepped together, each one ending at its own run start,
+    so the total work is the length of the runs walked.
+
+    Returns:
+        The positions, -1 for a run reaching the start of the array, and
+        whether any position walked over is set in `marks`.
+    """
+    pos = pos.copy()
+    marked = np.zeros(len(pos), dtype=bool)
+    active = np.flatnonzero(pos >= 0)
+    active = active[inRun[pos[active]]]
+    while len(active):
+        if marks is not None:
+            marked[active] |= marks[pos[active]]
+        pos[active] -= 1
+        active = active[pos[active] >= 0]
+        active = active[inRun[pos[active]]]
+    return pos, marked
+
+
+def clusterJoins(codes: np.ndarray, simple: bool | None = None) -> np.ndarray:
+    """Indices of the code points continuing the grapheme cluster of the
+    previous code point, i.e. of the positions without a break.
+
+    Implements the UAX #29 rules with array operations. The pair rules come
+    from a lookup table, the rules depending on a longer context (emoji ZWJ
+    sequences, regional indicator pairs and Indic conjuncts) are patched in
+    only where the pair rules leave a break. Only the sparse joins are
+    returned as most code points start a cluster of their own.
+
+    Parameters:
+        codes(np.ndarray): The code points, starting at a cluster boundary.
+        simple(bool | None): Whether the caller knows that the text has no
+            `complexCodes`, which avoids looking up the break properties.
+
+    Returns:
+        The sorted indices.
+    """
+    n = len(codes)
+    if codes.dtype == np.uint8 or simple:
+        # Only CR LF stays together
+        return np.flatnonzero((codes[:-1] == 0x0D) & (codes[1:] == 0x0A)) + 1
+
+    props = graphemeTable()[codes]
+    gcb = props & GCB_MASK
+    if n == 0 or gcb.max() <= CONTROL:
+        return np.flatnonzero((gcb[:-1] == CR) & (gcb[1:] == LF)) + 1
+
+    brk = np.empty(n, dtype=bool)
+    brk[0] = True
+    # Small enough for uint8 arithmetic
+    brk[1:] = BREAKS[gcb[:-1] * np.uint8(len(GCB_NAMES)) + gcb[1:]]
+
+    # GB11: ExtPict Extend* ZWJ x ExtPict
+    zwj = np.flatnonzero((gcb[:-1] == ZWJ) & ((props[1:] & EXT_PICT) != 0))
+    if len(zwj):
+        base, _ = _runStart(gcb == EXTEND, zwj - 1)
+        joined = (base >= 0) & ((props[np.maximum(base, 0)] & EXT_PICT) != 0)
+        brk[zwj[joined] + 1] = False
+
+    # GB12, GB13: regional indicators pair up from the start of their run
+    ri = gcb == RI
+    pairs = np.flatnonzero(ri[:-1] & ri[1:])
+    if len(pairs):
+        first = ri.copy()
+        first[1:] &= ~ri[:-1]
+        index = np.arange(n, dtype=np.int32 if n < 2**31 else np.int64)
+        runStart = np.maximum.accumulate(np.where(first, index, 0))
+        brk[pairs + 1] = (pairs - runStart[pairs]) % 2 == 1
+
+    # GB9c: Consonant [Extend Linker]* Linker [Extend Linker]* x Consonant
+    incb = props >> INCB_SHIFT
+    joiners = (incb == INCB_EXTEND) | (incb == INCB_LINKER)
+    conjunct = np.flatnonzero(joiners[:-1] & (incb[1:] == INCB_CONSONANT) & brk[1:])
+    if len(conjunct):
+        base, linked = _runStart(joiners, conjunct, incb == INCB_LINKER)
+        joined = (base >= 0) & linked & (incb[np.maximum(base, 0)] == INCB_CONSONANT)
+        brk[conjunct[joined] + 1] = False
+
+    return np.flatnonzero(~brk)
+
+
+# ******************************************************************************
+class GraphemeCounter:
+    """Histogram of the multi code point grapheme clusters, block by block.
+
+    Single code point clusters are not stored, their counts follow from the
+    code point counts. The last cluster of a block may continue into the
+    next one, so it is carried over and segmented again with the next block.
+    """
+    def __init__(self):
+        self.clusters: dict[str, int] = {}
+        self.nClusters = 0
+        self._carry = np.zeros(0, dtype=np.uint8)
+
+    def update(self, codes: np.ndarray,
+               blockCounts: np.ndarray | None = None) -> 'GraphemeCounter':
+        """Count a block of code points.
+
+        Parameters:
+            codes(np.ndarray): The code points.
+            blockCounts(np.ndarray | None): Their histogram if already at
+                hand, used to skip the property lookup of simple blocks.
+        """
+        simple = None
+        if blockCounts is not None:
+            simple = not blockCounts[complexCodes()].any()
+        if len(self._carry):
+            if simple:
+                simple = (graphemeTable()[self._carry] & GCB_MASK).max() <= CONTROL
+            codes = np.concatenate((self._carry, codes))
+        if len(codes) == 0:
+            return self
+
+        joins = clusterJoins(codes, simple)
+        # The last cluster starts after the trailing joins
+        last, k = len(codes) - 1, len(joins)
+        while k and joins[k - 1] == last:
+            last, k = last - 1, k - 1
+        self._carry = codes[last:].copy()
+        self._add(codes, joins[:k], last)
+        return self
+
+    def _add(self, codes: np.ndarray, joins: np.ndarray, end: int):
+        """Count the clusters of `codes[:end]`, having the given joins."""
+        self.nClusters += end - len(joins)
+        if len(joins) == 0:
+            return
+        runs = np.flatnonzero(np.diff(joins, prepend=-2) != 1)
+        first = joins[runs] - 1
+        lengths = np.append(joins[runs[1:] - 1], joins[-1]) - first + 1
+
+        # Group the short clusters by a polynomial key of their code points,
+        # then check that every cluster equals the representative of its
+        # group, the rare collisions are counted one by one below.
+        slow = lengths > PACKED_LENGTH
+        short = np.flatnonzero(~slow)
+        columns = []
+        starts, sizes = first[short], lengths[short]
+        key = sizes.astype(np.uint64)
+        for k in range(int(sizes.max(initial=0))):
+            # All the clusters have at least two code points, the later
+            # columns are zero past the end of the shorter ones.
+            column = codes[starts + k] if k < 2 else \
+                np.where(k < sizes, codes[np.minimum(starts + k, len(codes) - 1)], 0)
+            columns.append(column)
+            key = key * KEY_FACTOR + column
+        keys, counts = np.unique(key, return_counts=True)
+        group = np.searchsorted(keys, key)
+        representative = np.empty(len(keys), dtype=np.int64)
+        representative[group] = np.arange(len(key))
+        same = np.ones(len(key), dtype=bool)
+        for column in columns:
+            same &= column == column[representative[group]]
+        if not same.all():
+            counts = np.bincount(group[same], minlength=len(keys))
+            slow[short[~same]] = True
+
+        clusters = self.clusters
+        for i, count in zip(representative.tolist(), counts.tolist()):
+            if count:
+                a = int(first[short[i]])
+                cluster = codes[a:a + int(lengths[short[i]])].astype('<u4')
+                cluster = cluster.tobytes().decode('utf-32-le')
+                clusters[cluster] = clusters.get(cluster, 0) + count
+
+        for a, n in zip(first[slow].tolist(), lengths[slow].tolist()):
+            cluster = codes[a:a + n].astype('<u4').tobytes().decode('utf-32-le')
+            clusters[cluster] = clusters.get(cluster, 0) + 1
+
+    def finish(self) -> 'GraphemeCounter':
+        """Count the carried over cluster at the end of the text."""
+        if len(self._carry):
+            carry, self._carry = self._carry, self._carry[:0]
+            self._add(carry, np.arange(1, len(carry)), len(carry))
+        return self
+
+    def merge(self, other: 'GraphemeCounter') -> 'GraphemeCounter':
+        """Add the counts of a text following a cluster boundary."""
+        self.finish()
+        for key, count in other.clusters.items():
+            self.clusters[key] = self.clusters.get(key, 0) + count
+        self.nClusters += other.nClusters
+        self._carry = other._carry.copy()
+        return self
+
+    def result(self, universalNewlines: bool = True) -> tuple[dict[str, int], int]:
+        """The multi code point clusters and the total number of clusters,
+        including the carried over one.
+        """
+        counter = GraphemeCounter()
+        counter.merge(self).finish()
+        clusters = counter.clusters
+        if universalNewlines:
+            # CR LF is counted as a single LF
+            clusters.pop('\r\n', None)
+        return clusters, counter.nClusters
+
+
+# ******************************************************************************
+def graphemeFrame(counts: np.ndarray, clusters: dict[str, int]) -> pd.DataFrame:
+    """Build the per grapheme cluster frame.
+
+    Parameters:
+        counts(np.ndarray): The code point counts of the text.
+        clusters(dict[str, int]): The multi code point clusters.
+
+    Returns:
+        A frame with the `grapheme`, `count`, `length` (in code points),
+        `unicode` (the code points), `base` (the name of the first code
+        point) and `script` columns.
+    """
+    # Code points not part of a longer cluster are clusters of their own
+    singles = counts.copy()
+    for key, count in clusters.items():
+        for ch in key:
+            singles[ord(ch)] -= count
+    codes = np.flatnonzero(singles > 0)
+
+    keys = [chr(c) for c in codes.tolist()] + list(clusters)
+    table = ucdTable()
+    firsts = np.array([ord(k[0]) for k in keys], dtype=np.int64)
+    records = table.lookup(firsts)
+    gdf = pd.DataFrame({
+        'grapheme': keys,
+        'count': np.concatenate((singles[codes],
+                                 np.fromiter(clusters.values(), dtype=np.int64,
+                                             count=len(clusters)))),
+        'length': [len(k) for k in keys],
+        'unicode': [' '.join(f'U+{ord(c):04X}' for c in k) for k in keys],
+        'base': table.names(firsts, records=records),
+        'script': table.scripts(records),
+    })
+    return gdf.sort_values('count', ascending=False, ignore_index=True)
+
+# ******************************************************************************
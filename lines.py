@@ -0,0 +1,348 @@
+# ******************************************************************************
+# Copyright (c) 2025. All rights reserved.
+# # This work is licensed under the Creative Commons Attribution 4.0
+# International License. To view a copy of this license,
+# visit # http://creativecommons.org/licenses/by/4.0/.
+#
+# Author: roximn <roximn148@gmail.com>
+# ******************************************************************************
+from dataclasses import dataclass, replace
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from .ucd import CATEGORY_NAMES, CODESPACE, ucdTable
+
+# ******************************************************************************
+# Longer lines share the last bin of the length histogram
+MAX_LINE_LENGTH = 4096
+# Scripts are indexed from 1 in the word table, 0 being no word character
+MAX_SCRIPTS = 256
+# Blocks with less than one wide character in so many are searched as bytes
+ASCII_RATIO = 64
+
+CR, LF = 0x0D, 0x0A
+WHITESPACE = np.array([0x09, 0x0B, 0x0C, 0x20, 0x85, 0xA0, 0x1680,
+                       *range(0x2000, 0x200B), 0x202F, 0x205F, 0x3000])
+
+# ******************************************************************************
+@lru_cache(maxsize=1)
+def wordScripts() -> np.ndarray:
+    """Script index plus one of the letters, marks and numbers, 0 for the
+    other code points, by code point.
+    """
+    props = ucdTable().props
+    word = np.array([c[0] in 'LMN' for c in CATEGORY_NAMES])
+    return np.where(word[props['category']], props['script'].astype(np.uint16) + 1,
+                    0).astype(np.uint8)
+
+
+@lru_cache(maxsize=1)
+def asciiWords() -> bytes:
+    """The `wordScripts` of the first 256 code points, as a translation
+    table of bytes.
+    """
+    return wordScripts()[:256].tobytes()
+
+
+# ******************************************************************************
+@dataclass
+class LineSpan:
+    """A contiguous part of a text whose first and last lines may continue
+    in the parts around it.
+
+    Parameters:
+        start(int): Byte offset of the part.
+        end(int): Byte offset following the part.
+        hasEol(bool): Whether the part holds a line end.
+        head(int): Code points before the first line end, all of them
+            without a line end.
+        headLast(int): Last of the `head` code points, -1 if none.
+        tail(int): Code points after the last line end.
+        tailLast(int): Last of the `tail` code points, -1 if none.
+        firstWord(int): Word table value of the first code point, a word
+            counted there continues a word of the previous part if non zero.
+        lastWord(bool): Whether the last code point is a word character.
+        startsLF(bool): Whether the first code point is a LF.
+        endsCR(bool): Whether the last code point is a CR.
+    """
+    start: int
+    end: int
+    hasEol: bool
+    head: int
+    headLast: int
+    tail: int
+    tailLast: int
+    firstWord: int
+    lastWord: bool
+    startsLF: bool
+    endsCR: bool
+
+
+@dataclass
+class LineStats:
+    """Line, word and whitespace statistics of a text.
+
+    Lines end at LF, CR LF or CR, the last line may have no line end.
+    Words are maximal runs of letters, marks and numbers, counted by the
+    script of their first character.
+
+    Parameters:
+        lengths(ndarray): Lines by length in code points, without the line
+            end, the last bin holding the longer lines.
+        maxLength(int): Length of the longest line.
+        trailing(int): Lines ending with whitespace.
+        words(dict): Words by script.
+        lf(int): LF line ends.
+        crlf(int): CR LF line ends.
+        cr(int): CR line ends.
+    """
+    lengths: np.ndarray
+    maxLength: int
+    trailing: int
+    words: dict[str, int]
+    lf: int = 0
+    crlf: int = 0
+    cr: int = 0
+
+    @property
+    def lines(self) -> int:
+        return int(self.lengths.sum())
+
+    @property
+    def blank(self) -> int:
+        return int(self.lengths[0]) if len(self.lengths) else 0
+
+    @property
+    def totalWords(self) -> int:
+        return sum(self.words.values())
+
+    @property
+    def mixedEndings(self) -> bool:
+        """Whether the text has more than one kind of line end."""
+        return sum(n > 0 for n in (self.lf, self.crlf, self.cr)) > 1
+
+    @property
+    def meanLength(self) -> float:
+        lines = self.lines
+        if not lines:
+            return 0.0
+        # The longer lines are accounted at the cap
+        return float(np.dot(self.lengths, np.arange(len(self.lengths)))) / lines
+
+    def percentile(self, q: float) -> int:
+        """Line length below which a fraction `q` of the lines are, at most
+        `MAX_LINE_LENGTH`.
+        """
+        lines = self.lines
+        if not lines:
+            return 0
+        return int(np.searchsorted(np.cumsum(self.lengths), q * lines))
+
+    def lengthFrame(self) -> pd.DataFrame:
+        """The non zero bins of the length histogram."""
+        lengths = np.flatnonzero(self.lengths)
+        return pd.DataFrame({'length': lengths, 'lines': self.lengths[lengths]})
+
+    def wordFrame(self) -> pd.DataFrame:
+        """Words by script, most frequent first."""
+        df = pd.DataFrame({'script': list(self.words),
+                           'words': list(self.words.values())})
+        return df.sort_values('words', ascending=False, kind='stable').reset_index(drop=True)
+
+
+# ******************************************************************************
+class LineCounter:
+    """Line lengths, trailing whitespace and words per script, block by
+    block.
+
+    Every block is summarized by the complete lines it holds, added to the
+    histogram right away, and a `LineSpan` of its first and last partial
+    lines, joined with the span of the previous block. Parts of a text
+    counted separately, as the shards, keep their spans, joined when merged
+    in any order.
+    """
+    def __init__(self):
+        self.lengths = np.zeros(MAX_LINE_LENGTH + 1, dtype=np.int64)
+        self.maxLength = 0
+        self.trailing = 0
+        self.words = np.zeros(MAX_SCRIPTS, dtype=np.int64)
+        self.spans: list[LineSpan] = []
+
+    def update(self, codes: np.ndarray, offset: int, nBytes: int,
+               blockCounts: np.ndarray | None = None) -> 'LineCounter':
+        """Count a block at a byte offset of the text.
+
+        Parameters:
+            codes(np.ndarray): The code points.
+            offset(int): Byte offset of the block.
+            nBytes(int): Bytes of the block.
+            blockCounts(np.ndarray | None): Their histogram if already at
+                hand, used to skip the line end, whitespace and script
+                lookups the block has no use for.
+        """
+        if len(codes) == 0:
+            return self
+        if blockCounts is None:
+            blockCounts = np.bincount(codes, minlength=CODESPACE)
+        span = self._block(codes, offset, offset + nBytes, blockCounts)
+        if self.spans and self.spans[-1].end == offset:
+            self.spans[-1] = self._join(self.spans[-1], span)
+        else:
+            self.spans.append(span)
+        return self
+
+    def _addLines(self, lengths: np.ndarray, lasts: np.ndarray,
+                  spaces: np.ndarray = WHITESPACE):
+        """Count complete lines by their length and last code point, the
+        `spaces` holding at least the whitespace among the last code points.
+        """
+        if len(lengths) == 0:
+            return
+        self.lengths += np.bincount(np.minimum(lengths, MAX_LINE_LENGTH),
+                                    minlength=MAX_LINE_LENGTH + 1)
+        self.maxLength = max(self.maxLength, int(lengths.max()))
+        trailing = np.zeros(len(lasts), dtype=bool)
+        for space in spaces.tolist():
+            trailing |= lasts == space
+        self.trailing += int(np.count_nonzero(trailing & (lengths > 0)))
+
+    def _block(self, codes: np.ndarray, start: int, end: int,
+               blockCounts: np.ndarray) -> LineSpan:
+        n = len(codes)
+        # The low bytes of a mostly ASCII block, searched for the line ends
+        # and translated to the word table at a fraction of the cost
+        wide = n - int(blockCounts[:0x80].sum())
+        low = None
+        if wide * ASCII_RATIO <= n:
+            low = codes if codes.dtype == np.uint8 else codes.astype(np.uint8)
+
+        def find(code: int) -> np.ndarray:
+            if not blockCounts[code]:
+                return np.zeros(0, dtype=np.intp)
+            if low is None:
+                return np.flatnonzero(codes == code)
+            index = np.flatnonzero(low == code)
+            return index if low is codes else index[codes[index] == code]
+
+        eols = ends = find(LF)
+        if blockCounts[CR]:
+            # A CR followed by a LF is part of the line end, a CR closing the
+            # block is taken as a line end, the next block may start with its LF
+            cr = find(CR)
+            following = cr + 1 < n
+            following[following] = codes[cr[following] + 1] == LF
+            eols = np.sort(np.concatenate((eols, cr[~following])))
+            # Line ends at a LF preceded by a CR are one code point longer
+            pairs = (eols > 0) & (codes[eols] == LF)
+            pairs[pairs] = codes[eols[pairs] - 1] == CR
+            ends = eols - pairs
+        if len(eols):
+            lengths = ends[1:] - eols[:-1] - 1
+            # Only the whitespace of the block can end a line, an empty
+            # line ends with the previous line end
+            spaces = WHITESPACE[blockCounts[WHITESPACE] > 0]
+            self._addLines(lengths, codes[ends[1:] - 1], spaces)
+            head = int(ends[0])
+            headLast = int(codes[head - 1]) if head else -1
+            tail = n - int(eols[-1]) - 1
+        else:
+            head = tail = n
+            headLast = int(codes[-1])
+        tailLast = int(codes[-1]) if tail else -1
+
+        if low is None:
+            word = wordScripts()[codes]
+        else:
+            word = np.frombuffer(bytearray(low.tobytes().translate(asciiWords())),
+                                 dtype=np.uint8)
+            index = np.flatnonzero(codes >= 0x80) if wide else np.zeros(0, dtype=np.intp)
+            word[index] = wordScripts()[codes[index]]
+        isWord = word != 0
+        # Word starts, from the second code point
+        starts = np.greater(isWord[1:], isWord[:-1])
+        if low is None:
+            self.words += np.bincount(word[np.flatnonzero(starts) + 1], minlength=MAX_SCRIPTS)
+        else:
+            # The words starting with a wide character by position, the
+            # others by value, the last value taking the remainder
+            index = index[index > 0]
+            wideWords = np.bincount(word[index[starts[index - 1]]], minlength=MAX_SCRIPTS)
+            self.words += wideWords
+            remaining = int(np.count_nonzero(starts)) - int(wideWords.sum())
+            values = np.unique(wordScripts()[:0x80][blockCounts[:0x80] > 0])
+            values = values[values > 0]
+            for value in values[:-1].tolist():
+                count = int(np.count_nonzero(starts & (word[1:] == value))) - int(wideWords[value])
+                self.words[value] += count
+                remaining -= count
+            if len(values):
+                self.words[values[-1]] += remaining
+        self.words[word[0]] += bool(isWord[0])
+        return LineSpan(start=start, end=end, hasEol=len(eols) > 0,
+                        head=head, headLast=headLast, tail=tail, tailLast=tailLast,
+                        firstWord=int(word[0]), lastWord=bool(isWord[-1]),
+                        startsLF=codes[0] == LF, endsCR=codes[-1] == CR)
+
+    def _join(self, a: LineSpan, b: LineSpan) -> LineSpan:
+        """The span of two contiguous spans, counting the line across them."""
+        if a.lastWord and b.firstWord:
+            self.words[b.firstWord] -= 1
+        if a.hasEol and b.hasEol and not (a.endsCR and b.startsLF):
+            length = a.tail + b.head
+            last = b.headLast if b.head else a.tailLast
+            self._addLines(np.array([length]), np.array([last]))
+
+        head, headLast = a.head, a.headLast
+        if not a.hasEol:
+            head += b.head
+            headLast = b.headLast if b.head else a.headLast
+        tail, tailLast = b.tail, b.tailLast
+        if not b.hasEol:
+            tail += a.tail
+            tailLast = b.tailLast if b.tail else a.tailLast
+        return LineSpan(start=a.start, end=b.end, hasEol=a.hasEol or b.hasEol,
+                        head=head, headLast=headLast, tail=tail, tailLast=tailLast,
+                        firstWord=a.firstWord, lastWord=b.lastWord,
+                        startsLF=a.startsLF, endsCR=b.endsCR)
+
+    def merge(self, other: 'LineCounter') -> 'LineCounter':
+        """Add the counts of other parts of the text, in any order."""
+        self.lengths += other.lengths
+        self.maxLength = max(self.maxLength, other.maxLength)
+        self.trailing += other.trailing
+        self.words += other.words
+        spans = sorted(self.spans + [replace(s) for s in other.spans],
+                       key=lambda s: s.start)
+        self.spans = spans[:1]
+        for span in spans[1:]:
+            if self.spans[-1].end == span.start:
+                self.spans[-1] = self._join(self.spans[-1], span)
+            else:
+                self.spans.append(span)
+        return self
+
+    def result(self, lf: int = 0, crlf: int = 0, cr: int = 0) -> LineStats:
+        """The statistics, counting the first and last lines of the parts.
+
+        Parameters:
+            lf(int): LF line ends.
+            crlf(int): CR LF line ends.
+            cr(int): CR line ends.
+        """
+        counter = LineCounter()
+        counter.merge(self)
+        for span in counter.spans:
+            counter._addLines(np.array([span.head]), np.array([span.headLast]))
+            if span.hasEol and span.tail:
+                counter._addLines(np.array([span.tail]), np.array([span.tailLast]))
+
+        names = ucdTable().scriptNames
+        scripts = np.flatnonzero(counter.words)
+        return LineStats(lengths=np.trim_zeros(counter.lengths, 'b'),
+                         maxLength=counter.maxLength, trailing=counter.trailing,
+                         words={names[i - 1]: int(counter.words[i]) for i in scripts.tolist()},
+                         lf=lf, crlf=crlf, cr=cr)
+
+# ******************************************************************************
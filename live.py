@@ -0,0 +1,181 @@
+# ******************************************************************************
+# Copyright (c) 2025. All rights reserved.
+# # This work is licensed under the Creative Commons Attribution 4.0
+# International License. To view a copy of this license,
+# visit # http://creativecommons.org/licenses/by/4.0/.
+#
+# Author: roximn <roximn148@gmail.com>
+# ******************************************************************************
+from dataclasses import dataclass
+import time
+
+import numpy as np
+import pandas as pd
+
+from .aggregates import CharAggregates, nextBuild, rankOrder, rankedEcdf
+from .counting import CountResult
+from .ucd import BLOCK_NAMES, CATEGORY_NAMES, CODESPACE, ucdTable
+
+# ******************************************************************************
+# Edits of more code points are tallied with a histogram of the whole
+# codespace, smaller ones are sorted
+BINCOUNT_THRESHOLD = 1 << 14
+# Script indices are stored as bytes by the property table
+MAX_SCRIPTS = 256
+
+# ******************************************************************************
+@dataclass
+class LiveResult(CountResult):
+    """Counts of a text edited in the browser, updated from the previous
+    edit rather than counted again.
+
+    `aggregates` are updated along with the counts, `removed` and `added`
+    are the code points replaced by the last edit.
+    """
+    aggregates: CharAggregates | None = None
+    removed: int = 0
+    added: int = 0
+
+
+def textCodes(text: str) -> np.ndarray:
+    """The code points of a text, lone surrogates replaced by U+FFFD as the
+    malformed sequences of the files are.
+    """
+    try:
+        return np.frombuffer(text.encode('utf-32-le'), dtype=np.uint32)
+    except UnicodeEncodeError:
+        codes = np.frombuffer(text.encode('utf-32-le', 'surrogatepass'), dtype=np.uint32)
+        return np.where((codes >= 0xD800) & (codes <= 0xDFFF), 0xFFFD, codes).astype(np.uint32)
+
+
+def editSpan(old: np.ndarray, new: np.ndarray) -> tuple[int, int]:
+    """Lengths of the common prefix and suffix of two code point arrays,
+    not overlapping, the edit being what lies between them.
+    """
+    n = min(len(old), len(new))
+    diff = old[:n] != new[:n]
+    prefix = int(diff.argmax()) if n and diff.any() else n
+
+    m = n - prefix
+    diff = (old[len(old) - m:] != new[len(new) - m:])[::-1]
+    suffix = int(diff.argmax()) if m and diff.any() else m
+    return prefix, suffix
+
+
+def utf8Lengths(codes: np.ndarray) -> np.ndarray:
+    """Bytes taken by the code points in UTF-8."""
+    return 1 + (codes >= 0x80) + (codes >= 0x800) + (codes >= 0x10000)
+
+
+# ******************************************************************************
+class LiveCount:
+    """Counts of a text edited in place.
+
+    Each edit is compared with the previous text and only the code points
+    between their common prefix and suffix are removed from and added to
+    the histogram. The block, script and category totals follow the same
+    difference, and the characters are described once, when first seen, so
+    an update costs a comparison of the two texts and a pass over the
+    distinct characters instead of a recount.
+    """
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """Forget the text and its counts."""
+        self.codes = np.zeros(0, dtype=np.uint32)
+        self.counts = np.zeros(CODESPACE, dtype=np.int64)
+        self.nBytes = 0
+        self.blockTotals = np.zeros(len(BLOCK_NAMES), dtype=np.int64)
+        self.scriptTotals = np.zeros(MAX_SCRIPTS, dtype=np.int64)
+        self.categoryTotals = np.zeros(len(CATEGORY_NAMES), dtype=np.int64)
+        self._described = np.zeros(CODESPACE, dtype=bool)
+        self._rows: pd.DataFrame | None = None
+
+    def update(self, text: str) -> LiveResult:
+        """Apply the edit turning the previous text into `text`."""
+        t0 = time.perf_counter()
+        codes = textCodes(text)
+        prefix, suffix = editSpan(self.codes, codes)
+        removed = self.codes[prefix:len(self.codes) - suffix]
+        added = codes[prefix:len(codes) - suffix]
+        self._apply(removed, -1)
+        self._apply(added, 1)
+        self.codes = codes
+
+        return LiveResult(counts=self.counts.copy(), nBytes=self.nBytes,
+                          seconds=time.perf_counter() - t0,
+                          aggregates=self.aggregates(),
+                          removed=len(removed), added=len(added))
+
+    def aggregates(self) -> CharAggregates:
+        """The aggregates of the current counts, from the running totals."""
+        t0 = time.perf_counter()
+        if self._rows is None:
+            self._describe(np.zeros(0, dtype=np.int64))
+        rows = self._rows
+        counts = self.counts[rows['code'].to_numpy()]
+        present = counts > 0
+        frame = rows[present].assign(count=counts[present]).reset_index(drop=True)
+        order = rankOrder(frame['count'].to_numpy())
+
+        # The indices of the blocks and scripts follow the order of the
+        # aggregates, the categories are sorted by name
+        blocks = np.flatnonzero(self.blockTotals)
+        scripts = np.flatnonzero(self.scriptTotals)
+        categories = np.flatnonzero(self.categoryTotals)
+        categories = categories[np.argsort(CATEGORY_NAMES[categories], kind='stable')]
+        return CharAggregates(
+            frame=frame, order=order,
+            blocks=pd.DataFrame({'block': BLOCK_NAMES[blocks],
+                                 'count': self.blockTotals[blocks]}),
+            scripts=pd.DataFrame({'script': ucdTable().scriptNames[scripts],
+                                  'count': self.scriptTotals[scripts]}),
+            categories=pd.DataFrame({'category': CATEGORY_NAMES[categories],
+                                     'count': self.categoryTotals[categories]}),
+            ecdf=rankedEcdf(frame['count'].to_numpy()[order]),
+            ecdfCodes=frame['code'].to_numpy()[order][::-1],
+            build=nextBuild(), seconds=time.perf_counter() - t0)
+
+    # --------------------------------------------------------------------------
+    def _apply(self, codes: np.ndarray, sign: int):
+        """Add (+1) or remove (-1) code points from the counts and totals."""
+        if len(codes) == 0:
+            return
+        if len(codes) > BINCOUNT_THRESHOLD:
+            hist = np.bincount(codes, minlength=CODESPACE)
+            distinct = np.flatnonzero(hist)
+            delta = hist[distinct]
+        else:
+            distinct, delta = np.unique(codes, return_counts=True)
+            distinct = distinct.astype(np.int64)
+        delta = sign * delta.astype(np.int64)
+
+        self.counts[distinct] += delta
+        self.nBytes += int((delta * utf8Lengths(distinct)).sum())
+        records = ucdTable().lookup(distinct)
+        blocks = records['block'].astype(np.intp)
+        # Outside of any block, the last name
+        blocks[blocks < 0] = len(BLOCK_NAMES) - 1
+        np.add.at(self.blockTotals, blocks, delta)
+        np.add.at(self.scriptTotals, records['script'].astype(np.intp), delta)
+        np.add.at(self.categoryTotals, records['category'].astype(np.intp), delta)
+        if sign > 0:
+            self._describe(distinct)
+
+    def _describe(self, codes: np.ndarray):
+        """Describe the characters not seen before, kept sorted by code,
+        unnamed as the frames of the aggregates are.
+        """
+        fresh = codes[~self._described[codes]]
+        if self._rows is not None and len(fresh) == 0:
+            return
+        df = ucdTable().describe(pd.DataFrame({
+            'count': np.zeros(len(fresh), dtype=np.int64),
+            'code': fresh.astype(np.int32),
+        }), names=False)
+        self._described[fresh] = True
+        rows = df if self._rows is None else pd.concat([self._rows, df])
+        self._rows = rows.sort_values('code', kind='stable').reset_index(drop=True)
+
+# ******************************************************************************
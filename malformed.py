@@ -0,0 +1,151 @@
+# ******************************************************************************
+# Copyright (c) 2025. All rights reserved.
+# # This work is licensed under the Creative Commons Attribution 4.0
+# International License. To view a copy of this license,
+# visit # http://creativecommons.org/licenses/by/4.0/.
+#
+# Author: roximn <roximn148@gmail.com>
+# ******************************************************************************
+import codecs
+import threading
+
+import numpy as np
+import pandas as pd
+
+# ******************************************************************************
+# Number of malformed sequences whose offsets are kept, all are counted
+MAX_MALFORMED = 100_000
+# Bytes kept from the start of every malformed sequence
+PATTERN_BYTES = 4
+
+MALFORMED_DTYPE = np.dtype([('offset', '<i8'), ('length', 'u1'),
+                            ('bytes', f'S{PATTERN_BYTES}')])
+
+ERROR_HANDLER = 'shinomni-index'
+
+# ******************************************************************************
+_ranges = threading.local()
+
+def _recordError(exc: UnicodeDecodeError):
+    """Replace a malformed sequence as the 'replace' handler does, recording
+    its byte range.
+    """
+    _ranges.value.append((exc.start, exc.end))
+    return '\ufffd', exc.end
+
+codecs.register_error(ERROR_HANDLER, _recordError)
+
+
+def decodeReplacing(data: bytes) -> tuple[str, list[tuple[int, int]]]:
+    """Decode UTF-8 replacing the malformed sequences by U+FFFD.
+
+    Every maximal invalid subpart is replaced by one U+FFFD, as with the
+    'replace' error handler.
+
+    Returns:
+        The text and the `(start, end)` byte ranges of the replaced
+        sequences.
+    """
+    _ranges.value = []
+    try:
+        text = data.decode('utf-8', ERROR_HANDLER)
+        return text, _ranges.value
+    finally:
+        _ranges.value = None
+
+
+# ******************************************************************************
+class MalformedIndex:
+    """Offsets and bytes of the malformed UTF-8 sequences of a text.
+
+    The first `limit` sequences are kept in a compact structured array of
+    `offset` (in the file), `length` (of the sequence) and `bytes` (the
+    first bytes from the offset on, including the one following a
+    truncated sequence), all of them are counted.
+    """
+    def __init__(self, limit: int = MAX_MALFORMED):
+        self.limit = limit
+        self.count = 0
+        self.nBytes = 0
+        self._parts: list[np.ndarray] = []
+        self._kept = 0
+
+    def __len__(self) -> int:
+        return self.count
+
+    def add(self, offset: int, ranges: list[tuple[int, int]], data: bytes):
+        """Record the malformed byte ranges of a block at a file offset."""
+        self.count += len(ranges)
+        self.nBytes += sum(end - start for start, end in ranges)
+        room = self.limit - self._kept
+        if room <= 0:
+            return
+        ranges = ranges[:room]
+        part = np.empty(len(ranges), dtype=MALFORMED_DTYPE)
+        part['offset'] = [offset + start for start, _ in ranges]
+        part['length'] = [end - start for start, end in ranges]
+        part['bytes'] = [data[start:start + PATTERN_BYTES] for start, _ in ranges]
+        self._parts.append(part)
+        self._kept += len(part)
+
+    def merge(self, other: 'MalformedIndex') -> 'MalformedIndex':
+        """Add the sequences of another part of the text, in any order."""
+        self.count += other.count
+        self.nBytes += other.nBytes
+        if other._kept:
+            entries = np.sort(np.concatenate((self.entries, other.entries)),
+                              order='offset')[:self.limit]
+            self._parts = [entries]
+            self._kept = len(entries)
+        return self
+
+    @property
+    def entries(self) -> np.ndarray:
+        """The kept sequences, by offset."""
+        if len(self._parts) > 1:
+            self._parts = [np.concatenate(self._parts)]
+        return self._parts[0] if self._parts else np.empty(0, dtype=MALFORMED_DTYPE)
+
+    def copy(self) -> 'MalformedIndex':
+        return MalformedIndex.fromEntries(self.entries.copy(), self.count,
+                                          self.nBytes, self.limit)
+
+    @classmethod
+    def fromEntries(cls, entries: np.ndarray, count: int, nBytes: int,
+                    limit: int = MAX_MALFORMED) -> 'MalformedIndex':
+        index = cls(limit)
+        index._parts = [entries] if len(entries) else []
+        index._kept = len(entries)
+        index.count, index.nBytes = count, nBytes
+        return index
+
+    def frame(self) -> pd.DataFrame:
+        """The kept sequences with the `offset`, `length`, `bytes` (in hex),
+        `following` (the next bytes kept, in hex) and `kind` columns.
+        """
+        entries = self.entries
+        raw = np.frombuffer(entries['bytes'].tobytes(), dtype=np.uint8)
+        raw = raw.reshape(len(entries), PATTERN_BYTES)
+        lead, next_ = raw[:, 0], raw[:, 1]
+        length = entries['length']
+        kind = np.select(
+            [(lead >= 0x80) & (lead <= 0xBF),
+             (lead == 0xC0) | (lead == 0xC1)
+             | ((lead == 0xE0) & (next_ >= 0x80) & (next_ <= 0x9F))
+             | ((lead == 0xF0) & (next_ >= 0x80) & (next_ <= 0x8F)),
+             (lead == 0xED) & (next_ >= 0xA0) & (next_ <= 0xBF),
+             ((lead == 0xF4) & (next_ >= 0x90)) | (lead >= 0xF5)],
+            ['unexpected continuation byte', 'overlong encoding',
+             'surrogate', 'beyond U+10FFFF or invalid byte'],
+            default='truncated sequence')
+        return pd.DataFrame({
+            'offset': entries['offset'],
+            'length': length,
+            'bytes': [b[:n].hex(' ') for b, n in zip(entries['bytes'].tolist(),
+                                                     length.tolist())],
+            'following': [b[n:].hex(' ') for b, n in zip(entries['bytes'].tolist(),
+                                                         length.tolist())],
+            'kind': kind,
+        })
+
+# ******************************************************************************
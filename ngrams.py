@@ -0,0 +1,275 @@
+# ******************************************************************************
+# Copyright (c) 2025. All rights reserved.
+# # This work is licensed under the Creative Commons Attribution 4.0
+# International License. To view a copy of this license,
+# visit # http://creativecommons.org/licenses/by/4.0/.
+#
+# Author: roximn <roximn148@gmail.com>
+# ******************************************************************************
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+# ******************************************************************************
+NGRAM_SIZES = (2, 3)
+# Default number of n-grams of each size kept by the bounded counts
+NGRAM_CAPACITY = 100_000
+# Files up to this size have their n-grams counted exactly in the 'auto' mode
+EXACT_MAX_BYTES = 64 * 1024 * 1024
+
+NGRAM_MODES = ('auto', 'exact', 'bounded', 'off')
+
+# Code points take 21 bits, up to three of them are packed into a key
+CODE_BITS = 21
+CODE_MASK = (1 << CODE_BITS) - 1
+ASCII_BITS = 7
+
+CR, LF = 0x0D, 0x0A
+
+# ******************************************************************************
+def ngramMode(mode: str, nBytes: int) -> str:
+    """Resolve the 'auto' mode for a text of given size."""
+    if mode == 'auto':
+        return 'exact' if nBytes <= EXACT_MAX_BYTES else 'bounded'
+    return mode
+
+
+def packNgrams(codes: np.ndarray, n: int, bits: int = CODE_BITS) -> np.ndarray:
+    """Keys of the n-grams of consecutive code points, packed in uint64."""
+    m = len(codes) - n + 1
+    if m <= 0:
+        return np.zeros(0, dtype=np.uint64)
+    keys = codes[:m].astype(np.uint64)
+    for k in range(1, n):
+        keys <<= np.uint64(bits)
+        keys |= codes[k:k + m]
+    return keys
+
+
+def unpackNgrams(keys: np.ndarray, n: int) -> list[str]:
+    """The n-grams of the given keys as strings."""
+    codes = np.empty((len(keys), n), dtype='<u4')
+    for k in range(n):
+        codes[:, n - 1 - k] = (keys >> np.uint64(k * CODE_BITS)) & np.uint64(CODE_MASK)
+    text = codes.tobytes().decode('utf-32-le')
+    return [text[i:i + n] for i in range(0, len(text), n)]
+
+
+def universalNewlines(codes: np.ndarray) -> np.ndarray:
+    """Translate CR LF and CR into LF."""
+    cr = codes == CR
+    if not cr.any():
+        return codes
+    keep = np.ones(len(codes), dtype=bool)
+    keep[:-1] = ~(cr[:-1] & (codes[1:] == LF))
+    return np.where(cr, LF, codes).astype(codes.dtype)[keep]
+
+
+def countNgrams(codes: np.ndarray, n: int) -> tuple[np.ndarray, np.ndarray]:
+    """Distinct n-grams of the code points and their counts, sorted by key.
+
+    Large ASCII blocks are counted with `np.bincount` over 7 bit packed keys,
+    the others by sorting the keys.
+    """
+    if codes.dtype == np.uint8 and n <= 3 and len(codes) >= 1 << (ASCII_BITS * n - 4):
+        counts = np.bincount(packNgrams(codes, n, ASCII_BITS).astype(np.intp),
+                             minlength=1 << (ASCII_BITS * n))
+        small = np.flatnonzero(counts)
+        keys = np.zeros(len(small), dtype=np.uint64)
+        for k in range(n - 1, -1, -1):
+            part = (small >> (k * ASCII_BITS)) & ((1 << ASCII_BITS) - 1)
+            keys = (keys << np.uint64(CODE_BITS)) | part.astype(np.uint64)
+        return keys, counts[small]
+    return np.unique(packNgrams(codes, n), return_counts=True)
+
+
+# ******************************************************************************
+@dataclass
+class NgramResult:
+    """Counts of the n-grams of one size.
+
+    Bounded counts keep the most frequent n-grams only, as a mergeable
+    Misra-Gries summary (equivalent to Space-Saving). Each kept count is a
+    lower bound of the true count which is at most `error` higher, and the
+    n-grams that were dropped occur at most `error` times. The error never
+    exceeds `total / (capacity + 1)`.
+    """
+    n: int
+    keys: np.ndarray
+    counts: np.ndarray
+    total: int = 0
+    error: int = 0
+    capacity: int | None = None
+
+    @property
+    def exact(self) -> bool:
+        return self.error == 0
+
+    @property
+    def errorBound(self) -> float:
+        """The a priori bound of `error`."""
+        if self.capacity is None:
+            return 0.0
+        return self.total / (self.capacity + 1)
+
+    def add(self, keys: np.ndarray, counts: np.ndarray) -> 'NgramResult':
+        """Add the counts of distinct keys, sorted, and prune."""
+        self.total += int(counts.sum())
+        if len(self.keys) == 0:
+            self.keys, self.counts = keys.copy(), counts.astype(np.int64)
+        else:
+            at = np.searchsorted(self.keys, keys)
+            found = at < len(self.keys)
+            found[found] = self.keys[at[found]] == keys[found]
+            self.counts[at[found]] += counts[found]
+            new = ~found
+            if new.any():
+                self.keys = np.insert(self.keys, at[new], keys[new])
+                self.counts = np.insert(self.counts, at[new], counts[new])
+        self.prune()
+        return self
+
+    def merge(self, other: 'NgramResult') -> 'NgramResult':
+        total = self.total
+        self.add(other.keys, other.counts)
+        # The other total includes the counts pruned from it
+        self.total = total + other.total
+        self.error += other.error
+        return self
+
+    def prune(self):
+        """Keep `capacity` n-grams, decrementing all the counts by the next
+        largest one.
+        """
+        if self.capacity is None or len(self.counts) <= self.capacity:
+            return
+        k = len(self.counts) - self.capacity - 1
+        threshold = int(np.partition(self.counts, k)[k])
+        keep = self.counts > threshold
+        self.keys = self.keys[keep]
+        self.counts = self.counts[keep] - threshold
+        self.error += threshold
+
+    def copy(self) -> 'NgramResult':
+        return NgramResult(n=self.n, keys=self.keys.copy(),
+                           counts=self.counts.copy(), total=self.total,
+                           error=self.error, capacity=self.capacity)
+
+    def frame(self, top: int | None = None) -> pd.DataFrame:
+        """The n-grams by decreasing count, with the upper bounds.
+
+        Parameters:
+            top(int | None): Number of n-grams, all of them when None.
+
+        Returns:
+            A frame with the `ngram`, `count`, `upper` (bound of the true
+            count), `share` (of all the n-grams) and `unicode` columns.
+        """
+        order = np.argsort(self.counts, kind='stable')[::-1]
+        if top is not None:
+            order = order[:top]
+        ngrams = unpackNgrams(self.keys[order], self.n)
+        counts = self.counts[order]
+        return pd.DataFrame({
+            'ngram': ngrams,
+            'count': counts,
+            'upper': counts + self.error,
+            'share': counts / max(self.total, 1),
+            'unicode': [' '.join(f'U+{ord(c):04X}' for c in g) for g in ngrams],
+        })
+
+
+# ******************************************************************************
+class NgramCounter:
+    """Counts of the n-grams of several sizes accumulated block by block.
+
+    The n-grams are counted over the text as read in universal newlines
+    mode, i.e. with CR LF and CR as LF. The last code points of a block are
+    carried over to form the n-grams spanning the next block.
+
+    Parameters:
+        sizes(tuple[int]): The n-gram sizes, at most 3.
+        capacity(int | None): Number of n-grams of each size kept, None for
+            exact counts.
+    """
+    def __init__(self, sizes: tuple[int, ...] = NGRAM_SIZES,
+                 capacity: int | None = NGRAM_CAPACITY):
+        self.tables = {n: NgramResult(n=n, keys=np.zeros(0, dtype=np.uint64),
+                                      counts=np.zeros(0, dtype=np.int64),
+                                      capacity=capacity)
+                       for n in sizes}
+        self._tail = np.zeros(0, dtype=np.uint8)
+        self._pendingCR = False
+
+    def _newlines(self, codes: np.ndarray) -> np.ndarray:
+        """Translate the line endings, holding a trailing CR back."""
+        if self._pendingCR:
+            codes = np.concatenate((np.array([CR], dtype=codes.dtype), codes))
+            self._pendingCR = False
+        if len(codes) and codes[-1] == CR:
+            self._pendingCR = True
+            codes = codes[:-1]
+        return universalNewlines(codes)
+
+    def _count(self, codes: np.ndarray, starts: int | None = None):
+        """Count the n-grams of the carried over tail followed by `codes`,
+        only those starting before `starts` when given.
+        """
+        tail = self._tail
+        if len(tail):
+            codes = np.concatenate((tail, codes))
+        for n, table in self.tables.items():
+            skip = len(tail) - min(len(tail), n - 1)
+            grams = codes[skip:]
+            if starts is not None:
+                grams = grams[:starts - skip + n - 1]
+            keys, counts = countNgrams(grams, n)
+            if len(keys):
+                table.add(keys, counts)
+        self._tail = codes[len(codes) - min(len(codes), max(self.tables) - 1):]
+
+    def update(self, codes: np.ndarray, blockCounts: np.ndarray | None = None):
+        if self._pendingCR or blockCounts is None or blockCounts[CR]:
+            codes = self._newlines(codes)
+        if len(codes):
+            self._count(codes)
+        return self
+
+    def finish(self, following: np.ndarray | None = None) -> 'NgramCounter':
+        """End the text, counting the n-grams that start in it and continue
+        into the `following` code points, as at the end of a shard.
+        """
+        pending = np.array([LF] if self._pendingCR else [], dtype=np.uint32)
+        self._pendingCR = False
+        if following is not None and len(following):
+            if len(pending) and following[0] == LF:
+                following = following[1:]
+            following = universalNewlines(following)
+        else:
+            following = np.zeros(0, dtype=np.uint32)
+        starts = len(self._tail) + len(pending)
+        if len(pending) or len(following):
+            self._count(np.concatenate((pending, following)).astype(np.uint32),
+                        starts=starts)
+        self._tail = self._tail[:0]
+        return self
+
+    def merge(self, other: 'NgramCounter') -> 'NgramCounter':
+        """Add the counts of a separate text."""
+        self.finish()
+        for n, table in self.tables.items():
+            if n in other.tables:
+                table.merge(other.tables[n])
+        self._tail = other._tail.copy()
+        self._pendingCR = other._pendingCR
+        return self
+
+    def result(self) -> dict[int, NgramResult]:
+        """Copies of the tables, including the end of the text."""
+        counter = NgramCounter(tuple(self.tables))
+        counter.tables = {n: t.copy() for n, t in self.tables.items()}
+        counter._tail, counter._pendingCR = self._tail, self._pendingCR
+        return counter.finish().tables
+
+# ******************************************************************************
@@ -0,0 +1,137 @@
+# ******************************************************************************
+# Copyright (c) 2025. All rights reserved.
+# # This work is licensed under the Creative Commons Attribution 4.0
+# International License. To view a copy of this license,
+# visit # http://creativecommons.org/licenses/by/4.0/.
+#
+# Author: roximn <roximn148@gmail.com>
+# ******************************************************************************
+# Heatmap of the whole codespace, one pixel per code point, drawn from the
+# counts into a palette PNG so that its size does not depend on the number
+# of distinct characters.
+#
+# Each plane is a square of 256 rows of 256 code points, the planes are laid
+# out `PLANE_COLUMNS` to a row, in order, `PLANE_GAP` pixels apart.
+# ******************************************************************************
+from functools import lru_cache
+import struct
+import zlib
+
+import numpy as np
+import plotly.colors
+
+from .ucd import CODESPACE, ucdTable
+
+# ******************************************************************************
+PLANE_SIDE = 256
+PLANES = CODESPACE // (PLANE_SIDE * PLANE_SIDE)
+PLANE_COLUMNS = 6
+PLANE_GAP = 8
+WIDTH = PLANE_COLUMNS * PLANE_SIDE + (PLANE_COLUMNS - 1) * PLANE_GAP
+PLANE_ROWS = -(-PLANES // PLANE_COLUMNS)
+HEIGHT = PLANE_ROWS * PLANE_SIDE + (PLANE_ROWS - 1) * PLANE_GAP
+
+# Palette entries of the pixels without counts, the empty code points of
+# consecutive blocks alternate between two shades so that the blocks stand
+# out, the rest of the palette is the colorscale
+GAP_INDEX = 0
+NO_BLOCK_INDEX = 1
+EVEN_BLOCK_INDEX = 2
+ODD_BLOCK_INDEX = 3
+SCALE_START = 4
+GAP_COLOR = (255, 255, 255)
+NO_BLOCK_COLOR = (248, 248, 248)
+EVEN_BLOCK_COLOR = (232, 232, 232)
+ODD_BLOCK_COLOR = (212, 212, 212)
+COLORSCALE = plotly.colors.sequential.Viridis
+# zlib level of the image, the larger ones take much longer for little gain
+PNG_LEVEL = 6
+
+# ******************************************************************************
+@lru_cache(maxsize=1)
+def pixelCodes() -> np.ndarray:
+    """The code point drawn by every pixel of the image, -1 between planes."""
+    codes = np.full((HEIGHT, WIDTH), -1, dtype=np.int32)
+    square = np.arange(PLANE_SIDE * PLANE_SIDE, dtype=np.int32).reshape(PLANE_SIDE, PLANE_SIDE)
+    for plane in range(PLANES):
+        x, y = planeOrigin(plane)
+        codes[y:y + PLANE_SIDE, x:x + PLANE_SIDE] = square + plane * PLANE_SIDE * PLANE_SIDE
+    return codes
+
+
+def planeOrigin(plane: int) -> tuple[int, int]:
+    """Pixel of the first code point of a plane."""
+    row, column = divmod(plane, PLANE_COLUMNS)
+    return column * (PLANE_SIDE + PLANE_GAP), row * (PLANE_SIDE + PLANE_GAP)
+
+
+def codeAt(x: float, y: float) -> int | None:
+    """The code point under a pixel of the image, None between planes."""
+    x, y = int(x), int(y)
+    if not (0 <= x < WIDTH and 0 <= y < HEIGHT):
+        return None
+    code = int(pixelCodes()[y, x])
+    return code if code >= 0 else None
+
+
+@lru_cache(maxsize=1)
+def blockShades() -> np.ndarray:
+    """Palette index of every pixel without counts, by block."""
+    codes = pixelCodes()
+    blocks = np.asarray(ucdTable().props['block'])[np.maximum(codes, 0)]
+    shades = np.where(blocks % 2, ODD_BLOCK_INDEX, EVEN_BLOCK_INDEX).astype(np.uint8)
+    shades[blocks < 0] = NO_BLOCK_INDEX
+    shades[codes < 0] = GAP_INDEX
+    return shades
+
+
+@lru_cache(maxsize=1)
+def palette() -> bytes:
+    """The colors of the palette indices, the colorscale interpolated."""
+    stops = np.array([plotly.colors.hex_to_rgb(c) for c in COLORSCALE], dtype=float)
+    at = np.linspace(0, len(stops) - 1, 256 - SCALE_START)
+    scale = np.stack([np.interp(at, np.arange(len(stops)), stops[:, i])
+                      for i in range(3)], axis=1)
+    colors = np.vstack([GAP_COLOR, NO_BLOCK_COLOR, EVEN_BLOCK_COLOR, ODD_BLOCK_COLOR,
+                        scale])
+    return np.rint(colors).astype(np.uint8).tobytes()
+
+
+def overviewIndices(counts: np.ndarray) -> np.ndarray:
+    """Palette index of every pixel, the counts on a log scale."""
+    counts = np.asarray(counts)
+    top = int(counts.max()) if len(counts) else 0
+    levels = np.zeros(CODESPACE, dtype=np.uint8)
+    present = np.flatnonzero(counts)
+    if len(present):
+        scaled = np.log(counts[present]) / np.log(top) if top > 1 else np.ones(len(present))
+        levels[present] = SCALE_START + np.rint(scaled * (255 - SCALE_START)).astype(np.uint8)
+
+    codes = pixelCodes()
+    indices = levels[np.maximum(codes, 0)]
+    indices[codes < 0] = 0
+    return np.where(indices > 0, indices, blockShades())
+
+
+def encodePng(indices: np.ndarray, colors: bytes, level: int = PNG_LEVEL) -> bytes:
+    """An 8 bit palette PNG of a 2-D array of palette indices."""
+    def chunk(tag: bytes, data: bytes) -> bytes:
+        return (struct.pack('>I', len(data)) + tag + data
+                + struct.pack('>I', zlib.crc32(tag + data) & 0xFFFFFFFF))
+
+    height, width = indices.shape
+    # No filtering, a zero byte before every row
+    raw = np.zeros((height, width + 1), dtype=np.uint8)
+    raw[:, 1:] = indices
+    return (b'\x89PNG\r\n\x1a\n'
+            + chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 3, 0, 0, 0))
+            + chunk(b'PLTE', colors)
+            + chunk(b'IDAT', zlib.compress(raw.tobytes(), level))
+            + chunk(b'IEND', b''))
+
+
+def overviewPng(counts: np.ndarray) -> bytes:
+    """The heatmap of the counts of the whole codespace, as a PNG."""
+    return encodePng(overviewIndices(counts), palette())
+
+# ******************************************************************************
@@ -0,0 +1,148 @@
+# ******************************************************************************
+# Copyright (c) 2025. All rights reserved.
+# # This work is licensed under the Creative Commons Attribution 4.0
+# International License. To view a copy of this license,
+# visit # http://creativecommons.org/licenses/by/4.0/.
+#
+# Author: roximn <roximn148@gmail.com>
+# ******************************************************************************
+from dataclasses import dataclass
+import math
+import threading
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+
+# ******************************************************************************
+TABLE_ROWS = 100
+TABLE_PAGE_SIZES = (50, 100, 250, 500)
+
+# Columns searched by the filter
+SEARCH_COLUMNS = ('char', 'unicode', 'category', 'block', 'script')
+
+# ******************************************************************************
+@dataclass(frozen=True)
+class TablePage:
+    frame: pd.DataFrame
+    page: int
+    pages: int
+    start: int
+    stop: int
+    matches: int
+    rows: int
+
+    def describe(self) -> str:
+        if self.matches == 0:
+            return f'No matching rows of {self.rows:,}.'
+        text = f'Rows {self.start + 1:,}–{self.stop:,} of {self.matches:,} '\
+               f'(page {self.page} of {self.pages})'
+        if self.matches < self.rows:
+            text += f', filtered from {self.rows:,}'
+        return text + '.'
+
+
+class FramePager:
+    """Pages of a frame sorted and filtered on the server.
+
+    The order of every sort column is computed once, as is the search text
+    of the rows. The rows of the last sort and filter are kept, so that
+    turning the pages only slices them and takes the same time however
+    large the frame is.
+
+    Parameters:
+        df(DataFrame): The rows to page through.
+        column(Callable | None): The values of the columns sorted by or
+            searched but not kept by `df`, like the names of the characters.
+        search(tuple): The columns searched by the filter.
+    """
+    def __init__(self, df: pd.DataFrame,
+                 column: Callable[[str], pd.Series] | None = None,
+                 search: tuple[str, ...] = SEARCH_COLUMNS):
+        self.df = df.reset_index(drop=True)
+        self.column = column
+        self.search = search
+        self._orders: dict[tuple[str, bool], np.ndarray] = {}
+        self._search: pd.Series | None = None
+        self._last: tuple[tuple, np.ndarray] | None = None
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.df)
+
+    def values(self, column: str | None) -> pd.Series | None:
+        """A column of the frame or resolved by `column`, None if unknown."""
+        if column in self.df.columns:
+            return self.df[column]
+        if column is None or self.column is None:
+            return None
+        try:
+            return self.column(column).reset_index(drop=True)
+        except ValueError:
+            return None
+
+    def order(self, column: str | None, descending: bool = False) -> np.ndarray:
+        """Row indices sorted by a column, missing values last."""
+        key = (column, descending)
+        if key not in self._orders:
+            values = self.values(column)
+            if values is None:
+                return np.arange(len(self.df))
+            self._orders[key] = values.sort_values(
+                ascending=not descending, kind='stable',
+                na_position='last').index.to_numpy()
+        return self._orders[key]
+
+    def matches(self, text: str) -> np.ndarray | None:
+        """Mask of the rows whose text columns contain `text`, ignoring the
+        case, None for all the rows.
+        """
+        text = text.strip().casefold()
+        if not text:
+            return None
+        if self._search is None:
+            columns = [values.astype(str) for values in map(self.values, self.search)
+                       if values is not None]
+            self._search = pd.Series('\t', index=self.df.index).str.cat(
+                columns, sep='\t').str.casefold()
+        return self._search.str.contains(text, regex=False).to_numpy()
+
+    def rows(self, sortBy: str | None = None, descending: bool = False,
+             text: str = '') -> np.ndarray:
+        """Indices of the matching rows in order."""
+        key = (sortBy, descending, text.strip().casefold())
+        with self._lock:
+            if self._last is not None and self._last[0] == key:
+                return self._last[1]
+            order = self.order(sortBy, descending)
+            mask = self.matches(text)
+            rows = order if mask is None else order[mask[order]]
+            self._last = (key, rows)
+            return rows
+
+    def page(self, page: int = 1, size: int = TABLE_ROWS,
+             sortBy: str | None = None, descending: bool = False,
+             text: str = '') -> TablePage:
+        """A page of the matching rows in order.
+
+        Parameters:
+            page(int): The page, from 1, clipped to the available pages.
+            size(int): Rows per page.
+            sortBy(str | None): The sort column, the frame order when None.
+            descending(bool): Whether to sort in descending order.
+            text(str): Text the rows must contain, any row when empty.
+
+        Returns:
+            The page.
+        """
+        rows = self.rows(sortBy, descending, text)
+        size = max(int(size or TABLE_ROWS), 1)
+        pages = max(math.ceil(len(rows) / size), 1)
+        page = min(max(int(page or 1), 1), pages)
+        start = (page - 1) * size
+        stop = min(start + size, len(rows))
+        return TablePage(frame=self.df.iloc[rows[start:stop]], page=page,
+                         pages=pages, start=start, stop=stop,
+                         matches=len(rows), rows=len(self.df))
+
+# ******************************************************************************
@@ -0,0 +1,265 @@
+# ******************************************************************************
+# Copyright (c) 2025. All rights reserved.
+# # This work is licensed under the Creative Commons Attribution 4.0
+# International License. To view a copy of this license,
+# visit # http://creativecommons.org/licenses/by/4.0/.
+#
+# Author: roximn <roximn148@gmail.com>
+# ******************************************************************************
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .ucd import CODESPACE
+
+# ******************************************************************************
+# Occurrences kept of every code point, the first ones in the file
+POSITIONS_PER_CODE = 32
+# Occurrences kept in all, 20 bytes each
+MAX_POSITIONS = 1_000_000
+# Lines shown around an occurrence and the bytes read to find them
+CONTEXT_LINES = 2
+CONTEXT_BYTES = 4096
+
+POSITION_DTYPE = np.dtype([('code', '<u4'), ('offset', '<i8'), ('line', '<i8')])
+
+LF = 0x0A
+# Occurrences ranked at a time, the frequent code points fill their postings
+# in the first slices and drop out of the following ones
+RANK_SLICE = 1 << 16
+
+# ******************************************************************************
+class PositionIndex:
+    """Byte offsets and line numbers of the first occurrences of every code
+    point, built while counting.
+
+    Up to `perCode` occurrences of each code point are kept, so that the
+    rare characters are indexed completely while the frequent ones stop
+    costing anything once their postings are full, and `limit` caps the
+    whole index. The postings are kept in structured arrays of `code`,
+    `offset` and `line` (from 1, lines end at LF). Parts of a file counted
+    separately, as the shards, are merged in any order, their line numbers
+    are resolved by `copy` once all the parts are known. Offsets assume
+    well-formed text, after a replaced malformed sequence they are those of
+    the re-encoded text.
+    """
+    def __init__(self, perCode: int = POSITIONS_PER_CODE, limit: int = MAX_POSITIONS):
+        self.perCode = min(perCode, 255)
+        self.limit = limit
+        self.kept = np.zeros(CODESPACE, dtype=np.uint8)
+        # Parts of the text, `[start, end, newlines]`, lines being relative to
+        # the part until resolved
+        self.segments: list[list[int]] = []
+        self._parts: list[np.ndarray] = []
+        self._size = 0
+        self.resolved = False
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def full(self) -> bool:
+        """Whether the `limit` was reached, some occurrences are missing."""
+        return self._size >= self.limit
+
+    def add(self, codes: np.ndarray, offset: int, nBytes: int):
+        """Index the code points of a block at a file offset."""
+        if not self.segments or self.segments[-1][1] != offset:
+            self.segments.append([offset, offset, 0])
+        segment = self.segments[-1]
+        newlines = np.flatnonzero(codes == LF)
+        room = self.limit - self._size
+        if room > 0 and len(codes):
+            index = np.flatnonzero(self.kept[codes] < self.perCode)
+            taken = []
+            while len(index) and room > 0:
+                head, index = index[:RANK_SLICE], index[RANK_SLICE:]
+                head = self._firsts(codes, head)[:room]
+                room -= len(head)
+                taken.append(head)
+                if len(index):
+                    index = index[self.kept[codes[index]] < self.perCode]
+            if taken:
+                index = np.concatenate(taken)
+                self._append(codes, index, offset, segment[2] + np.searchsorted(newlines, index))
+        segment[1] = offset + nBytes
+        segment[2] += len(newlines)
+
+    def _firsts(self, codes: np.ndarray, index: np.ndarray) -> np.ndarray:
+        """The indices, in order, of the occurrences still fitting the
+        postings of their code point, counted as kept.
+        """
+        selected = codes[index]
+        order = np.argsort(selected, kind='stable')
+        ordered = selected[order]
+        starts = np.flatnonzero(np.r_[True, ordered[1:] != ordered[:-1]])
+        rank = np.arange(len(ordered)) - np.repeat(starts, np.diff(np.r_[starts, len(ordered)]))
+        fits = rank < self.perCode - self.kept[ordered].astype(np.int64)
+        np.add.at(self.kept, ordered[fits], 1)
+        return index[np.sort(order[fits])]
+
+    def _append(self, codes: np.ndarray, index: np.ndarray, offset: int, lines: np.ndarray):
+        # Bytes of the wider characters preceding every occurrence
+        wide = np.flatnonzero(codes >= 0x80)
+        offsets = index.astype(np.int64)
+        if len(wide):
+            extra = ((codes[wide] >= 0x80).astype(np.int64) + (codes[wide] >= 0x800)
+                     + (codes[wide] >= 0x10000)).cumsum()
+            before = np.searchsorted(wide, index)
+            offsets += np.where(before > 0, extra[np.maximum(before - 1, 0)], 0)
+        part = np.empty(len(index), dtype=POSITION_DTYPE)
+        part['code'] = codes[index]
+        part['offset'] = offset + offsets
+        part['line'] = lines
+        self._parts.append(part)
+        self._size += len(part)
+
+    def merge(self, other: 'PositionIndex') -> 'PositionIndex':
+        """Add the postings of another part of the text, in any order."""
+        if other._parts:
+            self._parts.append(other._entries())
+        self.segments += other.segments
+        entries = self._entries()
+        # The first occurrences by offset, up to `perCode` of each code point
+        entries = entries[np.argsort(entries, order=('code', 'offset'), kind='stable')]
+        codes = entries['code']
+        starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]]) if len(codes) else codes
+        rank = np.arange(len(codes)) - np.repeat(starts, np.diff(np.r_[starts, len(codes)]))
+        entries = entries[rank < self.perCode]
+        entries = np.sort(entries, order='offset')[:self.limit]
+        self._parts = [entries] if len(entries) else []
+        self._size = len(entries)
+        self.kept[:] = 0
+        np.add.at(self.kept, entries['code'], 1)
+        return self
+
+    def _entries(self) -> np.ndarray:
+        if len(self._parts) > 1:
+            self._parts = [np.concatenate(self._parts)]
+        return self._parts[0] if self._parts else np.empty(0, dtype=POSITION_DTYPE)
+
+    def copy(self) -> 'PositionIndex':
+        """A copy with the postings by code point and the line numbers of all
+        the parts resolved from the start of the text.
+        """
+        entries = self._entries().copy()
+        if self.resolved:
+            return PositionIndex.fromEntries(entries, self.perCode, self.limit)
+        segments = sorted(self.segments)
+        if segments and len(entries):
+            starts = np.array([s[0] for s in segments], dtype=np.int64)
+            before = np.cumsum([0] + [s[2] for s in segments[:-1]])
+            segment = np.searchsorted(starts, entries['offset'], side='right') - 1
+            entries['line'] += before[np.maximum(segment, 0)] + 1
+        entries = entries[np.argsort(entries, order=('code', 'offset'), kind='stable')]
+        return PositionIndex.fromEntries(entries, self.perCode, self.limit)
+
+    @property
+    def entries(self) -> np.ndarray:
+        """The postings, by code point and offset once resolved by `copy`."""
+        return self._entries()
+
+    @classmethod
+    def fromEntries(cls, entries: np.ndarray, perCode: int = POSITIONS_PER_CODE,
+                    limit: int = MAX_POSITIONS) -> 'PositionIndex':
+        """An index of resolved postings, sorted by code point and offset."""
+        index = cls(perCode, limit)
+        index._parts = [entries] if len(entries) else []
+        index._size = len(entries)
+        index.resolved = True
+        np.add.at(index.kept, entries['code'], 1)
+        return index
+
+    def occurrences(self, code: int) -> np.ndarray:
+        """The postings of a code point in a resolved index."""
+        entries = self._entries()
+        lo, hi = np.searchsorted(entries['code'], [code, code + 1])
+        return entries[lo:hi]
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        # Rebuilt from the postings
+        del state['kept']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.kept = np.zeros(CODESPACE, dtype=np.uint8)
+        for part in self._parts:
+            np.add.at(self.kept, part['code'], 1)
+
+
+# ******************************************************************************
+def contextLines(path: Path | str, offset: int, lines: int = CONTEXT_LINES,
+                 window: int = CONTEXT_BYTES, compression: str | None = None
+                 ) -> tuple[list[str], str, list[str]]:
+    """The line holding a byte offset of a file and the lines around it.
+
+    Only `window` bytes on each side of the offset are read, longer lines
+    are cut. Compressed files are decompressed up to the offset.
+
+    Parameters:
+        path(Path | str): The file.
+        offset(int): The byte offset.
+        lines(int): Lines shown before and after.
+        window(int): Bytes read on each side of the offset.
+        compression(str | None): The compression of the file, as given by
+            `compressionOf`.
+
+    Returns:
+        The lines before, the line and the lines after, decoded with the
+        malformed sequences replaced.
+    """
+    start = max(offset - window, 0)
+    with Path(path).open('rb') as raw:
+        if compression is None:
+            raw.seek(start)
+            data = raw.read(offset - start + window)
+        else:
+            # Imported here, the compressed streams depend on the counting
+            from .compressed import openDecompressed
+            with openDecompressed(raw, compression) as stream:
+                stream.seek(start)
+                data = stream.read(offset - start + window)
+    pos = offset - start
+    head = data[:pos].split(b'\n')
+    tail = data[pos:].split(b'\n')
+    # The first and the last pieces may be cut by the window
+    before = head[:-1][-lines:] if start == 0 else head[1:-1][-lines:]
+    current = head[-1] + tail[0]
+    after = tail[1:lines + 1]
+
+    def decode(line: bytes) -> str:
+        return line.decode('utf-8', 'replace').rstrip('\r')
+
+    return [decode(b) for b in before], decode(current), [decode(b) for b in after]
+
+
+def occurrenceFrame(index: PositionIndex, code: int,
+                    path: Path | str | None = None,
+                    compression: str | None = None) -> pd.DataFrame:
+    """The indexed occurrences of a code point with their context lines.
+
+    Parameters:
+        index(PositionIndex): The resolved index.
+        code(int): The code point.
+        path(Path | str | None): The file, for the context lines.
+        compression(str | None): The compression of the file.
+
+    Returns:
+        A frame of `occurrence`, `line` and `offset` columns, and the
+        `before`, `text` (the line) and `after` columns given a path.
+    """
+    postings = index.occurrences(code)
+    df = pd.DataFrame({'occurrence': np.arange(1, len(postings) + 1),
+                       'line': postings['line'], 'offset': postings['offset']})
+    if path is not None:
+        context = [contextLines(path, offset, compression=compression)
+                   for offset in postings['offset'].tolist()]
+        df['before'] = ['\n'.join(before) for before, _, _ in context]
+        df['text'] = [text for _, text, _ in context]
+        df['after'] = ['\n'.join(after) for _, _, after in context]
+    return df
+
+# ******************************************************************************
@@ -0,0 +1,129 @@
+# ******************************************************************************
+# Copyright (c) 2025. All rights reserved.
+# # This work is licensed under the Creative Commons Attribution 4.0
+# International License. To view a copy of this license,
+# visit # http://creativecommons.org/licenses/by/4.0/.
+#
+# Author: roximn <roximn148@gmail.com>
+# ******************************************************************************
+# Registry of the per character properties the panels and the exports can
+# add to the character frames. Only the name, category, block and script are
+# part of the frames, the other properties are computed for the characters
+# of a frame the first time they are asked for (see `CharAggregates.column`).
+#
+# More properties are added with:
+#     registerProperty(CharProperty('mirrored', 'Mirrored',
+#                                   perCharacter(lambda c: 'Y' if unicodedata.mirrored(c) else 'N')))
+# ******************************************************************************
+from dataclasses import dataclass
+from typing import Callable, Iterable
+
+import numpy as np
+import pandas as pd
+import unicodedataplus as unicodedata
+
+from .ucd import BLOCK_NAMES, ucdTable
+
+# ******************************************************************************
+# Value of the code points a property leaves empty, like the unassigned ones
+NO_VALUE = 'Unassigned'
+
+BLOCK_ORDER = {name: i for i, name in enumerate(BLOCK_NAMES)}
+
+# ******************************************************************************
+@dataclass(frozen=True)
+class CharProperty:
+    """A property of the characters.
+
+    Parameters:
+        name(str): Name of its column in the frames.
+        label(str): Name shown by the UI.
+        values(Callable): Maps an array of code points to their values.
+        order(Callable | None): Sort key of a series of values, as taken by
+            `DataFrame.sort_values`, in name order if none.
+    """
+    name: str
+    label: str
+    values: Callable[[np.ndarray], np.ndarray]
+    order: Callable[[pd.Series], pd.Series] | None = None
+
+
+PROPERTIES: dict[str, CharProperty] = {}
+
+
+def registerProperty(prop: CharProperty) -> CharProperty:
+    """Add a property to the registry, replacing one of the same name."""
+    PROPERTIES[prop.name] = prop
+    return prop
+
+
+def charProperty(name: str) -> CharProperty:
+    try:
+        return PROPERTIES[name]
+    except KeyError:
+        raise ValueError(f'Unknown character property: {name}') from None
+
+
+def propertyValues(name: str, codes: np.ndarray) -> np.ndarray:
+    """The values of a property for the given code points."""
+    codes = np.asarray(codes, dtype=np.int64)
+    if len(codes) == 0:
+        return np.zeros(0, dtype=object)
+    return charProperty(name).values(codes)
+
+
+def addProperties(df: pd.DataFrame, names: Iterable[str]) -> pd.DataFrame:
+    """A frame having a `code` column with the columns of more properties."""
+    codes = df['code'].to_numpy()
+    return df.assign(**{n: propertyValues(n, codes) for n in names if n not in df.columns})
+
+
+def perCharacter(fn: Callable[[str], str]) -> Callable[[np.ndarray], np.ndarray]:
+    """Map the code points one by one with a function of a character, empty
+    values becoming `NO_VALUE`.
+    """
+    def values(codes: np.ndarray) -> np.ndarray:
+        return np.array([fn(chr(c)) or NO_VALUE for c in codes.tolist()], dtype=object)
+    return values
+
+
+def decompositionType(ch: str) -> str:
+    """'canonical', the tag of a compatibility decomposition or 'none'."""
+    decomposition = unicodedata.decomposition(ch)
+    if not decomposition:
+        return 'none'
+    if decomposition.startswith('<'):
+        return decomposition[1:decomposition.index('>')]
+    return 'canonical'
+
+
+def ageOrder(values: pd.Series) -> pd.Series:
+    """Unicode versions in release order, the unassigned code points last."""
+    def key(age: str) -> float:
+        major, _, minor = age.partition('.')
+        return int(major) + int(minor) / 100 if major.isdigit() else np.inf
+    return values.map(key)
+
+# ******************************************************************************
+registerProperty(CharProperty(
+    'category', 'General category',
+    lambda codes: ucdTable().categories(ucdTable().lookup(codes))))
+registerProperty(CharProperty(
+    'block', 'Block',
+    lambda codes: ucdTable().blocks(ucdTable().lookup(codes)),
+    order=lambda values: values.map(BLOCK_ORDER)))
+registerProperty(CharProperty(
+    'script', 'Script',
+    lambda codes: ucdTable().scripts(ucdTable().lookup(codes))))
+registerProperty(CharProperty(
+    'bidi', 'Bidi class', perCharacter(unicodedata.bidirectional)))
+registerProperty(CharProperty(
+    'eastAsianWidth', 'East Asian width', perCharacter(unicodedata.east_asian_width)))
+registerProperty(CharProperty(
+    'lineBreak', 'Line break class', perCharacter(unicodedata.line_break)))
+registerProperty(CharProperty(
+    'age', 'Age', perCharacter(unicodedata.age), order=ageOrder))
+registerProperty(CharProperty(
+    'decompositionType', 'Decomposition type', perCharacter(decompositionType)))
+
+# ******************************************************************************
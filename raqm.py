@@ -10,7 +10,7 @@ from functools import reduce
 import math
 from pathlib import Path
 import tempfile
-from subprocess import run
+from subprocess import CalledProcessError, run
 
 import cairo
 from shiny import reactive
@@ -19,10 +19,13 @@ from shiny.express import module, ui, render
 from fontTools import ttLib
 from fontTools.pens.svgPathPen import SVGPathPen
 
-from .utils import BBox, GlyphInfo
+from .compute import computeBackend
+from .utils import BBox, GlyphInfo, fontBBox
 
 # ******************************************************************************
 RAQM = '/home/roximn/projects/libraqm/build/src/raqm'
+# Interval between the checks of a queued or running layout
+POLL_SECONDS = 0.5
 
 # ******************************************************************************
 @module
@@ -58,28 +61,24 @@ def modRaqm(input, output, session):
         return tt
 
     # Maximum bounding box -----------------------------------------------------
+    # The glyphs are decompiled by a worker process
+    @reactive.extended_task
+    async def bboxTask(fontFile: str, owner: str) -> BBox:
+        return await computeBackend().run(owner, fontBBox, fontFile,
+                                          label='font bounding box')
+
+    @reactive.effect
+    def startBBox():
+        bboxTask.cancel()
+        if ttFont() is not None:
+            bboxTask(ttFontFile(), session.id)
+
     @reactive.calc
     def maxBBox() -> BBox | None:
-        tt = ttFont()
-        if tt is None:
+        if ttFont() is None:
             return None
 
-        bbMax = BBox()
-
-        glyfTable = tt['glyf']
-        for glyphName in tt.getGlyphOrder():
-            metrics = glyfTable[glyphName]
-
-            xMin = getattr(metrics, 'xMin', 0)
-            yMin = getattr(metrics, 'yMin', 0)
-            xMax = getattr(metrics, 'xMax', 0)
-            yMax = getattr(metrics, 'yMax', 0)
-
-            bbMax.update(x1=xMin, y1=yMin, x2=xMax, y2=yMax)
-
-        bbMax.addMargin(100)
-
-        return bbMax
+        return bboxTask.result()
 
     # Font File Selection ------------------------------------------------------
     with ui.card(class_='bg-light border-dark'):
@@ -165,6 +164,22 @@ def modRaqm(input, output, session):
             )
 
     # Cairo Text Rendering -----------------------------------------------------
+    # Laid out and drawn by a worker process, the latest text only
+    @reactive.extended_task
+    async def layoutTask(fontFile: str, txt: str, direction: str, lang: str,
+                         owner: str) -> tuple[str, int]:
+        return await computeBackend().run(owner, layoutSvg, fontFile, txt,
+                                          direction, lang, label='text layout')
+
+    @reactive.effect
+    def startLayout():
+        ttf = ttFontFile()
+        txt = input.textInput()
+        layoutTask.cancel()
+        if ttf is None or ttFont() is None or not txt:
+            return
+        layoutTask(ttf, txt, input.textDirection(), input.textLanguage(), session.id)
+
     @render.express
     def renderText():
         def showMessage(msg: str):
@@ -173,122 +188,141 @@ def modRaqm(input, output, session):
         def showError(msg: str):
             ui.notification_show(msg, type='error', duration=10, id='errorNotification')
 
-        def drawGlyph(ctx: cairo.Context, gid, x, y, color, dx, dy, ax, ay, W, H, outline=False):
-            ctx.save()
-            ctx.translate(x, y)
-
-            glRun = [cairo.Glyph(gid, dx, dy)]
-
-            if outline:
-                ctx.set_source_rgba(0, 1, 0, 0.5)
-                ctx.arc(0, 0, 3, 0, 2 * math.pi)
-                ctx.stroke_preserve()
-                ctx.fill()
-
-                extents = ctx.glyph_extents(glRun)
-                # print(f'{extents.x_bearing},{extents.y_bearing} '
-                #       f'{extents.width}:{extents.height} - '
-                #       f'{extents.x_advance}:{extents.y_advance}')
-
-                ctx.set_source_rgba(0, 1, 1, 0.25)
-                ctx.set_line_width(1)
-                ctx.rectangle(extents.x_bearing, extents.y_bearing, extents.width, extents.height)
-                ctx.stroke()
-                ctx.set_line_width(2)
-                ctx.rectangle(extents.x_bearing + dx, extents.y_bearing + dy, extents.width, extents.height)
-                ctx.stroke()
-
-                ctx.set_line_width(1)
-                ctx.move_to(extents.x_bearing, extents.y_bearing)
-                ctx.rel_line_to(dx, dy)
-                ctx.stroke()
-
-                if ax:
-                    ctx.set_line_width(1)
-                    ctx.move_to(ax, -H)
-                    ctx.line_to(ax, +H)
-                    ctx.stroke()
-
-                if ay:
-                    ctx.set_line_width(1)
-                    ctx.move_to(-W, ay)
-                    ctx.line_to(+W, ay)
-                    ctx.stroke()
-
-            ctx.set_source_rgba(*color, 0.8)
-            ctx.show_glyphs(glRun)
+        if not input.textInput() or ttFont() is None:
+            return
 
-            ctx.restore()
+        status = layoutTask.status()
+        if status == 'error':
+            showError(f"Error: {layoutTask.error()!s}.")
+            return
+        if status == 'running':
+            reactive.invalidate_later(POLL_SECONDS)
+            ui.tags.small(computeBackend().describe(session.id), class_='text-muted')
+            return
+        if status != 'success':
+            return
 
+        svgData, nGlyphs = layoutTask.result()
+        showMessage(f"{nGlyphs} glyphs rendered.")
+        ui.HTML(svgData)
 
-        ttf = ttFontFile()
-        tt = ttFont()
-        txt = input.textInput()
-        if ttf is None or not txt:
-            return
 
+# ******************************************************************************
+def drawGlyph(ctx: cairo.Context, gid, x, y, color, dx, dy, ax, ay, W, H, outline=False):
+    ctx.save()
+    ctx.translate(x, y)
+
+    glRun = [cairo.Glyph(gid, dx, dy)]
+
+    if outline:
+        ctx.set_source_rgba(0, 1, 0, 0.5)
+        ctx.arc(0, 0, 3, 0, 2 * math.pi)
+        ctx.stroke_preserve()
+        ctx.fill()
+
+        extents = ctx.glyph_extents(glRun)
+        # print(f'{extents.x_bearing},{extents.y_bearing} '
+        #       f'{extents.width}:{extents.height} - '
+        #       f'{extents.x_advance}:{extents.y_advance}')
+
+        ctx.set_source_rgba(0, 1, 1, 0.25)
+        ctx.set_line_width(1)
+        ctx.rectangle(extents.x_bearing, extents.y_bearing, extents.width, extents.height)
+        ctx.stroke()
+        ctx.set_line_width(2)
+        ctx.rectangle(extents.x_bearing + dx, extents.y_bearing + dy, extents.width, extents.height)
+        ctx.stroke()
+
+        ctx.set_line_width(1)
+        ctx.move_to(extents.x_bearing, extents.y_bearing)
+        ctx.rel_line_to(dx, dy)
+        ctx.stroke()
+
+        if ax:
+            ctx.set_line_width(1)
+            ctx.move_to(ax, -H)
+            ctx.line_to(ax, +H)
+            ctx.stroke()
+
+        if ay:
+            ctx.set_line_width(1)
+            ctx.move_to(-W, ay)
+            ctx.line_to(+W, ay)
+            ctx.stroke()
+
+    ctx.set_source_rgba(*color, 0.8)
+    ctx.show_glyphs(glRun)
+
+    ctx.restore()
+
+
+def getGlyphInfo(fontFile: str, txt: str, direction: str, lang: str) -> list[GlyphInfo]:
+    result = run([RAQM, fontFile, txt, direction, lang],
+                    text=True, capture_output=True, check=True)
+    output = result.stdout.splitlines()[1:]
+    gi = [GlyphInfo(*[int(x) for x in line.split(' ')])for line in output]
+    return gi
+
+
+def layoutSvg(fontFile: str, txt: str, direction: str, lang: str) -> tuple[str, int]:
+    """Lay out a text with Raqm and draw its glyphs with Cairo, in a worker
+    process of the compute backend.
+
+    Returns:
+        The SVG document and the number of glyphs.
+    """
+    with ttLib.TTFont(fontFile) as tt:
         fontName = tt['name'].getName(1, 3, 1).toUnicode()
-        direction = input.textDirection()
-        lang = input.textLanguage()
-
-        defaultColor = (0, 0, 0)
-        WIDTH, HEIGHT = 1200, 200
-        SZ = 48
-        MARGIN = 100
-        EMF = SZ / tt['head'].unitsPerEm
-
-        def getGlyphInfo(tt, txt: str, direction: str, lang: str):
-            result = run([RAQM, tt, txt, direction, lang],
-                            text=True, capture_output=True, check=True)
-            output = result.stdout.splitlines()[1:]
-            gi = [GlyphInfo(*[int(x) for x in line.split(' ')])for line in output]
-            return gi
-
-        if ttf is not None and txt:
-            try:
-                gInfos = getGlyphInfo(ttf, txt, direction, lang)
-                showMessage(f"{len(gInfos)} glyphs rendered.")
-
-                svgData = ''
-                with tempfile.NamedTemporaryFile() as fp:
-                    with cairo.SVGSurface(fp.name, WIDTH, HEIGHT) as surface:
-                        surface.set_document_unit(cairo.SVG_UNIT_PX)
-
-                        ctx = cairo.Context(surface)
-                        ctx.select_font_face(fontName, cairo.FONT_SLANT_NORMAL, cairo.FONT_WEIGHT_NORMAL)
-                        ctx.set_font_size(SZ)
-
-                        # Origin
-                        ctx.translate(WIDTH - MARGIN, HEIGHT - MARGIN)
-                        ctx.set_source_rgb(1, 0, 0)
-                        ctx.set_line_width(1)
-                        ctx.move_to(-WIDTH, 0)
-                        ctx.line_to(+WIDTH, 0)
-                        ctx.stroke()
-                        ctx.move_to(0, -HEIGHT)
-                        ctx.line_to(0, +HEIGHT)
-                        ctx.stroke()
-
-                        # Cairo drawing
-                        breath = reduce(lambda v, e: v + e.xAdvance * EMF, gInfos, 0)
-                        curX, curY = -breath, 0
-                        for gi in gInfos:
-                            drawGlyph(ctx,
-                                    gi.gid, curX, curY,
-                                    defaultColor,
-                                    gi.x * EMF, -gi.y * EMF,
-                                    gi.xAdvance * EMF, -gi.yAdvance * EMF,
-                                    WIDTH, HEIGHT,
-                                    outline=True)
-
-                            curX += gi.xAdvance * EMF
-                            curY -= gi.yAdvance * EMF
-
-                    svgData = Path(fp.name).read_text()
-
-                ui.HTML(svgData)
-
-            except Exception as e:
-                    showError(f"Error: {e!s}.")
-                    if hasattr(e, 'stdout'):
-                        showError(f"Error: {e.stdout!s}")
+        unitsPerEm = tt['head'].unitsPerEm
+
+    defaultColor = (0, 0, 0)
+    WIDTH, HEIGHT = 1200, 200
+    SZ = 48
+    MARGIN = 100
+    EMF = SZ / unitsPerEm
+
+    try:
+        gInfos = getGlyphInfo(fontFile, txt, direction, lang)
+    except CalledProcessError as e:
+        # The output is lost when pickled back with the exception
+        raise RuntimeError(f'{e!s} {e.stdout or ""}'.strip()) from None
+
+    with tempfile.NamedTemporaryFile() as fp:
+        with cairo.SVGSurface(fp.name, WIDTH, HEIGHT) as surface:
+            surface.set_document_unit(cairo.SVG_UNIT_PX)
+
+            ctx = cairo.Context(surface)
+            ctx.select_font_face(fontName, cairo.FONT_SLANT_NORMAL, cairo.FONT_WEIGHT_NORMAL)
+            ctx.set_font_size(SZ)
+
+            # Origin
+            ctx.translate(WIDTH - MARGIN, HEIGHT - MARGIN)
+            ctx.set_source_rgb(1, 0, 0)
+            ctx.set_line_width(1)
+            ctx.move_to(-WIDTH, 0)
+            ctx.line_to(+WIDTH, 0)
+            ctx.stroke()
+            ctx.move_to(0, -HEIGHT)
+            ctx.line_to(0, +HEIGHT)
+            ctx.stroke()
+
+            # Cairo drawing
+            breath = reduce(lambda v, e: v + e.xAdvance * EMF, gInfos, 0)
+            curX, curY = -breath, 0
+            for gi in gInfos:
+                drawGlyph(ctx,
+                        gi.gid, curX, curY,
+                        defaultColor,
+                        gi.x * EMF, -gi.y * EMF,
+                        gi.xAdvance * EMF, -gi.yAdvance * EMF,
+                        WIDTH, HEIGHT,
+                        outline=True)
+
+                curX += gi.xAdvance * EMF
+                curY -= gi.yAdvance * EMF
+
+        svgData = Path(fp.name).read_text()
+
+    return svgData, len(gInfos)
+
+# ******************************************************************************
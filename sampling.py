@@ -0,0 +1,252 @@
+# ******************************************************************************
+# Copyright (c) 2025. All rights reserved.
+# # This work is licensed under the Creative Commons Attribution 4.0
+# International License. To view a copy of this license,
+# visit # http://creativecommons.org/licenses/by/4.0/.
+#
+# Author: roximn <roximn148@gmail.com>
+# ******************************************************************************
+from dataclasses import dataclass, field
+import math
+import mmap
+from pathlib import Path
+import time
+
+import numpy as np
+import pandas as pd
+
+from .counting import CR, LF, CountResult, decodeBlock, utf8Boundary
+from .malformed import MalformedIndex
+from .streaming import BackgroundCount
+from .ucd import CODESPACE
+
+# ******************************************************************************
+# Bytes read by an estimate and the size of each sampled block
+SAMPLE_BUDGET = 16 * 1024 * 1024
+SAMPLE_BLOCK = 256 * 1024
+# Files from this size are estimated first in the 'auto' mode
+ESTIMATE_MIN_BYTES = 1024 * 1024 * 1024
+
+ANALYSIS_MODES = ('auto', 'exact', 'estimate')
+
+# Confidence level of the intervals and of the detection limit
+CONFIDENCE = 0.95
+Z_SCORE = 1.959963984540054
+
+# ******************************************************************************
+def analysisMode(mode: str, nBytes: int) -> str:
+    """Resolve the 'auto' mode for a file of given size."""
+    if mode == 'auto':
+        return 'estimate' if nBytes >= ESTIMATE_MIN_BYTES else 'exact'
+    return mode
+
+
+def sampleRanges(path: Path | str, budget: int = SAMPLE_BUDGET,
+                 blockSize: int = SAMPLE_BLOCK,
+                 seed: int | None = None) -> list[tuple[int, int]]:
+    """Randomly placed byte ranges at UTF-8 boundaries covering `budget`
+    bytes of a file.
+
+    The file is divided into as many equal strata as there are blocks and
+    one block is placed at random in each, so that the whole file is
+    covered and the blocks never overlap. Files within the budget are
+    returned as a single range.
+
+    Parameters:
+        path(Path | str): The file to sample.
+        budget(int): Number of bytes to read.
+        blockSize(int): Bytes of each block.
+        seed(int | None): Seed of the placement.
+
+    Returns:
+        List of `(start, end)` byte ranges in file order.
+    """
+    with Path(path).open('rb') as file:
+        size = file.seek(0, 2)
+        if size == 0:
+            return []
+        if size <= budget:
+            return [(0, size)]
+        nBlocks = max(budget // blockSize, 2)
+        width = size / nBlocks
+        blockSize = min(blockSize, int(width))
+        rng = np.random.default_rng(seed)
+        offsets = (np.arange(nBlocks) * width
+                   + rng.random(nBlocks) * (width - blockSize)).astype(np.int64)
+        ranges = []
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for offset in offsets.tolist():
+                start = utf8Boundary(mm, offset)
+                end = utf8Boundary(mm, offset + blockSize)
+                if end > start:
+                    ranges.append((start, end))
+    return ranges
+
+
+def countRange(file, start: int, end: int) -> tuple[np.ndarray, np.ndarray]:
+    """Sparse counts of a byte range of a file in universal newlines mode."""
+    file.seek(start)
+    # Malformed sequences are counted as U+FFFD, they are not indexed
+    codes = decodeBlock(file.read(end - start), MalformedIndex())
+    counts = np.bincount(codes, minlength=CR + 1)
+    if counts[CR]:
+        crlf = int(np.count_nonzero((codes[:-1] == CR) & (codes[1:] == LF)))
+        counts[LF] += counts[CR] - crlf
+        counts[CR] = 0
+    codes = np.flatnonzero(counts)
+    return codes, counts[codes].astype(np.int64)
+
+
+# ******************************************************************************
+@dataclass
+class EstimateResult(CountResult):
+    """Counts of a whole file extrapolated from a sample of its blocks.
+
+    `counts` holds the estimates. The blocks are clusters of a stratified
+    sample, each character is estimated by the ratio of its sampled count
+    to the sampled bytes, with the usual linearized variance of a ratio
+    estimator. The characters absent from the sample are not estimated,
+    `detectionLimit` is the count a character spread over the file would
+    need to be sampled with the given confidence and `missedShare` the
+    Good-Turing estimate of the share of the text made of unseen
+    characters.
+    """
+    sampleBytes: int = 0
+    nBlocks: int = 0
+    # Sampled characters, their sampled counts, number of blocks they were
+    # found in and confidence interval of the estimate
+    codes: np.ndarray = field(default_factory=lambda: np.zeros(0, dtype=np.int64))
+    sampled: np.ndarray = field(default_factory=lambda: np.zeros(0, dtype=np.int64))
+    blocks: np.ndarray = field(default_factory=lambda: np.zeros(0, dtype=np.int64))
+    lower: np.ndarray = field(default_factory=lambda: np.zeros(0))
+    upper: np.ndarray = field(default_factory=lambda: np.zeros(0))
+    detectionLimit: float = 0.0
+    missedShare: float = 0.0
+
+    @property
+    def fraction(self) -> float:
+        """Share of the file sampled."""
+        return self.sampleBytes / self.nBytes if self.nBytes else 1.0
+
+    @property
+    def exact(self) -> bool:
+        return self.sampleBytes >= self.nBytes
+
+    def annotate(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Add the `lower` and `upper` bounds, the `sampled` counts, the
+        number of `blocks` and the `rare` flag to a per character frame.
+
+        Rare characters were found in a single block, their estimates are
+        unreliable and characters like them were likely missed.
+        """
+        at = np.searchsorted(self.codes, df['code'].to_numpy())
+        df = df.copy()
+        df['lower'] = np.round(self.lower[at]).astype(np.int64)
+        df['upper'] = np.round(self.upper[at]).astype(np.int64)
+        df['sampled'] = self.sampled[at]
+        df['blocks'] = self.blocks[at]
+        df['rare'] = (self.blocks[at] < 2) & (not self.exact)
+        return df
+
+
+def estimateCounts(samples: list[tuple[np.ndarray, np.ndarray]],
+                   sizes: list[int], nBytes: int,
+                   seconds: float = 0.0) -> EstimateResult:
+    """Extrapolate the sparse counts of sampled blocks to the whole file.
+
+    Parameters:
+        samples(list): `(codes, counts)` of every block.
+        sizes(list[int]): Bytes of every block.
+        nBytes(int): Bytes of the file.
+        seconds(float): Time taken, reported in the result.
+
+    Returns:
+        The estimate.
+    """
+    nBlocks = len(samples)
+    sampleBytes = int(sum(sizes))
+    codes = np.unique(np.concatenate([c for c, _ in samples] or [np.zeros(0, dtype=np.int64)]))
+    matrix = np.zeros((nBlocks, len(codes)))
+    for i, (c, v) in enumerate(samples):
+        matrix[i, np.searchsorted(codes, c)] = v
+
+    sampled = matrix.sum(axis=0)
+    blocks = np.count_nonzero(matrix, axis=0)
+    if sampleBytes >= nBytes or sampleBytes == 0:
+        estimate, error = sampled, np.zeros(len(codes))
+        detectionLimit = missedShare = 0.0
+    else:
+        sizes = np.asarray(sizes, dtype=np.float64)
+        ratio = sampled / sampleBytes
+        estimate = ratio * nBytes
+        f = sampleBytes / nBytes
+        if nBlocks > 1:
+            residuals = matrix - np.outer(sizes, ratio)
+            variance = (residuals ** 2).sum(axis=0) / (nBlocks - 1)
+            error = Z_SCORE * nBytes * np.sqrt((1 - f) * variance / nBlocks) / sizes.mean()
+        else:
+            error = estimate
+        detectionLimit = math.log(1 - CONFIDENCE) / math.log1p(-f)
+        missedShare = np.count_nonzero(sampled == 1) / max(sampled.sum(), 1)
+
+    counts = np.zeros(CODESPACE, dtype=np.int64)
+    counts[codes] = np.round(estimate).astype(np.int64)
+    return EstimateResult(counts=counts, nBytes=nBytes, seconds=seconds,
+                          sampleBytes=sampleBytes, nBlocks=nBlocks,
+                          codes=codes, sampled=sampled.astype(np.int64),
+                          blocks=blocks, lower=np.maximum(estimate - error, sampled),
+                          upper=estimate + error,
+                          detectionLimit=detectionLimit,
+                          missedShare=float(missedShare))
+
+
+def estimateFile(path: Path | str, budget: int = SAMPLE_BUDGET,
+                 blockSize: int = SAMPLE_BLOCK,
+                 seed: int | None = None) -> EstimateResult:
+    """Estimate the counts of a file from a sample of `budget` bytes."""
+    t0 = time.perf_counter()
+    samples, sizes = [], []
+    with Path(path).open('rb') as file:
+        nBytes = file.seek(0, 2)
+        ranges = sampleRanges(path, budget, blockSize, seed)
+        for start, end in ranges:
+            samples.append(countRange(file, start, end))
+            sizes.append(end - start)
+    return estimateCounts(samples, sizes, nBytes, time.perf_counter() - t0)
+
+
+# ******************************************************************************
+class EstimateCount(BackgroundCount):
+    """Estimate the counts of a file on a background thread.
+
+    Progress is published after every sampled block and the estimate once
+    all of them are read. The sampling never goes through the cache, which
+    would need the whole file hashed.
+    """
+    def __init__(self, path: Path | str, budget: int = SAMPLE_BUDGET,
+                 blockSize: int = SAMPLE_BLOCK, seed: int | None = None):
+        self.path = Path(path)
+        self.ranges = sampleRanges(self.path, budget, blockSize, seed)
+        self.nBytes = self.path.stat().st_size
+        super().__init__(sum(b - a for a, b in self.ranges), snapshotBytes=0)
+
+    def _run(self):
+        samples, sizes = [], []
+        try:
+            with self.path.open('rb') as file:
+                for start, end in self.ranges:
+                    if self.cancelled:
+                        return
+                    samples.append(countRange(file, start, end))
+                    sizes.append(end - start)
+                    self._publish(sum(sizes), phase='sampling')
+        except Exception as e:
+            print(f"Error reading file: {e}")
+            self._publish(0, done=True, error=str(e))
+            return
+
+        result = estimateCounts(samples, sizes, self.nBytes,
+                                time.perf_counter() - self._t0)
+        self._publish(self.total, done=True, result=result)
+
+# ******************************************************************************
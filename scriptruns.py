@@ -0,0 +1,589 @@
+# ******************************************************************************
+# Copyright (c) 2025. All rights reserved.
+# # This work is licensed under the Creative Commons Attribution 4.0
+# International License. To view a copy of this license,
+# visit # http://creativecommons.org/licenses/by/4.0/.
+#
+# Author: roximn <roximn148@gmail.com>
+# ******************************************************************************
+from collections import Counter
+from dataclasses import dataclass, field, replace
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from .lines import ASCII_RATIO, wordScripts
+from .ucd import CODESPACE, ucdTable
+
+# ******************************************************************************
+# Run lengths are binned by powers of two, bin k holding [2**k, 2**(k+1))
+RUN_BINS = 40
+# Scripts are indexed from 1 in the script table, 0 being no strong script
+MAX_SCRIPTS = 256
+# Mixed-script tokens kept by the bounded counts
+TOKEN_CAPACITY = 10_000
+# Longer tokens are kept by their first code points
+MAX_TOKEN_LENGTH = 64
+# Code points looked up at a time from the edges of a block
+EDGE_WINDOW = 256
+
+# Word character flag of the script table, above the script byte
+WORD = 0x100
+NEUTRAL_SCRIPTS = ('Common', 'Inherited', 'Unknown')
+# Odd weights of the code points of tokens by position, for fingerprints
+TOKEN_WEIGHTS = np.random.default_rng(0x5C21).integers(
+    0, 1 << 63, MAX_TOKEN_LENGTH, dtype=np.uint64) * 2 + 1
+
+# ******************************************************************************
+@lru_cache(maxsize=1)
+def scriptTable() -> np.ndarray:
+    """Script index plus one of the code points of a strong script in the
+    low byte, 0 for Common, Inherited and Unknown, and the `WORD` flag of
+    the letters, marks and numbers, by code point.
+    """
+    table = ucdTable()
+    neutral = np.isin(table.scriptNames, NEUTRAL_SCRIPTS)
+    script = table.props['script']
+    strong = np.where(neutral[script], 0, script.astype(np.uint16) + 1)
+    return (strong | np.where(wordScripts() != 0, WORD, 0)).astype(np.uint16)
+
+
+@lru_cache(maxsize=1)
+def asciiLetterFlags() -> np.ndarray:
+    """1 for the ASCII letters of the Latin script, by byte."""
+    flags = np.zeros(256, dtype=np.intp)
+    flags[[*range(0x41, 0x5B), *range(0x61, 0x7B)]] = 1
+    return flags
+
+
+@lru_cache(maxsize=1)
+def asciiLetters() -> bytes:
+    """The `asciiLetterFlags` as a translation table of bytes."""
+    return asciiLetterFlags().astype(np.uint8).tobytes()
+
+
+def runBins(lengths: np.ndarray) -> np.ndarray:
+    """The power of two bins of run lengths of at least 1."""
+    return np.frexp(lengths.astype(np.float64))[1] - 1
+
+
+# ******************************************************************************
+@dataclass
+class TokenPart:
+    """A token, a maximal run of letters, marks and numbers, or the part of
+    it within a part of the text.
+
+    Parameters:
+        length(int): Code points of the token.
+        lo(int): Lowest strong script value (index plus one) of the token,
+            `MAX_SCRIPTS` if none.
+        hi(int): Highest strong script value, 0 if none.
+        prefix(np.ndarray): The first `MAX_TOKEN_LENGTH` code points.
+    """
+    length: int
+    lo: int
+    hi: int
+    prefix: np.ndarray
+
+    @property
+    def mixed(self) -> bool:
+        return self.lo < self.hi
+
+    def text(self) -> str:
+        text = self.prefix.astype('<u4').tobytes().decode('utf-32-le')
+        return text + '…' if self.length > MAX_TOKEN_LENGTH else text
+
+    def join(self, other: 'TokenPart') -> 'TokenPart':
+        """The token continuing into another part."""
+        prefix = self.prefix
+        if len(prefix) < MAX_TOKEN_LENGTH:
+            prefix = np.concatenate((prefix, other.prefix[:MAX_TOKEN_LENGTH - len(prefix)]))
+        return TokenPart(length=self.length + other.length, lo=min(self.lo, other.lo),
+                         hi=max(self.hi, other.hi), prefix=prefix)
+
+
+@dataclass
+class RunSpan:
+    """A contiguous part of a text whose first and last script runs and
+    tokens may continue in the parts around it.
+
+    Parameters:
+        start(int): Byte offset of the part.
+        end(int): Byte offset following the part.
+        head(tuple): Script value and length of the first run, (0, 0)
+            without a strong code point.
+        tail(tuple): Script value and length of the last run.
+        single(bool): Whether the part holds a single run, head and tail.
+        headToken(TokenPart | None): The token at the start, if the part
+            starts with a word character.
+        tailToken(TokenPart | None): The token at the end.
+        whole(bool): Whether the part is a single token, head and tail.
+    """
+    start: int
+    end: int
+    head: tuple[int, int] = (0, 0)
+    tail: tuple[int, int] = (0, 0)
+    single: bool = True
+    headToken: TokenPart | None = None
+    tailToken: TokenPart | None = None
+    whole: bool = False
+
+
+@dataclass
+class ScriptRunStats:
+    """How the scripts of a text are interleaved.
+
+    The code points of the Common, Inherited and Unknown scripts (spaces,
+    punctuation, digits, combining marks) belong to no run, a run goes on
+    across them until a code point of another script. Tokens are maximal
+    runs of letters, marks and numbers, mixed when they hold code points of
+    several strong scripts, as the homoglyph spoofs do.
+
+    Parameters:
+        scripts(list): The scripts having runs.
+        runLengths(ndarray): Runs by script and power of two length bin.
+        runCodes(ndarray): Code points in the runs, by script.
+        transitions(ndarray): Runs followed by a run of another script,
+            from script (rows) to script (columns).
+        tokens(dict): Mixed-script tokens and their counts, the most
+            frequent ones within `error`.
+        mixed(int): Mixed-script tokens in all.
+        error(int): Largest difference between a kept count and its true
+            count, and largest count of the tokens not kept.
+        capacity(int): Tokens kept by the bounded counts.
+    """
+    scripts: list[str]
+    runLengths: np.ndarray
+    runCodes: np.ndarray
+    transitions: np.ndarray
+    tokens: dict[str, int] = field(default_factory=dict)
+    mixed: int = 0
+    error: int = 0
+    capacity: int = TOKEN_CAPACITY
+
+    @property
+    def runs(self) -> int:
+        return int(self.runLengths.sum())
+
+    def runFrame(self) -> pd.DataFrame:
+        """Runs by script, with their code points and mean length, most
+        runs first.
+        """
+        runs = self.runLengths.sum(axis=1)
+        df = pd.DataFrame({'script': self.scripts, 'runs': runs,
+                           'codePoints': self.runCodes,
+                           'meanLength': self.runCodes / np.maximum(runs, 1)})
+        return df.sort_values('runs', ascending=False, kind='stable').reset_index(drop=True)
+
+    def lengthFrame(self) -> pd.DataFrame:
+        """The non zero bins of the run lengths, with `script`, `bin` (the
+        shortest length of the bin), `lengths` (label) and `runs` columns.
+        """
+        scripts, bins = np.nonzero(self.runLengths)
+        lo = np.left_shift(1, bins.astype(np.int64))
+        labels = [str(a) if a == b else f'{a}–{b}'
+                  for a, b in zip(lo.tolist(), (2 * lo - 1).tolist())]
+        return pd.DataFrame({'script': np.array(self.scripts, dtype=object)[scripts],
+                             'bin': lo, 'lengths': labels,
+                             'runs': self.runLengths[scripts, bins]})
+
+    def transitionFrame(self) -> pd.DataFrame:
+        """The script transitions by decreasing count, with `from`, `to`,
+        `count` and `share` (of the runs of `from`) columns.
+        """
+        rows, cols = np.nonzero(self.transitions)
+        counts = self.transitions[rows, cols]
+        runs = self.runLengths.sum(axis=1)
+        names = np.array(self.scripts, dtype=object)
+        df = pd.DataFrame({'from': names[rows], 'to': names[cols], 'count': counts,
+                           'share': counts / np.maximum(runs[rows], 1)})
+        return df.sort_values('count', ascending=False, kind='stable').reset_index(drop=True)
+
+    def tokenFrame(self, top: int | None = None) -> pd.DataFrame:
+        """The mixed-script tokens by decreasing count, with their scripts
+        and code points.
+        """
+        tokens = sorted(self.tokens.items(), key=lambda kv: -kv[1])[:top]
+        table = ucdTable()
+        scripts, unicode = [], []
+        for token, _ in tokens:
+            codes = np.array([ord(c) for c in token.rstrip('…')], dtype=np.int64)
+            names = table.scripts(table.lookup(codes))
+            scripts.append(', '.join(dict.fromkeys(n for n in names
+                                                   if n not in NEUTRAL_SCRIPTS)))
+            unicode.append(' '.join(f'U+{c:04X}' for c in codes.tolist()))
+        return pd.DataFrame({'token': [t for t, _ in tokens],
+                             'count': [c for _, c in tokens],
+                             'upper': [c + self.error for _, c in tokens],
+                             'scripts': scripts, 'unicode': unicode})
+
+
+# ******************************************************************************
+class ScriptRunCounter:
+    """Script runs, script transitions and mixed-script tokens, block by
+    block.
+
+    The state has a fixed size but for the bounded token counts, a
+    mergeable Misra-Gries summary as the bounded n-grams, so files of any
+    size are streamed in bounded memory. Blocks of a single strong script,
+    most blocks of most texts, are summarized from their histogram, only
+    their edges are looked up, and mostly ASCII blocks from their few wide
+    code points. Every block keeps a `RunSpan` of its first
+    and last runs and tokens, joined with the span of the previous block,
+    the parts of a text counted separately are joined when merged in any
+    order.
+    """
+    def __init__(self, capacity: int = TOKEN_CAPACITY):
+        self.capacity = capacity
+        self.runLengths = np.zeros((MAX_SCRIPTS, RUN_BINS), dtype=np.int64)
+        self.runCodes = np.zeros(MAX_SCRIPTS, dtype=np.int64)
+        self.transitions = np.zeros((MAX_SCRIPTS, MAX_SCRIPTS), dtype=np.int64)
+        self.tokens: dict[str, int] = {}
+        self.mixed = 0
+        self.error = 0
+        self.spans: list[RunSpan] = []
+
+    def update(self, codes: np.ndarray, offset: int, nBytes: int,
+               blockCounts: np.ndarray | None = None) -> 'ScriptRunCounter':
+        """Count a block at a byte offset of the text.
+
+        Parameters:
+            codes(np.ndarray): The code points.
+            offset(int): Byte offset of the block.
+            nBytes(int): Bytes of the block.
+            blockCounts(np.ndarray | None): Their histogram if already at
+                hand, used to skip the lookups of the single script blocks.
+        """
+        if len(codes) == 0:
+            return self
+        if blockCounts is None:
+            blockCounts = np.bincount(codes, minlength=CODESPACE)
+        span = self._block(codes, offset, offset + nBytes, blockCounts)
+        if self.spans and self.spans[-1].end == offset:
+            self.spans[-1] = self._join(self.spans[-1], span)
+        else:
+            self.spans.append(span)
+        self._prune()
+        return self
+
+    # Counting -----------------------------------------------------------------
+    def _addRuns(self, scripts: np.ndarray, lengths: np.ndarray):
+        """Count complete runs."""
+        if len(scripts) == 0:
+            return
+        self.runLengths += np.bincount(scripts * RUN_BINS + runBins(lengths),
+                                       minlength=MAX_SCRIPTS * RUN_BINS
+                                       ).reshape(MAX_SCRIPTS, RUN_BINS)
+        self.runCodes += np.bincount(scripts, weights=lengths, minlength=MAX_SCRIPTS
+                                     ).astype(self.runCodes.dtype)
+
+    def _addToken(self, token: TokenPart):
+        if token.mixed:
+            self._addMixed(Counter([token.text()]))
+
+    def _addMixed(self, tokens: Counter):
+        self.mixed += sum(tokens.values())
+        for token, count in tokens.items():
+            self.tokens[token] = self.tokens.get(token, 0) + count
+
+    def _prune(self):
+        """Keep `capacity` tokens, decrementing all the counts by the next
+        largest one.
+        """
+        if len(self.tokens) <= self.capacity:
+            return
+        counts = np.fromiter(self.tokens.values(), dtype=np.int64, count=len(self.tokens))
+        k = len(counts) - self.capacity - 1
+        threshold = int(np.partition(counts, k)[k])
+        self.tokens = {t: c - threshold for t, c in self.tokens.items() if c > threshold}
+        self.error += threshold
+
+    # Blocks -------------------------------------------------------------------
+    def _block(self, codes: np.ndarray, start: int, end: int,
+               blockCounts: np.ndarray) -> RunSpan:
+        table = scriptTable()
+        present = np.flatnonzero(blockCounts)
+        strong = table[present] & 0xFF
+        scripts = np.unique(strong[strong > 0])
+        span = RunSpan(start=start, end=end)
+        self._edgeTokens(codes, span)
+        if len(scripts) <= 1:
+            # A single run, and no mixed token but maybe across the edges
+            if len(scripts):
+                length = int(blockCounts[present[strong > 0]].sum())
+                span.head = span.tail = (int(scripts[0]), length)
+            return span
+
+        wide = int(blockCounts[present[present > 0x7F]].sum())
+        if wide * ASCII_RATIO <= len(codes):
+            self._asciiBlock(codes, span)
+            return span
+
+        values = table[codes]
+        script = values.astype(np.uint8)
+        index = np.flatnonzero(script)
+        sequence = script[index]
+        cuts = np.flatnonzero(sequence[1:] != sequence[:-1]) + 1
+        starts = np.r_[0, cuts]
+        self._addSequence(sequence[starts], np.diff(np.r_[starts, len(sequence)]), span)
+        self._mixedTokens(codes, values >= WORD, index[cuts - 1], index[cuts])
+        return span
+
+    def _asciiBlock(self, codes: np.ndarray, span: RunSpan):
+        """Runs and mixed tokens of a mostly ASCII block, from the few wide
+        code points of the scripts other than Latin.
+        """
+        table = scriptTable()
+        n = len(codes)
+        latin = int(table[ord('a')] & 0xFF)
+        wide = np.flatnonzero(codes > 0x7F)
+        values = table[codes[wide]]
+        script = (values & 0xFF).astype(np.intp)
+        other = (script > 0) & (script != latin)
+        others = wide[other]
+        # Latin code points between the others, from the ASCII letters and
+        # the wide Latin ones, less the ASCII letters of the wide low bytes
+        low = codes.astype(np.uint8).tobytes().translate(asciiLetters())
+        bounds = np.r_[0, others + 1]
+        between = np.zeros(len(bounds), dtype=np.intp)
+        between[bounds < n] = np.add.reduceat(np.frombuffer(low, dtype=np.uint8),
+                                              bounds[bounds < n], dtype=np.intp)
+        np.add.at(between, np.searchsorted(others, wide),
+                  (script == latin).astype(np.intp) - asciiLetterFlags()[codes[wide] & 0xFF])
+        sequence = np.full(2 * len(others) + 1, latin, dtype=np.intp)
+        lengths = np.ones(len(sequence), dtype=np.intp)
+        sequence[1::2], lengths[0::2] = script[other], between
+        sequence, lengths = sequence[lengths > 0], lengths[lengths > 0]
+        starts = np.r_[0, np.flatnonzero(sequence[1:] != sequence[:-1]) + 1]
+        self._addSequence(sequence[starts], np.add.reduceat(lengths, starts), span)
+
+        # Only the tokens with other code points may be mixed
+        others = others[values[other] >= WORD]
+        first = others - self._wordLength(codes, others, -1)
+        last = others + self._wordLength(codes, others, 1) + 1
+        edge = (first == 0) | (last == n)
+        first, unique = np.unique(first[~edge], return_index=True)
+        if len(first) == 0:
+            return
+        lengths = last[~edge][unique] - first
+        ends = np.cumsum(lengths)
+        script = (table[codes[np.repeat(first - ends + lengths, lengths)
+                              + np.arange(ends[-1])]] & 0xFF).astype(np.intp)
+        lo = np.minimum.reduceat(np.where(script > 0, script, MAX_SCRIPTS), ends - lengths)
+        hi = np.maximum.reduceat(script, ends - lengths)
+        self._countTokens(codes, first[lo < hi], lengths[lo < hi])
+
+    def _addSequence(self, scripts: np.ndarray, lengths: np.ndarray, span: RunSpan):
+        """Count the runs of `scripts` of `lengths` of a block of at least
+        two runs.
+        """
+        scripts = scripts.astype(np.intp)
+        # The first and last runs may continue in the parts around
+        self._addRuns(scripts[1:-1], lengths[1:-1])
+        self.transitions += np.bincount(scripts[:-1] * MAX_SCRIPTS + scripts[1:],
+                                        minlength=MAX_SCRIPTS * MAX_SCRIPTS
+                                        ).reshape(MAX_SCRIPTS, MAX_SCRIPTS)
+        span.head = (int(scripts[0]), int(lengths[0]))
+        span.tail = (int(scripts[-1]), int(lengths[-1]))
+        span.single = False
+
+    def _mixedTokens(self, codes: np.ndarray, word: np.ndarray, before: np.ndarray,
+                     after: np.ndarray):
+        """Count the tokens holding a script change, from the last code point
+        `before` to the first one `after` the changes, within a block.
+        """
+        n = len(codes)
+        # A change within a token has only word characters around
+        inner = word[before] & word[after]
+        gaps = np.flatnonzero(inner & (after - before > 1))
+        inner[gaps] = word[before[gaps] + 1] & word[after[gaps] - 1]
+        gaps = gaps[inner[gaps] & (after[gaps] - before[gaps] > 3)]
+        if len(gaps):
+            bounds = np.empty(2 * len(gaps), dtype=np.intp)
+            bounds[0::2], bounds[1::2] = before[gaps], after[gaps]
+            inner[gaps] = np.add.reduceat(~word, bounds)[0::2] == 0
+        before = before[inner]
+        if len(before) == 0:
+            return
+        breaks = np.flatnonzero(~word)
+        if len(breaks) == 0:
+            # The whole block is one token, counted with the span
+            return
+        at = np.searchsorted(breaks, before)
+        first = np.where(at > 0, breaks[np.maximum(at - 1, 0)] + 1, 0)
+        last = np.where(at < len(breaks), breaks[np.minimum(at, len(breaks) - 1)], n)
+        # The tokens at the edges are counted with the spans
+        edge = (first == 0) | (last == n)
+        first, unique = np.unique(first[~edge], return_index=True)
+        if len(first):
+            self._countTokens(codes, first, last[~edge][unique] - first)
+
+    def _countTokens(self, codes: np.ndarray, first: np.ndarray, lengths: np.ndarray):
+        """Count the mixed tokens of `lengths` code points from `first`."""
+        if len(first) == 0:
+            return
+        kept = np.minimum(lengths, MAX_TOKEN_LENGTH)
+        ends = np.cumsum(kept)
+        position = np.arange(ends[-1]) - np.repeat(ends - kept, kept)
+        gather = codes[np.repeat(first, kept) + position].astype(np.uint64)
+        # Fingerprint the tokens to decode each distinct one once
+        total = np.cumsum(gather * TOKEN_WEIGHTS[position])
+        hashes = total[ends - 1] - np.r_[np.uint64(0), total[ends[:-1] - 1]]
+        hashes ^= (lengths > MAX_TOKEN_LENGTH).astype(np.uint64)
+        hashes, index, counts = np.unique(hashes, return_index=True, return_counts=True)
+        tokens = Counter()
+        for i, count in zip(index.tolist(), counts.tolist()):
+            token = codes[first[i]:first[i] + kept[i]].astype('<u4').tobytes()
+            text = token.decode('utf-32-le') + ('…' if lengths[i] > MAX_TOKEN_LENGTH else '')
+            tokens[text] += count
+        self._addMixed(tokens)
+
+    @staticmethod
+    def _wordLength(codes: np.ndarray, positions: np.ndarray, step: int) -> np.ndarray:
+        """The number of word characters next to `positions` going by `step`,
+        within the block, looking up windows of growing size.
+        """
+        table = scriptTable()
+        n = len(codes)
+        length = np.zeros(len(positions), dtype=np.intp)
+        active = np.arange(len(positions))
+        window = 16
+        while len(active):
+            at = positions[active, None] + step * (length[active, None]
+                                                   + np.arange(1, window + 1))
+            inside = (at >= 0) & (at < n)
+            word = inside & (table[codes[np.clip(at, 0, n - 1)]] >= WORD)
+            done = ~word.all(axis=1)
+            length[active[done]] += np.argmin(word[done], axis=1)
+            length[active[~done]] += window
+            active = active[~done]
+            window *= 2
+        return length
+
+    @staticmethod
+    def _part(codes: np.ndarray) -> TokenPart:
+        script = scriptTable()[codes].astype(np.uint8)
+        strong = script[script > 0]
+        return TokenPart(length=len(codes),
+                         lo=int(strong.min()) if len(strong) else MAX_SCRIPTS,
+                         hi=int(strong.max()) if len(strong) else 0,
+                         prefix=codes[:MAX_TOKEN_LENGTH].astype(np.uint32))
+
+    def _edgeTokens(self, codes: np.ndarray, span: RunSpan):
+        """Find the tokens at the edges of a block, looking up windows of
+        growing size from either end.
+        """
+        table = scriptTable()
+        n = len(codes)
+
+        def wordLength(reverse: bool) -> int:
+            k, window = 0, EDGE_WINDOW
+            while k < n:
+                part = codes[max(n - k - window, 0):n - k][::-1] if reverse \
+                    else codes[k:k + window]
+                breaks = np.flatnonzero(table[part] < WORD)
+                if len(breaks):
+                    return k + int(breaks[0])
+                k += len(part)
+                window *= 2
+            return n
+
+        head = wordLength(False)
+        if head:
+            span.headToken = self._part(codes[:head])
+            span.whole = head == n
+        if span.whole:
+            span.tailToken = span.headToken
+        else:
+            tail = wordLength(True)
+            if tail:
+                span.tailToken = self._part(codes[n - tail:])
+
+    # Joining ------------------------------------------------------------------
+    def _join(self, a: RunSpan, b: RunSpan) -> RunSpan:
+        """The span of two contiguous spans, counting the runs and the token
+        across them.
+        """
+        span = RunSpan(start=a.start, end=b.end)
+        if a.head[0] == 0 or b.head[0] == 0:
+            # Either part has no run
+            other = b if a.head[0] == 0 else a
+            span.head, span.tail, span.single = other.head, other.tail, other.single
+        elif a.tail[0] == b.head[0]:
+            merged = (a.tail[0], a.tail[1] + b.head[1])
+            span.head = merged if a.single else a.head
+            span.tail = merged if b.single else b.tail
+            span.single = a.single and b.single
+            if not a.single and not b.single:
+                self._addRuns(np.array([merged[0]]), np.array([merged[1]]))
+        else:
+            self.transitions[a.tail[0], b.head[0]] += 1
+            if not a.single:
+                self._addRuns(np.array([a.tail[0]]), np.array([a.tail[1]]))
+            if not b.single:
+                self._addRuns(np.array([b.head[0]]), np.array([b.head[1]]))
+            span.head, span.tail, span.single = a.head, b.tail, False
+
+        if a.tailToken is not None and b.headToken is not None:
+            merged = a.tailToken.join(b.headToken)
+            span.headToken = merged if a.whole else a.headToken
+            span.tailToken = merged if b.whole else b.tailToken
+            span.whole = a.whole and b.whole
+            if not a.whole and not b.whole:
+                self._addToken(merged)
+        else:
+            if a.tailToken is not None and not a.whole:
+                self._addToken(a.tailToken)
+            if b.headToken is not None and not b.whole:
+                self._addToken(b.headToken)
+            span.headToken, span.tailToken = a.headToken, b.tailToken
+        return span
+
+    def merge(self, other: 'ScriptRunCounter') -> 'ScriptRunCounter':
+        """Add the counts of other parts of the text, in any order."""
+        self.runLengths += other.runLengths
+        self.runCodes += other.runCodes
+        self.transitions += other.transitions
+        for token, count in other.tokens.items():
+            self.tokens[token] = self.tokens.get(token, 0) + count
+        self.mixed += other.mixed
+        self.error += other.error
+        spans = sorted(self.spans + [replace(s) for s in other.spans],
+                       key=lambda s: s.start)
+        self.spans = spans[:1]
+        for span in spans[1:]:
+            if self.spans[-1].end == span.start:
+                self.spans[-1] = self._join(self.spans[-1], span)
+            else:
+                self.spans.append(span)
+        self._prune()
+        return self
+
+    def result(self) -> ScriptRunStats:
+        """The statistics, counting the first and last runs and tokens of
+        the parts.
+        """
+        counter = ScriptRunCounter(self.capacity)
+        counter.merge(self)
+        for span in counter.spans:
+            if span.head[0]:
+                counter._addRuns(np.array([span.head[0]]), np.array([span.head[1]]))
+                if not span.single:
+                    counter._addRuns(np.array([span.tail[0]]), np.array([span.tail[1]]))
+            if span.headToken is not None:
+                counter._addToken(span.headToken)
+            if span.tailToken is not None and not span.whole:
+                counter._addToken(span.tailToken)
+        counter._prune()
+
+        names = ucdTable().scriptNames
+        scripts = np.flatnonzero(counter.runCodes)
+        return ScriptRunStats(scripts=[names[i - 1] for i in scripts.tolist()],
+                              runLengths=counter.runLengths[scripts],
+                              runCodes=counter.runCodes[scripts],
+                              transitions=counter.transitions[np.ix_(scripts, scripts)],
+                              tokens=counter.tokens, mixed=counter.mixed,
+                              error=counter.error, capacity=counter.capacity)
+
+# ******************************************************************************
@@ -0,0 +1,272 @@
+# ******************************************************************************
+# Copyright (c) 2025. All rights reserved.
+# # This work is licensed under the Creative Commons Attribution 4.0
+# International License. To view a copy of this license,
+# visit # http://creativecommons.org/licenses/by/4.0/.
+#
+# Author: roximn <roximn148@gmail.com>
+# ******************************************************************************
+# Detection of the characters used to hide or spoof text: invisible and bidi
+# control characters, unusual spaces, and characters looking like others.
+#
+# The look-alikes follow the single code point prototypes of UTS #39: the
+# NFKC mappings and the cross-script homoglyphs of `HOMOGLYPHS`, or the
+# confusables.txt of the Unicode security data when SHINOMNI_CONFUSABLES
+# names a copy of it. ASCII characters are their own prototypes, so that
+# I, l and 1 are not reported in every English text.
+# ******************************************************************************
+from dataclasses import dataclass
+from functools import lru_cache
+import hashlib
+import os
+from pathlib import Path
+import tempfile
+
+import numpy as np
+import pandas as pd
+import unicodedataplus as unicodedata
+
+from .ucd import CATEGORY_NAMES, CODESPACE, tablesDir, ucdTable
+
+# ******************************************************************************
+# Kinds of risk, bits of the flags of the code points
+INVISIBLE = 0x01
+BIDI = 0x02
+CONTROL = 0x04
+SPACE = 0x08
+PRIVATE = 0x10
+UNASSIGNED = 0x20
+CONFUSABLE = 0x40
+RISK_NAMES = {INVISIBLE: 'invisible', BIDI: 'bidi control', CONTROL: 'control',
+              SPACE: 'unusual space', PRIVATE: 'private use',
+              UNASSIGNED: 'unassigned', CONFUSABLE: 'confusable'}
+
+SECURITY_DTYPE = np.dtype([('flags', np.uint8), ('prototype', np.int32)])
+
+# Bidi_Control code points
+BIDI_CONTROLS = [0x061C, 0x200E, 0x200F, *range(0x202A, 0x202F), *range(0x2066, 0x206A)]
+# Default_Ignorable_Code_Point is Cf, the variation selectors and these,
+# less the ranges below
+OTHER_IGNORABLES = [(0x034F, 0x034F), (0x115F, 0x1160), (0x17B4, 0x17B5),
+                    (0x180B, 0x180F), (0x3164, 0x3164), (0xFE00, 0xFE0F),
+                    (0xFFA0, 0xFFA0), (0xFFF0, 0xFFF8), (0x1D173, 0x1D17A),
+                    (0xE0000, 0xE0FFF)]
+# Visible format characters: prepended concatenation marks, interlinear
+# annotations and Egyptian hieroglyph format controls
+VISIBLE_FORMATS = [(0x0600, 0x0605), (0x06DD, 0x06DD), (0x070F, 0x070F),
+                   (0x0890, 0x0891), (0x08E2, 0x08E2), (0xFFF9, 0xFFFB),
+                   (0x110BD, 0x110BD), (0x110CD, 0x110CD), (0x13430, 0x1345F)]
+# Spaces other than the ASCII one, with the line separators
+OTHER_SPACES = [0x0085, 0x2028, 0x2029]
+# Controls of ordinary text
+TEXT_CONTROLS = [0x09, 0x0A, 0x0D]
+
+# Characters looking like a character of another script, from the
+# confusables of UTS #39
+HOMOGLYPHS = {
+    # Cyrillic
+    'а': 'a', 'в': 'ʙ', 'е': 'e', 'о': 'o', 'р': 'p', 'с': 'c', 'у': 'y',
+    'х': 'x', 'ѕ': 's', 'і': 'i', 'ј': 'j', 'һ': 'h', 'ԁ': 'd', 'ԛ': 'q',
+    'ԝ': 'w', 'ӏ': 'l', 'ү': 'y',
+    'А': 'A', 'В': 'B', 'Е': 'E', 'К': 'K', 'М': 'M', 'Н': 'H', 'О': 'O',
+    'Р': 'P', 'С': 'C', 'Т': 'T', 'Х': 'X', 'У': 'Y', 'Ѕ': 'S', 'І': 'I',
+    'Ј': 'J', 'Ԛ': 'Q', 'Ԝ': 'W', 'Ү': 'Y', 'Ӏ': 'I', 'Ꙅ': 'S',
+    # Greek
+    'α': 'a', 'ο': 'o', 'ν': 'v', 'ρ': 'p', 'ι': 'i', 'γ': 'y', 'κ': 'ĸ',
+    'Α': 'A', 'Β': 'B', 'Ε': 'E', 'Ζ': 'Z', 'Η': 'H', 'Ι': 'I', 'Κ': 'K',
+    'Μ': 'M', 'Ν': 'N', 'Ο': 'O', 'Ρ': 'P', 'Τ': 'T', 'Υ': 'Y', 'Χ': 'X',
+    # Armenian
+    'օ': 'o', 'ո': 'n', 'ս': 'u', 'հ': 'h', 'ց': 'g', 'զ': 'q', 'Տ': 'S',
+    'Օ': 'O', 'Ս': 'U',
+    # Cherokee
+    'Ꭺ': 'A', 'Ᏼ': 'B', 'Ꮯ': 'C', 'Ꭼ': 'E', 'Ꮐ': 'G', 'Ꮋ': 'H', 'Ꭻ': 'J',
+    'Ꮶ': 'K', 'Ꮇ': 'M', 'Ꮲ': 'P', 'Ꮪ': 'S', 'Ꭲ': 'T', 'Ꮃ': 'W', 'Ꮓ': 'Z',
+    # Latin
+    'ɑ': 'a', 'ɡ': 'g', 'ı': 'i', 'ȷ': 'j', 'ɩ': 'i', 'ǀ': 'l',
+    # Lisu
+    'ꓮ': 'A', 'ꓐ': 'B', 'ꓚ': 'C', 'ꓓ': 'D', 'ꓰ': 'E', 'ꓝ': 'F', 'ꓖ': 'G',
+    'ꓧ': 'H', 'ꓙ': 'J', 'ꓗ': 'K', 'ꓡ': 'L', 'ꓟ': 'M', 'ꓠ': 'N', 'ꓳ': 'O',
+    'ꓑ': 'P', 'ꓣ': 'R', 'ꓢ': 'S', 'ꓔ': 'T', 'ꓴ': 'U', 'ꓦ': 'V', 'ꓪ': 'W',
+    'ꓫ': 'X', 'ꓬ': 'Y', 'ꓜ': 'Z', 'ꓲ': 'I',
+    # Punctuation and symbols
+    '‐': '-', '‑': '-', '‒': '-', '–': '-', '—': '-', '―': '-', '−': '-',
+    '˗': '-', '‘': "'", '’': "'", '‛': "'", 'ʼ': "'", '′': "'",
+    '“': '"', '”': '"', '‟': '"', '″': '"', '⁄': '/', '∕': '/', '∶': ':',
+    '։': ':', '˸': ':', '‚': ',', '٫': ',', '․': '.', '۔': '.', 'ǃ': '!',
+    '٭': '*', '∗': '*', '‹': '<', '›': '>', '˂': '<', '˃': '>', 'ǁ': '‖',
+    # Digits
+    '٠': '.', '۰': '.', '০': 'O', '੦': 'o', '૦': 'o', '୦': 'o', '௦': 'o',
+    '౦': 'o', '೦': 'o', '൦': 'o', '๐': 'o', '໐': 'o', '၀': 'o', '߀': 'O',
+}
+
+# ******************************************************************************
+def _ranges(pairs: list[tuple[int, int]]) -> np.ndarray:
+    return np.concatenate([np.arange(a, b + 1) for a, b in pairs])
+
+
+def parseConfusables(path: Path) -> dict[str, str]:
+    """The single code point prototypes of a UTS #39 confusables.txt."""
+    prototypes = {}
+    with Path(path).open(encoding='utf-8-sig') as file:
+        for line in file:
+            fields = line.split('#', 1)[0].split(';')
+            if len(fields) < 2:
+                continue
+            source = fields[0].split()
+            target = fields[1].split()
+            if len(source) == 1 and len(target) == 1:
+                prototypes[chr(int(source[0], 16))] = chr(int(target[0], 16))
+    return prototypes
+
+
+def buildSecurityTable(dst: Path, confusables: Path | None = None) -> Path:
+    """Build the risk flags and look-alike prototypes of all the code points
+    and save them as `dst`.
+
+    Parameters:
+        dst(Path): The file to create.
+        confusables(Path | None): A confusables.txt replacing `HOMOGLYPHS`.
+    """
+    categories = CATEGORY_NAMES[np.asarray(ucdTable().props['category'])]
+    flags = np.zeros(CODESPACE, dtype=np.uint8)
+
+    ignorable = categories == 'Cf'
+    ignorable[_ranges(OTHER_IGNORABLES)] = True
+    ignorable[_ranges(VISIBLE_FORMATS)] = False
+    ignorable[BIDI_CONTROLS] = False
+    flags[ignorable] |= INVISIBLE
+    flags[BIDI_CONTROLS] |= BIDI
+    controls = categories == 'Cc'
+    controls[TEXT_CONTROLS] = False
+    flags[controls] |= CONTROL
+    spaces = categories == 'Zs'
+    spaces[0x20] = False
+    spaces[OTHER_SPACES] = True
+    flags[spaces] |= SPACE
+    flags[categories == 'Co'] |= PRIVATE
+    flags[categories == 'Cn'] |= UNASSIGNED
+
+    homoglyphs = HOMOGLYPHS if confusables is None else parseConfusables(confusables)
+    prototypes = np.arange(CODESPACE, dtype=np.int32)
+    assigned = np.flatnonzero(~np.isin(categories, ['Cn', 'Cs', 'Co']))
+    for cp in assigned[assigned >= 0x80].tolist():
+        ch = chr(cp)
+        target = unicodedata.normalize('NFKC', ch)
+        target = homoglyphs.get(ch, homoglyphs.get(target, target))
+        if len(target) == 1 and target != ch:
+            prototypes[cp] = ord(target)
+    flags[prototypes != np.arange(CODESPACE)] |= CONFUSABLE
+
+    table = np.zeros(CODESPACE, dtype=SECURITY_DTYPE)
+    table['flags'] = flags
+    table['prototype'] = prototypes
+
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(suffix='.npy', dir=dst.parent)
+    try:
+        with os.fdopen(fd, 'wb') as file:
+            np.save(file, table)
+        os.replace(tmp, dst)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+    return dst
+
+
+@lru_cache(maxsize=1)
+def securityTable() -> np.ndarray:
+    """The memory mapped risk flags and prototypes, built on first use."""
+    # The UCD tables first, they are built into a directory of their own
+    ucdTable()
+    confusables = os.environ.get('SHINOMNI_CONFUSABLES')
+    if confusables:
+        digest = hashlib.sha1(Path(confusables).read_bytes()).hexdigest()[:12]
+        path = tablesDir() / f'security-{digest}.npy'
+    else:
+        path = tablesDir() / 'security.npy'
+    if not path.exists():
+        buildSecurityTable(path, Path(confusables) if confusables else None)
+    return np.load(path, mmap_mode='r')
+
+
+# ******************************************************************************
+@dataclass
+class RiskReport:
+    """The risky characters of a text.
+
+    Parameters:
+        chars(DataFrame): The characters with a risk, their count, kinds of
+            risk and the character they look like.
+        collisions(DataFrame): The prototypes shared by several characters
+            of the text, with these characters and their counts.
+        totals(DataFrame): Distinct characters and occurrences by kind.
+    """
+    chars: pd.DataFrame
+    collisions: pd.DataFrame
+    totals: pd.DataFrame
+
+    @property
+    def occurrences(self) -> int:
+        return int(self.chars['count'].sum()) if len(self.chars) else 0
+
+    def describe(self) -> str:
+        if not len(self.chars):
+            return 'No invisible, control, unusual space or confusable characters.'
+        kinds = ', '.join(f'{int(r.count):,} {r.risk}' for r in self.totals.itertuples()
+                          if r.count)
+        return (f'{self.occurrences:,} occurrence(s) of {len(self.chars):,} risky '
+                f'character(s): {kinds}. {len(self.collisions):,} look-alike '
+                f'collision(s) between characters of the text.')
+
+
+def riskLabels(flags: np.ndarray) -> list[str]:
+    return [', '.join(name for bit, name in RISK_NAMES.items() if f & bit)
+            for f in flags.tolist()]
+
+
+def detectRisks(counts: np.ndarray) -> RiskReport:
+    """Flag the risky characters of counts indexed by code point, and the
+    characters sharing a look-alike prototype, over the distinct characters.
+    """
+    table = ucdTable()
+    present = np.flatnonzero(counts)
+    records = securityTable()[present]
+    flags = records['flags']
+    prototypes = records['prototype'].astype(np.int64)
+    presentCounts = counts[present]
+
+    def describe(codes: np.ndarray, values: np.ndarray) -> pd.DataFrame:
+        info = table.lookup(codes)
+        return pd.DataFrame({
+            'char': [chr(c) for c in codes.tolist()],
+            'count': values,
+            'code': codes.astype(np.int64),
+            'unicode': table.labels(codes, records=info),
+            'script': table.scripts(info),
+        })
+
+    risky = flags != 0
+    chars = describe(present[risky], presentCounts[risky])
+    chars['risk'] = riskLabels(flags[risky])
+    lookalikes = prototypes[risky]
+    chars['lookalike'] = [chr(p) if p != c else '' for p, c in
+                          zip(lookalikes.tolist(), present[risky].tolist())]
+
+    totals = pd.DataFrame({
+        'risk': list(RISK_NAMES.values()),
+        'chars': [int(np.count_nonzero(flags & bit)) for bit in RISK_NAMES],
+        'count': [int(presentCounts[(flags & bit) != 0].sum()) for bit in RISK_NAMES],
+    })
+
+    _, groups, sizes = np.unique(prototypes, return_inverse=True, return_counts=True)
+    shared = sizes[groups] > 1
+    members = describe(present[shared], presentCounts[shared])
+    members['prototype'] = [chr(p) for p in prototypes[shared].tolist()]
+    collisions = (members.groupby('prototype', sort=True)
+                  .agg(chars=('char', ' '.join), names=('unicode', ' | '.join),
+                       scripts=('script', lambda s: ', '.join(sorted(set(s)))),
+                       count=('count', 'sum'))
+                  .reset_index())
+    return RiskReport(chars=chars, collisions=collisions, totals=totals)
+
+# ******************************************************************************
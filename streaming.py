@@ -0,0 +1,275 @@
+# ******************************************************************************
+# Copyright (c) 2025. All rights reserved.
+# # This work is licensed under the Creative Commons Attribution 4.0
+# International License. To view a copy of this license,
+# visit # http://creativecommons.org/licenses/by/4.0/.
+#
+# Author: roximn <roximn148@gmail.com>
+# ******************************************************************************
+from abc import ABC, abstractmethod
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from dataclasses import dataclass
+from pathlib import Path
+import threading
+import time
+
+import pandas as pd
+
+from .cache import ResultCache, contentKey
+from .compressed import compressionOf, iterDecompressedBlocks
+from .compute import computeBackend
+from .counting import (BLOCK_SIZE, CodeCounter, CountOptions, CountResult,
+                       autoWorkers, iterByteBlocks, shardBounds,
+                       countShard, workerPool)
+
+# ******************************************************************************
+# Default interval, in bytes, between the partial results
+SNAPSHOT_BYTES = 64 * 1024 * 1024
+# Smaller intervals only add copies of the whole histogram
+MIN_SNAPSHOT_BYTES = 1024 * 1024
+
+# ******************************************************************************
+@dataclass(frozen=True)
+class Snapshot:
+    nBytes: int
+    total: int
+    seconds: float
+    result: CountResult | None = None
+    done: bool = False
+    error: str | None = None
+    cached: bool = False
+    files: pd.DataFrame | None = None
+    phase: str = 'counting'
+    # Compression of the file, the progress is in compressed bytes
+    compression: str | None = None
+
+    @property
+    def fraction(self) -> float:
+        return self.nBytes / self.total if self.total else 1.0
+
+    @property
+    def rate(self) -> float:
+        """Processing rate in bytes/s."""
+        return self.nBytes / self.seconds if self.seconds > 0 else 0.0
+
+    @property
+    def eta(self) -> float | None:
+        """Estimated seconds to completion."""
+        rate = self.rate
+        if self.done or rate <= 0:
+            return None
+        return (self.total - self.nBytes) / rate
+
+
+# ******************************************************************************
+class BackgroundCount(ABC):
+    """Base of the counts running on a background thread.
+
+    Subclasses implement `_run` and call `_publish` to make progress and
+    partial results visible through `snapshot`. The work they hand to the
+    worker processes goes through `_submit`, queued in the compute backend
+    on behalf of the `owner` session when given, straight to the pool
+    otherwise.
+    """
+    def __init__(self, total: int, snapshotBytes: int = SNAPSHOT_BYTES,
+                 owner: str | None = None):
+        self.total = total
+        self.owner = owner
+        self.snapshotBytes = max(snapshotBytes, MIN_SNAPSHOT_BYTES) if snapshotBytes > 0 else 0
+
+        self._lock = threading.Lock()
+        self._cancelled = threading.Event()
+        self._snapshot = Snapshot(nBytes=0, total=self.total, seconds=0.0)
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._t0 = 0.0
+        self.compression: str | None = None
+
+    def start(self) -> 'BackgroundCount':
+        self._t0 = time.perf_counter()
+        self._thread.start()
+        return self
+
+    def cancel(self):
+        self._cancelled.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    @property
+    def snapshot(self) -> Snapshot:
+        """The latest published snapshot, the same object until the next."""
+        with self._lock:
+            return self._snapshot
+
+    def wait(self, timeout: float | None = None) -> Snapshot:
+        self._thread.join(timeout)
+        return self.snapshot
+
+    # --------------------------------------------------------------------------
+    def _submit(self, fn, *args) -> Future:
+        """Call `fn(*args)` in a worker process."""
+        if self.owner is None:
+            return workerPool().submit(fn, *args)
+        return computeBackend().submit(self.owner, fn, *args, label='counting').future
+
+    def _publish(self, nBytes: int, counter: CodeCounter | None = None,
+                 done: bool = False, error: str | None = None,
+                 result: CountResult | None = None, cached: bool = False,
+                 files: pd.DataFrame | None = None, phase: str = 'counting',
+                 textBytes: int | None = None):
+        seconds = time.perf_counter() - self._t0
+        with self._lock:
+            if result is None:
+                result = self._snapshot.result
+            if files is None:
+                files = self._snapshot.files
+            if error is not None:
+                result = None
+            elif counter is not None:
+                result = counter.countResult(nBytes if textBytes is None else textBytes,
+                                             seconds)
+            self._snapshot = Snapshot(nBytes=nBytes, total=self.total,
+                                      seconds=seconds, result=result,
+                                      done=done, error=error, cached=cached,
+                                      files=files, phase=phase,
+                                      compression=self.compression)
+
+    @abstractmethod
+    def _run(self):
+        """Count on the background thread."""
+
+
+# ******************************************************************************
+class StreamingCount(BackgroundCount):
+    """Count a file on a background thread publishing partial results.
+
+    Progress is published after every block, the partial counts after the
+    block crossing every `snapshotBytes` bytes (only once at the end when it
+    is 0). Large files are counted in shards over a process pool, each
+    completed shard being merged and published as it arrives. Gzip, bz2 and
+    xz files are decompressed on the fly by a second thread, their progress
+    is in compressed bytes. When a cache is given, a previous result for the
+    same content and options is published right away and new results are
+    stored into it.
+    """
+    def __init__(self, path: Path | str, snapshotBytes: int = SNAPSHOT_BYTES,
+                 workers: int | None = None, blockSize: int = BLOCK_SIZE,
+                 cache: ResultCache | None = None,
+                 options: CountOptions | None = None, owner: str | None = None):
+        self.path = Path(path)
+        self.cache = cache
+        self.options = options or CountOptions()
+        total = self.path.stat().st_size
+        self.workers = autoWorkers(total) if workers is None else workers
+        self.blockSize = blockSize
+        super().__init__(total, snapshotBytes, owner)
+        self.compression = compressionOf(self.path)
+
+    def _run(self):
+        counter = CodeCounter(self.options)
+        try:
+            key = None
+            if self.cache is not None:
+                key = contentKey(self.path, progress=self._hashed,
+                                 tag=self.options.tag())
+                result = self.cache.get(key)
+                if result is not None:
+                    self._publish(self.total, done=True, result=result, cached=True)
+                    return
+                # Restart the clock so that the rate and ETA are for counting
+                self._t0 = time.perf_counter()
+                self._publish(0)
+
+            textBytes = None
+            if self.compression is not None:
+                nBytes, textBytes = self._runCompressed(counter)
+            elif self.workers > 1:
+                nBytes = self._runShards(counter)
+            else:
+                nBytes = self._runBlocks(counter)
+        except Exception as e:
+            if self.cancelled:
+                return
+            print(f"Error reading file: {e}")
+            self._publish(0, done=True, error=str(e))
+            return
+
+        if not self.cancelled:
+            self._publish(nBytes, counter, done=True, textBytes=textBytes)
+            if key is not None:
+                try:
+                    self.cache.put(key, self.snapshot.result)
+                except OSError as e:
+                    print(f"Error caching result: {e}")
+
+    def _hashed(self, nBytes: int):
+        if self.cancelled:
+            raise InterruptedError('cancelled')
+        self._publish(nBytes, phase='hashing')
+
+    def _runBlocks(self, counter: CodeCounter) -> int:
+        nBytes, lastSnapshot = 0, 0
+        for data in iterByteBlocks(self.path, self.blockSize):
+            if self.cancelled:
+                break
+            counter.feed(data)
+            nBytes += len(data)
+            if self.snapshotBytes > 0 and nBytes - lastSnapshot >= self.snapshotBytes:
+                lastSnapshot = nBytes
+                self._publish(nBytes, counter)
+            else:
+                self._publish(nBytes)
+        return nBytes
+
+    def _runCompressed(self, counter: CodeCounter) -> tuple[int, int]:
+        """Count the decompressed blocks, returning the compressed and the
+        decompressed bytes."""
+        nBytes, textBytes, lastSnapshot = 0, 0, 0
+        blocks = iterDecompressedBlocks(self.path, self.compression, self.blockSize)
+        try:
+            for data, nBytes in blocks:
+                if self.cancelled:
+                    break
+                counter.feed(data)
+                textBytes += len(data)
+                if self.snapshotBytes > 0 and textBytes - lastSnapshot >= self.snapshotBytes:
+                    lastSnapshot = textBytes
+                    self._publish(nBytes, counter, phase='decompressing',
+                                  textBytes=textBytes)
+                else:
+                    self._publish(nBytes, phase='decompressing')
+        finally:
+            blocks.close()
+        return nBytes, textBytes
+
+    def _runShards(self, counter: CodeCounter) -> int:
+        nShards = self.workers
+        if self.snapshotBytes > 0:
+            nShards = max(nShards, self.total // self.snapshotBytes)
+        shards = deque(shardBounds(self.path, nShards))
+
+        # A few shards in flight at a time, the queue of the compute backend
+        # is shared with the other sessions
+        nBytes = 0
+        pending: dict[Future, int] = {}
+        try:
+            while (shards or pending) and not self.cancelled:
+                while shards and len(pending) < 2 * self.workers:
+                    a, b = shards.popleft()
+                    pending[self._submit(countShard, str(self.path), a, b,
+                                         self.blockSize, self.options)] = b - a
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    if self.cancelled:
+                        break
+                    counter.merge(future.result())
+                    nBytes += pending.pop(future)
+                    self._publish(nBytes, counter if self.snapshotBytes > 0 else None)
+        finally:
+            for future in pending:
+                future.cancel()
+        return nBytes
+
+# ******************************************************************************
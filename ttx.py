@@ -12,14 +12,15 @@ from shiny.express import module, ui, render
 from fontTools import ttLib
 from fontTools.pens.svgPathPen import SVGPathPen
 
-from .utils import BBox
+from .compute import computeBackend
+from .utils import BBox, fontBBox
 
 # ******************************************************************************
 @module
 def modTtx(input, output, session):
     # Data ---------------------------------------------------------------------
     @reactive.calc
-    def ttFont():
+    def ttFontFile():
         files = input.ttxFile()
         if files is None:
             return None
@@ -31,36 +32,40 @@ def modTtx(input, output, session):
         if 'datapath' not in fileData:
             return None
 
+        return fileData['datapath']
+
+    @reactive.calc
+    def ttFont():
+        fontFile = ttFontFile()
+        if fontFile is None:
+            return None
+
         try:
-            tt = ttLib.TTFont(fileData['datapath'])
+            tt = ttLib.TTFont(fontFile)
         except Exception as e:
             print(f"Error reading file: {e}")
             return None
 
         return tt
     
+    # The glyphs are decompiled by a worker process
+    @reactive.extended_task
+    async def bboxTask(fontFile: str, owner: str) -> BBox:
+        return await computeBackend().run(owner, fontBBox, fontFile,
+                                          label='font bounding box')
+
+    @reactive.effect
+    def startBBox():
+        bboxTask.cancel()
+        if ttFont() is not None:
+            bboxTask(ttFontFile(), session.id)
+
     @reactive.calc
     def maxBBox() -> BBox | None:
-        tt = ttFont()
-        if tt is None:
+        if ttFont() is None:
             return None
-    
-        bbMax = BBox()
-
-        glyfTable = tt['glyf']
-        for glyphName in tt.getGlyphOrder():
-            metrics = glyfTable[glyphName]
-            
-            xMin = getattr(metrics, 'xMin', 0)
-            yMin = getattr(metrics, 'yMin', 0)
-            xMax = getattr(metrics, 'xMax', 0)
-            yMax = getattr(metrics, 'yMax', 0)
-            
-            bbMax.update(x1=xMin, y1=yMin, x2=xMax, y2=yMax)
-        
-        bbMax.addMargin(100)
 
-        return bbMax
+        return bboxTask.result()
     
     with ui.card(class_='bg-light border-dark'):
         ui.input_file("ttxFile", "Choose a font file:",
@@ -0,0 +1,209 @@
+# ******************************************************************************
+# Copyright (c) 2025. All rights reserved.
+# # This work is licensed under the Creative Commons Attribution 4.0
+# International License. To view a copy of this license,
+# visit # http://creativecommons.org/licenses/by/4.0/.
+#
+# Author: roximn <roximn148@gmail.com>
+# ******************************************************************************
+from functools import lru_cache
+import os
+from pathlib import Path
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+import unicodedataplus as unicodedata
+
+from .utils import CATEGORIES, BLOCKS
+
+# ******************************************************************************
+CODESPACE = 0x110000
+TABLE_VERSION = 1
+
+CACHE_DIR = Path(os.environ.get('SHINOMNI_CACHE',
+                                Path.home() / '.cache' / 'shinomni'))
+
+# Name of the pseudo block for code points outside of all BLOCKS, it is
+# appended last so that the block index -1 resolves to it.
+NO_BLOCK = 'No_Block'
+BLOCK_NAMES = np.array([b.name for b in BLOCKS] + [NO_BLOCK], dtype=object)
+CATEGORY_NAMES = np.array(CATEGORIES, dtype=object)
+# Types of the category and block columns of the frames, shared by all of
+# them so that the rows only hold the indices of the names
+CATEGORY_DTYPE = pd.CategoricalDtype(CATEGORY_NAMES)
+BLOCK_DTYPE = pd.CategoricalDtype(BLOCK_NAMES)
+
+# One record per code point, all attributes are fetched with a single lookup.
+PROPS_DTYPE = np.dtype([
+    ('category', np.uint8),
+    ('block', np.int16),
+    ('script', np.uint8),
+    ('nameLen', np.uint8),
+    ('nameStart', np.uint32),
+])
+
+# ******************************************************************************
+def tablesDir() -> Path:
+    """Directory holding the tables for the installed unicode database."""
+    return CACHE_DIR / f'ucd-{unicodedata.unidata_version}-v{TABLE_VERSION}'
+
+
+def buildTables(dst: Path) -> Path:
+    """Build the code point property tables and save them into `dst`.
+
+    The tables are written to a temporary sibling directory first and then
+    renamed, so concurrent workers never see a partially written table. When
+    `dst` already exists, made by another worker or holding tables derived
+    from these, the tables are moved into it one by one, `props.npy` last.
+
+    Parameters:
+        dst(Path): The directory to create.
+
+    Returns:
+        The directory containing the tables.
+    """
+    catIndex = {c: i for i, c in enumerate(CATEGORIES)}
+    categories = bytearray(CODESPACE)
+    scriptNames: list[str] = []
+    scriptIndex: dict[str, int] = {}
+    scripts = bytearray(CODESPACE)
+    nameLens = bytearray(CODESPACE)
+    names: list[bytes] = []
+
+    for cp in range(CODESPACE):
+        ch = chr(cp)
+        categories[cp] = catIndex[unicodedata.category(ch)]
+
+        script = unicodedata.script(ch)
+        si = scriptIndex.get(script)
+        if si is None:
+            si = scriptIndex[script] = len(scriptNames)
+            scriptNames.append(script)
+        scripts[cp] = si
+
+        name = unicodedata.name(ch, '').encode('ascii')
+        nameLens[cp] = len(name)
+        names.append(name)
+
+    # Renumber scripts so that their indices follow alphabetical order
+    order = sorted(range(len(scriptNames)), key=lambda i: scriptNames[i])
+    remap = np.empty(len(order), dtype=np.uint8)
+    remap[order] = np.arange(len(order), dtype=np.uint8)
+
+    props = np.zeros(CODESPACE, dtype=PROPS_DTYPE)
+    props['category'] = np.frombuffer(categories, dtype=np.uint8)
+    props['script'] = remap[np.frombuffer(scripts, dtype=np.uint8)]
+    props['block'] = -1
+    for i, b in enumerate(BLOCKS):
+        props['block'][b.start:b.end + 1] = i
+    lens = np.frombuffer(nameLens, dtype=np.uint8)
+    props['nameLen'] = lens
+    props['nameStart'][1:] = np.cumsum(lens[:-1], dtype=np.uint32)
+
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    tmp = Path(tempfile.mkdtemp(prefix=f'.{dst.name}-', dir=dst.parent))
+    try:
+        np.save(tmp / 'props.npy', props)
+        np.save(tmp / 'names.npy', np.frombuffer(b''.join(names), dtype=np.uint8))
+        np.save(tmp / 'scripts.npy', np.array(sorted(scriptNames)))
+        try:
+            tmp.rename(dst)
+        except OSError:
+            if not dst.is_dir():
+                raise
+            for name in ('names.npy', 'scripts.npy', 'props.npy'):
+                os.replace(tmp / name, dst / name)
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    return dst
+
+
+# ******************************************************************************
+class UcdTable:
+    """Memory mapped per code point unicode properties.
+
+    Covers the whole codespace (0x000000-0x10FFFF) with the general category,
+    block and script stored as small integers and the character names stored
+    as a single blob of ascii bytes.
+    """
+    def __init__(self, path: Path):
+        self.path = path
+        self.props = np.load(path / 'props.npy', mmap_mode='r')
+        self.nameBlob = np.load(path / 'names.npy', mmap_mode='r')
+        self.scriptNames = np.array(np.load(path / 'scripts.npy').tolist(),
+                                    dtype=object)
+        self.scriptDtype = pd.CategoricalDtype(self.scriptNames)
+
+    def lookup(self, codes: np.ndarray) -> np.ndarray:
+        """Fetch the property records of the given code points."""
+        return self.props[np.asarray(codes, dtype=np.int64)]
+
+    def names(self, codes: np.ndarray, default: str = 'NO-NAME',
+              records: np.ndarray | None = None) -> list[str]:
+        """Character names of the given code points."""
+        if records is None:
+            records = self.lookup(codes)
+        if len(records) == 0:
+            return []
+
+        # Gather all the names, newline separated, with one fancy index and
+        # split them after a single decode.
+        lens = records['nameLen'].astype(np.int64)
+        ends = np.cumsum(lens)
+        within = np.arange(ends[-1]) - np.repeat(ends - lens, lens)
+        src = np.repeat(records['nameStart'].astype(np.int64), lens) + within
+        dst = np.repeat(ends - lens + np.arange(len(lens)), lens) + within
+        buf = np.full(ends[-1] + len(lens) - 1, ord('\n'), dtype=np.uint8)
+        buf[dst] = self.nameBlob[src]
+        names = buf.tobytes().decode('ascii').split('\n')
+        return [n or default for n in names]
+
+    def labels(self, codes: np.ndarray, records: np.ndarray | None = None) -> list[str]:
+        """'U+XXXX NAME' labels of the given code points."""
+        codes = np.asarray(codes, dtype=np.int64)
+        return [f'U+{c:04X} {n}' for c, n in
+                zip(codes.tolist(), self.names(codes, records=records))]
+
+    def categories(self, records: np.ndarray) -> np.ndarray:
+        return CATEGORY_NAMES[records['category']]
+
+    def blocks(self, records: np.ndarray) -> np.ndarray:
+        return BLOCK_NAMES[records['block']]
+
+    def scripts(self, records: np.ndarray) -> np.ndarray:
+        return self.scriptNames[records['script']]
+
+    def describe(self, df: pd.DataFrame, names: bool = True) -> pd.DataFrame:
+        """Fill the `unicode`, `category`, `block` and `script` columns of a
+        frame having a `code` column, the last three as categoricals.
+
+        Parameters:
+            df(DataFrame): The frame, changed in place.
+            names(bool): Whether to add the `unicode` labels, left out of
+                the frames naming only the rows they show.
+        """
+        codes = df['code'].to_numpy(dtype=np.int64)
+        records = self.lookup(codes)
+        if names:
+            df['unicode'] = self.labels(codes, records=records)
+        blocks = records['block'].astype(np.int16)
+        # Outside of any block, the last name
+        blocks[blocks < 0] = len(BLOCK_NAMES) - 1
+        df['category'] = pd.Categorical.from_codes(records['category'], dtype=CATEGORY_DTYPE)
+        df['block'] = pd.Categorical.from_codes(blocks, dtype=BLOCK_DTYPE)
+        df['script'] = pd.Categorical.from_codes(records['script'], dtype=self.scriptDtype)
+        return df
+
+
+@lru_cache(maxsize=1)
+def ucdTable() -> UcdTable:
+    """The shared table, built on first use if missing."""
+    path = tablesDir()
+    if not (path / 'props.npy').exists():
+        buildTables(path)
+    return UcdTable(path)
+
+# ******************************************************************************
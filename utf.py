@@ -6,20 +6,67 @@
 #
 # Author: roximn <roximn148@gmail.com>
 # ******************************************************************************
+import itertools
+import tempfile
+import time
+import weakref
+
 from shiny import reactive
 from shiny.express import module, ui, render
 import humanize
-from collections import Counter
-from pathlib import Path
 
-import unicodedataplus as unicodedata
+import numpy as np
 import plotly.express as px
 from shiny import reactive
 from shiny.express import render, ui
+from shiny.ui import output_image
 from shinywidgets import render_plotly
 import pandas as pd
 
-from .utils import CATEGORIES, BLOCKS, findBlock
+from .utils import CATEGORIES, BLOCKS
+from .aggregates import CharAggregates, countsOnly, nextBuild, resultAggregates
+from .cache import resultCache
+from .charts import (CHART_ROWS, CURVE_POINTS, MAX_CHART_ROWS, MIN_CHART_ROWS,
+                     WEBGL_POINTS, ChartStats, budgetedFigure, chartHeight,
+                     curvePoints)
+from .comparison import compareCounts, denseCounts
+from .compute import computeBackend
+from .compressed import compressionOf
+from .corpus import CorpusCount, isArchive
+from .counting import CountOptions, CountResult
+from .graphemes import graphemeFrame
+from .lines import MAX_LINE_LENGTH, LineStats
+from .live import LiveCount, LiveResult
+from .ngrams import NGRAM_CAPACITY, NGRAM_MODES, NGRAM_SIZES, ngramMode
+from .overview import PLANE_COLUMNS, codeAt, overviewPng
+from .paging import TABLE_PAGE_SIZES, TABLE_ROWS, FramePager
+from .positions import POSITIONS_PER_CODE, occurrenceFrame
+from .properties import PROPERTIES, charProperty
+from .sampling import (ANALYSIS_MODES, CONFIDENCE, EstimateCount, EstimateResult,
+                       analysisMode)
+from .scriptruns import ScriptRunStats
+from .security import RiskReport, detectRisks
+from .streaming import SNAPSHOT_BYTES, StreamingCount
+from .ucd import ucdTable
+
+# ******************************************************************************
+# Interval between the checks of a running analysis
+POLL_SECONDS = 0.5
+# Number of grapheme clusters charted
+TOP_GRAPHEMES = 50
+# Number of n-grams charted
+TOP_NGRAMS = 50
+# Columns searched by the filters of the grapheme and n-gram tables
+GRAPHEME_SEARCH = ('grapheme', 'unicode', 'base', 'script')
+NGRAM_SEARCH = ('ngram', 'unicode')
+# Completed analyses of a session kept for the comparisons
+COMPARE_HISTORY = 8
+# Most recent entries of the result cache offered for the comparisons
+COMPARE_CACHED = 50
+# Prefix of the choices of cached results, followed by their key
+CACHED_CHOICE = 'cache:'
+# Bars of the largest differences in the comparison chart
+TOP_DELTAS = 40
 
 # ******************************************************************************
 @module
@@ -27,84 +74,397 @@ def modUtf(input, output, session):
     # File Info ----------------------------------------------------------------
     @reactive.calc
     def infoHeader():
+        result = charCounts()
+        if isinstance(result, LiveResult):
+            return f'Text: typed or pasted, '\
+                   f'size: {humanize.naturalsize(result.nBytes, binary=True)}'
+
         info = {'name': '<NO-SELECTION>', 'size': 0}
         files = input.txtFile()
-        if files and len(files) >= 1:
+        if files and len(files) == 1:
             fileData: dict = files[0]
             info['name'] = fileData.get('name', '<???>')
             info['size'] = fileData.get('size', 0)
+        elif files:
+            info['name'] = f'{len(files)} files'
+            info['size'] = sum(f.get('size', 0) for f in files)
 
         header = f'File: {info["name"]}, '\
                  f'size: {humanize.naturalsize(info["size"], binary=True)}'
         return header
 
     # Data -------------------------------------------------------------------------
-    @reactive.calc
-    def charDf():
+    analysis = reactive.value(None)
+    progress = reactive.value(None)
+    partialCounts = reactive.value(None)
+    # Non zero (codes, counts) of the completed results by label, for the
+    # comparisons, and the last result recorded
+    history = reactive.value({})
+    resultNumbers = itertools.count(1)
+    recorded: list[weakref.ref] = []
+
+    def runAnalysis(mode: str):
+        """Start the analysis of the uploaded files, cancelling the previous one."""
+        with reactive.isolate():
+            previous = analysis()
+        if previous is not None:
+            previous.cancel()
+        aggregatesTask.cancel()
+        computeBackend().cancel(session.id)
+        analysis.set(None)
+        progress.set(None)
+        partialCounts.set(None)
+
         files = input.txtFile()
         if files is None:
-            return None
+            return
 
         if len(files) < 1:
+            return
+
+        files = [f for f in files if 'datapath' in f]
+        if not files:
+            return
+
+        snapshotMB = max(input.snapshotMB() or 0, 0)
+        snapshotBytes = int(snapshotMB * 1024 * 1024)
+        total = sum(f.get('size', 0) for f in files)
+        options = CountOptions(ngrams=ngramMode(input.ngramMode(), total),
+                               ngramCapacity=max(int(input.ngramCapacity() or 0), 1),
+                               errors=input.encodingErrors(),
+                               positions=input.indexPositions(),
+                               scriptRuns=input.segmentScripts())
+        if len(files) > 1 or isArchive(files[0]['datapath']):
+            job = CorpusCount(files, snapshotBytes=snapshotBytes, options=options,
+                              owner=session.id)
+        elif analysisMode(mode, total) == 'estimate' \
+                and compressionOf(files[0]['datapath']) is None:
+            job = EstimateCount(files[0]['datapath'])
+        else:
+            job = StreamingCount(files[0]['datapath'],
+                                 snapshotBytes=snapshotBytes,
+                                 cache=resultCache(), options=options,
+                                 owner=session.id)
+        analysis.set(job.start())
+
+    @reactive.effect
+    @reactive.event(input.txtFile)
+    def startAnalysis():
+        runAnalysis(input.analysisMode())
+
+    # Counted in the session as the text is edited, each edit applied to the
+    # counts of the previous one
+    liveCount = LiveCount()
+
+    @reactive.effect
+    @reactive.event(input.liveText)
+    def liveAnalysis():
+        text = input.liveText()
+        if not text:
+            liveCount.reset()
+            with reactive.isolate():
+                if isinstance(partialCounts(), LiveResult):
+                    partialCounts.set(None)
+            return
+
+        with reactive.isolate():
+            job = analysis()
+        if job is not None:
+            job.cancel()
+        analysis.set(None)
+        progress.set(None)
+        partialCounts.set(liveCount.update(text))
+
+    @reactive.effect
+    @reactive.event(input.promote)
+    def promoteAnalysis():
+        with reactive.isolate():
+            job = analysis()
+        if isinstance(job, EstimateCount):
+            runAnalysis('exact')
+
+    @reactive.effect
+    def pollAnalysis():
+        job = analysis()
+        if job is None:
+            return
+
+        snapshot = job.snapshot
+        progress.set(snapshot)
+        partialCounts.set(snapshot.result)
+        if not snapshot.done:
+            reactive.invalidate_later(POLL_SECONDS)
+        elif snapshot.result is not None:
+            with reactive.isolate():
+                recordResult(snapshot.result)
+
+    def recordResult(result: CountResult):
+        """Keep the counts of a completed result for the comparisons, the
+        latest last.
+        """
+        if recorded and recorded[0]() is result:
+            return
+        recorded[:] = [weakref.ref(result)]
+        files = input.txtFile() or []
+        name = ', '.join(f.get('name', '<???>') for f in files) or 'text'
+        if isinstance(result, EstimateResult) and not result.exact:
+            name += ' (estimate)'
+        codes = np.flatnonzero(result.counts)
+        results = dict(history())
+        results[f'{next(resultNumbers)}. {name}'] = (codes, result.counts[codes])
+        history.set(dict(list(results.items())[-COMPARE_HISTORY:]))
+
+    @reactive.effect
+    def promoteState():
+        snapshot = progress()
+        estimate = snapshot is not None and snapshot.done \
+            and isinstance(snapshot.result, EstimateResult) and not snapshot.result.exact
+        ui.update_action_button('promote', disabled=not estimate)
+
+    @session.on_ended
+    def cancelAnalysis():
+        with reactive.isolate():
+            job = analysis()
+        if job is not None:
+            job.cancel()
+        computeBackend().cancel(session.id)
+
+    @reactive.calc
+    def charCounts() -> CountResult | None:
+        return partialCounts()
+
+    # The aggregates are built by a worker process, the panels keep showing
+    # the previous ones meanwhile
+    aggregates = reactive.value(None)
+
+    @reactive.extended_task
+    async def aggregatesTask(result: CountResult, owner: str) -> CharAggregates:
+        return await computeBackend().run(owner, resultAggregates, countsOnly(result),
+                                          nextBuild(), label='panel aggregates')
+
+    @reactive.effect
+    def buildAggregates():
+        result = charCounts()
+        aggregatesTask.cancel()
+        if result is None:
+            aggregates.set(None)
+            return
+        if isinstance(result, LiveResult):
+            aggregates.set(result.aggregates)
+            return
+        aggregatesTask(result, session.id)
+
+    @reactive.effect
+    def collectAggregates():
+        if aggregatesTask.status() == 'success':
+            aggregates.set(aggregatesTask.result())
+
+    @reactive.calc
+    def charAggregates() -> CharAggregates | None:
+        """The rollups shared by all the panels, built once per result."""
+        return aggregates()
+
+    @reactive.calc
+    def tablePage():
+        agg = charAggregates()
+        if agg is None:
+            return None
+
+        return agg.page(input.tablePage(), int(input.tableRows()),
+                        input.tableSort(), input.tableOrder() == 'descending',
+                        input.tableFilter())
+
+    # Figure sizes and build times, by chart
+    chartStats = {name: reactive.value(None)
+                  for name in ('counts', 'codePoints', 'unicodeCounts', 'scripts', 'ecdf')}
+
+    @reactive.calc
+    def graphemeDf():
+        result = charCounts()
+        if result is None or result.clusters is None:
             return None
 
-        fileData: dict = files[0]
-        if 'datapath' not in fileData:
+        return graphemeFrame(result.counts, result.clusters)
+
+    @reactive.calc
+    def graphemePager() -> FramePager | None:
+        gdf = graphemeDf()
+        return FramePager(gdf, search=GRAPHEME_SEARCH) if gdf is not None else None
+
+    @reactive.calc
+    def ngramTable():
+        result = charCounts()
+        if result is None or not result.ngrams:
+            return None
+
+        return result.ngrams.get(int(input.ngramSize()))
+
+    @reactive.calc
+    def ngramPager() -> FramePager | None:
+        table = ngramTable()
+        if table is None:
+            return None
+
+        return FramePager(table.frame(NGRAM_CAPACITY), search=NGRAM_SEARCH)
+
+    @reactive.calc
+    def lineStats() -> LineStats | None:
+        result = charCounts()
+        if result is None:
             return None
 
-        counts = Counter()
-        try:
-            with Path(fileData['datapath']).open(mode='r', encoding='utf-8') as file:
-                while True:
-                    chunk = file.read(16*1024)
-                    if not chunk:
-                        break
-                    counts.update(chunk)
-        except Exception as e:
-            print(f"Error reading file: {e}")
+        return result.lines
+
+    @reactive.calc
+    def scriptRunStats() -> ScriptRunStats | None:
+        result = charCounts()
+        if result is None:
             return None
 
-        cdf = pd.DataFrame(counts.items(), columns=['char', 'count'])
-        cdf['code'] = cdf['char'].apply(ord)
-        cdf['unicode'] = cdf['char'].apply(lambda x: f'U+{ord(x):04X} {unicodedata.name(x, "NO-NAME")}')
-        cdf['category'] = cdf['char'].apply(lambda x: unicodedata.category(x))
-        cdf['block'] = cdf['code'].apply(lambda x: BLOCKS[findBlock(x)].name)
-        cdf['script'] = cdf['char'].apply(lambda x: unicodedata.script(x))
+        return result.scriptRuns
 
-        cdf.sort_values(by='code', ascending=True, inplace=True)
-        return cdf
+    @reactive.calc
+    def riskReport() -> RiskReport | None:
+        result = charCounts()
+        if result is None:
+            return None
+
+        return detectRisks(result.counts)
 
     # File Info --------------------------------------------------------------------
     @reactive.calc
     def infoBody():
-        df = charDf()
-        if df is not None:
-            nChars = len(df)
-            totalCount = df['count'].sum()
-            nBlocks = df['block'].unique().size
-            nScripts = df['script'].unique().size
-            nCategories = df['category'].unique().size
-
-            body = f'Selected file contains {humanize.apnumber(nChars)} character(s) '\
+        agg = charAggregates()
+        if agg is not None:
+            nChars = agg.nChars
+            totalCount = agg.totalCount
+            nBlocks = agg.nBlocks
+            nScripts = agg.nScripts
+            nCategories = agg.nCategories
+
+            result = charCounts()
+            source = 'Text' if isinstance(result, LiveResult) else 'Selected file'
+            body = f'{source} contains {humanize.apnumber(nChars)} character(s) '\
                 f'with total count of {humanize.intword(totalCount)} ({humanize.intcomma(totalCount)})\n'\
                 f'belonging to {humanize.apnumber(nBlocks)} unicode block(s) '\
                 f'spanning {humanize.apnumber(nScripts)} script(s) '\
                 f'with {humanize.apnumber(nCategories)} different categories.'
+            snapshot = progress()
+            if isinstance(result, EstimateResult) and not result.exact:
+                body += f'\nEstimated in {snapshot.seconds*1000:.0f} ms from '\
+                        f'{result.nBlocks} random blocks, '\
+                        f'{humanize.naturalsize(result.sampleBytes, binary=True)} '\
+                        f'({result.fraction:.1%}) of the file. Counts are within the '\
+                        f'lower and upper bounds with {CONFIDENCE:.0%} confidence, '\
+                        f'characters occurring less than {result.detectionLimit:,.0f} '\
+                        f'times may be missing (about {result.missedShare:.3%} of '\
+                        f'the text is made of unseen characters).'
+            elif isinstance(result, LiveResult):
+                body += f'\nUpdated live in {result.seconds*1000:.1f} ms, '\
+                        f'{result.removed:,} code point(s) removed and '\
+                        f'{result.added:,} added by the last edit.'
+            elif snapshot is not None and snapshot.cached:
+                stats = resultCache().stats()
+                body += f'\nLoaded from cache in {snapshot.seconds*1000:.0f} ms '\
+                        f'(hits: {stats["hits"]}, misses: {stats["misses"]}).'
+            elif snapshot is not None and snapshot.done and snapshot.compression:
+                body += f'\nDecompressed {snapshot.compression} '\
+                        f'{humanize.naturalsize(snapshot.total, binary=True)} to '\
+                        f'{humanize.naturalsize(result.nBytes, binary=True)} and analysed '\
+                        f'in {snapshot.seconds:.2f} s ({result.nBytes / snapshot.seconds / 1e6:,.1f} MB/s).'
+            elif snapshot is not None and snapshot.done:
+                body += f'\nAnalysed in {snapshot.seconds:.2f} s '\
+                        f'({snapshot.rate / 1e6:,.1f} MB/s).'
+            else:
+                body += '\nPartial results, analysis in progress.'
+            body += f'\nPanel aggregates built in {agg.seconds*1000:.0f} ms '\
+                    f'(build #{agg.build}).'
         else:
-            body = "No processed data."
+            snapshot = progress()
+            if snapshot is not None and snapshot.error is not None:
+                body = f"Error reading file: {snapshot.error}"
+            else:
+                body = "No processed data."
 
         return body
 
+    @reactive.calc
+    def progressUi():
+        snapshot = progress()
+        if snapshot is None or snapshot.done:
+            return None
+
+        percent = 100 * snapshot.fraction
+        eta = snapshot.eta
+        detail = f'{snapshot.phase.capitalize()}: '\
+                 f'{humanize.naturalsize(snapshot.nBytes, binary=True)} of '\
+                 f'{humanize.naturalsize(snapshot.total, binary=True)} at '\
+                 f'{humanize.naturalsize(snapshot.rate, binary=True)}/s, '\
+                 f'ETA {humanize.naturaldelta(eta) if eta is not None else "unknown"}'
+        return ui.div(
+            ui.div(ui.div(f'{percent:.0f}%',
+                          class_='progress-bar progress-bar-striped progress-bar-animated',
+                          role='progressbar',
+                          style=f'width: {percent:.1f}%;'),
+                   class_='progress'),
+            ui.tags.small(detail, class_='text-muted'),
+        )
+
+    @reactive.calc
+    def computeUi():
+        status = aggregatesTask.status()
+        if status == 'error':
+            return ui.tags.small(f'Error building the panel aggregates: '
+                                 f'{aggregatesTask.error()}', class_='text-danger')
+        if status != 'running':
+            return None
+
+        reactive.invalidate_later(POLL_SECONDS)
+        backend = computeBackend()
+        return ui.div(
+            ui.tags.small(backend.describe(session.id) or 'Waiting for the results',
+                          class_='d-block'),
+            ui.tags.small(backend.stats().describe(), class_='text-muted'),
+        )
+
     # File Selection ---------------------------------------------------------------
     with ui.layout_columns(col_widths=(4, 8), fillable=True):
         with ui.card(class_='bg-light border-dark'):
-            ui.input_file("txtFile", "Choose a text file to upload:", multiple=False)
+            ui.input_file("txtFile", "Choose text files or archives to upload:", multiple=True)
+            ui.tags.small('Gzip, bz2 and xz files are decompressed on the fly.',
+                          class_='text-muted')
+            ui.input_text_area("liveText", "Or type or paste text:", rows=4,
+                               width='100%', placeholder='Counted as you edit')
+            ui.tags.small('Only the edited part is counted again, the code points '
+                          'and their aggregates update live.', class_='text-muted')
+            ui.input_select("analysisMode", "Analysis:",
+                            {m: m.capitalize() for m in ANALYSIS_MODES}, selected='auto')
+            ui.tags.small('Estimates sample a few MB of a file, files of 1 GB '
+                          'and above are estimated first in the auto mode.',
+                          class_='text-muted')
+            ui.input_action_button("promote", "Count exactly", disabled=True)
+            ui.input_numeric("chartRows", "Characters per chart page:",
+                             value=CHART_ROWS, min=MIN_CHART_ROWS, max=MAX_CHART_ROWS,
+                             step=10)
+            ui.input_numeric("snapshotMB", "Partial results every (MB, 0 for none):",
+                             value=SNAPSHOT_BYTES // (1024 * 1024), min=0, step=16)
+            ui.tags.small('Intervals below 1 MB are raised to 1 MB.', class_='text-muted')
+            ui.input_select("ngramMode", "N-gram counts:",
+                            {m: m.capitalize() for m in NGRAM_MODES}, selected='auto')
+            ui.input_numeric("ngramCapacity", "N-grams kept by bounded counts:",
+                             value=NGRAM_CAPACITY, min=1000, step=10000)
+            ui.input_select("encodingErrors", "Malformed UTF-8:",
+                            {'replace': 'Replace and index', 'strict': 'Stop the analysis'})
+            ui.input_checkbox("indexPositions", "Index character positions", value=False)
+            ui.input_checkbox("segmentScripts", "Segment script runs", value=False)
 
         @render.express(inline=True)
         def fileInfoUi():
             with ui.card(class_='bg-light border-dark'):
                 ui.card_header(infoHeader())
                 infoBody()
+                progressUi()
+                computeUi()
 
     # Panels -----------------------------------------------------------------------
     with ui.navset_pill():
@@ -115,60 +475,381 @@ def modUtf(input, output, session):
             # ----------------------------------------------------------------------
             with ui.card(fill=True, class_='border-light'):
                 ui.card_header('Unicode Character Frequency (Least to Most Frequent)')
+                ui.input_numeric("countsPage", "Page:", value=1, min=1, width='120px')
                 @render_plotly
                 def chartCounts():
-                    df = charDf()
-                    if df is None:
+                    agg = charAggregates()
+                    if agg is None:
                         return None
-                    fig = px.bar(df,
-                                y='unicode', x='count',
+
+                    def build(win):
+                        fig = px.bar(win.frame,
+                                    y='unicode', x='count',
+                                    orientation='h',
+                                    log_x=True,
+                                    text='count',
+                                    hover_data=['unicode', 'category'],
+                                    color='category',
+                                    labels={'unicode': 'Unicode',
+                                            'count': 'Frequency',
+                                            'category': 'Category'},
+                                    category_orders={'category': CATEGORIES},
+                                    color_discrete_sequence=px.colors.qualitative.Plotly)
+                        fig.update_traces(texttemplate='%{text:,.0f}',
+                                        textposition='inside',
+                                        textangle=0)
+                        fig.update_yaxes(categoryorder='array',
+                                         categoryarray=win.frame['unicode'].tolist())
+                        fig.update_layout(height=chartHeight(len(win.frame)))
+                        return fig
+
+                    fig, stats = budgetedFigure(
+                        build,
+                        lambda rows: agg.window('rank', input.countsPage(), rows,
+                                                color='category'),
+                        input.chartRows())
+                    chartStats['counts'].set(stats)
+                    return fig
+
+                @render.text
+                def countsCaption():
+                    stats = chartStats['counts']()
+                    return stats.describe() if stats is not None else ''
+
+        # Overview Panel -----------------------------------------------------------
+        with ui.nav_panel("Overview"):
+
+            # ----------------------------------------------------------------------
+            with ui.card(fill=True, class_='border-light'):
+                ui.card_header('Codespace Overview')
+                @reactive.calc
+                def overviewData() -> bytes | None:
+                    result = charCounts()
+                    if result is None:
+                        return None
+                    return overviewPng(result.counts)
+
+                with ui.hold():
+                    @render.image(delete_file=True)
+                    def overviewImage():
+                        data = overviewData()
+                        if data is None:
+                            return None
+                        with tempfile.NamedTemporaryFile(suffix='.png', delete=False) as file:
+                            file.write(data)
+                        return {'src': file.name, 'width': '100%',
+                                'style': 'image-rendering: pixelated;',
+                                'alt': 'Counts of the whole codespace'}
+                output_image("overviewImage", height='auto',
+                             hover=ui.hover_opts(delay=100, clip=True))
+
+                @render.text
+                def overviewHover():
+                    result = charCounts()
+                    if result is None:
+                        return ''
+                    hover = input.overviewImage_hover()
+                    code = codeAt(hover['x'], hover['y']) if hover else None
+                    if code is None:
+                        return 'Hover over the image to look a code point up.'
+                    table = ucdTable()
+                    records = table.lookup([code])
+                    name = table.names([code], records=records)[0]
+                    return f'U+{code:04X} {name}: {result.counts[code]:,.0f} occurrence(s), '\
+                           f'{table.blocks(records)[0]} block, {table.scripts(records)[0]} script.'
+
+                ui.tags.small(f'One pixel per code point, 256 to a row, the planes '
+                              f'in order, {PLANE_COLUMNS} to a row. Counts are colored '
+                              f'on a log scale from 1 (purple) to the largest (yellow), '
+                              f'the empty code points of consecutive blocks in '
+                              f'alternating grays, outside of the blocks in white.',
+                              class_='text-muted')
+
+        # Graphemes Panel ----------------------------------------------------------
+        with ui.nav_panel("Graphemes"):
+
+            # ----------------------------------------------------------------------
+            with ui.card(fill=True, class_='border-light'):
+                @render.express
+                def graphemesHeader():
+                    result = charCounts()
+                    gdf = graphemeDf()
+                    if result is None or gdf is None:
+                        return
+                    nCodes = int(result.counts.sum())
+                    multi = gdf[gdf['length'] > 1]
+                    ui.card_header(
+                        f'{humanize.intcomma(result.nClusters)} grapheme clusters '
+                        f'({humanize.intcomma(len(gdf))} distinct), '
+                        f'{humanize.intcomma(int(multi["count"].sum()))} of them '
+                        f'spanning several code points, '
+                        f'{nCodes / max(result.nClusters, 1):.3f} code points per cluster')
+
+                @render_plotly
+                def chartGraphemes():
+                    gdf = graphemeDf()
+                    if gdf is None:
+                        return None
+                    top = gdf.head(TOP_GRAPHEMES).copy()
+                    top['label'] = top['grapheme'].str.cat(top['unicode'], sep='  ')
+                    fig = px.bar(top,
+                                y='label', x='count',
                                 orientation='h',
                                 log_x=True,
                                 text='count',
-                                hover_data=['unicode', 'category'],
-                                color='category',
-                                labels={'unicode': 'Unicode',
+                                hover_data=['unicode', 'base', 'script'],
+                                color='length',
+                                labels={'label': 'Grapheme',
                                         'count': 'Frequency',
-                                        'category': 'Category'},
-                                category_orders={'category': CATEGORIES},
-                                color_discrete_sequence=px.colors.qualitative.Plotly)
+                                        'length': 'Code points'})
                     fig.update_traces(texttemplate='%{text:,.0f}',
                                     textposition='inside',
                                     textangle=0)
-                    fig.update_yaxes(categoryorder='total descending')
-                    fig.update_layout(height=len(df)*24)
+                    fig.update_yaxes(categoryorder='total ascending')
+                    fig.update_layout(height=max(len(top)*24, 200))
                     return fig
 
-        # Code Points Panel --------------------------------------------------------
-        with ui.nav_panel("Code Points"):
+            # ----------------------------------------------------------------------
+            with ui.card(fill=True, class_='border-light'):
+                ui.card_header('Grapheme Clusters')
+                with ui.layout_columns(col_widths=(6, 3, 3)):
+                    ui.input_text("graphemesFilter", "Filter:", update_on='blur',
+                                  placeholder='Grapheme, code points, base or script')
+                    ui.input_select("graphemesRows", "Rows:",
+                                    {str(n): str(n) for n in TABLE_PAGE_SIZES},
+                                    selected=str(TABLE_ROWS))
+                    ui.input_numeric("graphemesPage", "Page:", value=1, min=1)
+
+                @reactive.calc
+                def graphemesPage():
+                    pager = graphemePager()
+                    if pager is None:
+                        return None
+                    return pager.page(input.graphemesPage(), int(input.graphemesRows()),
+                                      text=input.graphemesFilter())
+
+                @render.text
+                def graphemesCaption():
+                    page = graphemesPage()
+                    return page.describe() if page is not None else ''
+
+                @render.data_frame
+                def graphemesPanel():
+                    page = graphemesPage()
+                    if page is None:
+                        return None
+                    return render.DataGrid(page.frame, width='100%')
+
+        # N-grams Panel ------------------------------------------------------------
+        with ui.nav_panel("N-grams"):
 
             # ----------------------------------------------------------------------
             with ui.card(fill=True, class_='border-light'):
-                ui.card_header('Unicode Character Frequency (Ascending Code Points)')
+                ui.input_radio_buttons("ngramSize", None,
+                                       {str(n): f'{n}-grams' for n in NGRAM_SIZES},
+                                       inline=True)
+
+                @render.express
+                def ngramsHeader():
+                    table = ngramTable()
+                    if table is None:
+                        ui.card_header('N-grams were not counted.')
+                        return
+                    if table.capacity is None:
+                        accuracy = 'exact counts'
+                    else:
+                        accuracy = f'bounded counts of the {humanize.intcomma(table.capacity)} '\
+                                   f'most frequent, each at most {humanize.intcomma(table.error)} '\
+                                   f'below the true count (bound {table.errorBound:,.0f})'
+                    ui.card_header(
+                        f'{humanize.intcomma(table.total)} {table.n}-grams, '
+                        f'{humanize.intcomma(len(table.keys))} distinct kept, {accuracy}')
+
                 @render_plotly
-                def chartCodePoints():
-                    df = charDf()
-                    if df is None:
+                def chartNgrams():
+                    table = ngramTable()
+                    if table is None:
                         return None
-                    fig = px.bar(df,
-                                y='unicode', x='count',
+                    top = table.frame(TOP_NGRAMS)
+                    top['label'] = top['ngram'].map(repr).str.cat(top['unicode'], sep='  ')
+                    fig = px.bar(top,
+                                y='label', x='count',
                                 orientation='h',
                                 log_x=True,
                                 text='count',
-                                hover_data=['unicode', 'category'],
-                                color='category',
-                                labels={'unicode': 'Unicode',
+                                error_x=top['upper'] - top['count'],
+                                hover_data=['unicode', 'upper', 'share'],
+                                labels={'label': 'N-gram',
                                         'count': 'Frequency',
-                                        'category': 'Category'},
-                                category_orders={'category': CATEGORIES},
-                                color_discrete_sequence=px.colors.qualitative.Plotly)
+                                        'upper': 'Upper bound'})
+                    fig.update_traces(texttemplate='%{text:,.0f}',
+                                    textposition='inside',
+                                    textangle=0)
+                    fig.update_yaxes(categoryorder='total ascending')
+                    fig.update_layout(height=max(len(top)*24, 200))
+                    return fig
+
+            # ----------------------------------------------------------------------
+            with ui.card(fill=True, class_='border-light'):
+                ui.card_header('N-gram Counts')
+                with ui.layout_columns(col_widths=(6, 3, 3)):
+                    ui.input_text("ngramsFilter", "Filter:", update_on='blur',
+                                  placeholder='N-gram or code points')
+                    ui.input_select("ngramsRows", "Rows:",
+                                    {str(n): str(n) for n in TABLE_PAGE_SIZES},
+                                    selected=str(TABLE_ROWS))
+                    ui.input_numeric("ngramsPage", "Page:", value=1, min=1)
+
+                @reactive.calc
+                def ngramsPage():
+                    pager = ngramPager()
+                    if pager is None:
+                        return None
+                    return pager.page(input.ngramsPage(), int(input.ngramsRows()),
+                                      text=input.ngramsFilter())
+
+                @render.text
+                def ngramsCaption():
+                    page = ngramsPage()
+                    return page.describe() if page is not None else ''
+
+                @render.data_frame
+                def ngramsPanel():
+                    page = ngramsPage()
+                    if page is None:
+                        return None
+                    return render.DataGrid(page.frame, width='100%')
+
+        # Lines & Words Panel ------------------------------------------------------
+        with ui.nav_panel("Lines & Words"):
+
+            # ----------------------------------------------------------------------
+            with ui.card(fill=True, class_='border-light'):
+                @render.express
+                def linesHeader():
+                    stats = lineStats()
+                    if stats is None:
+                        if charCounts() is not None:
+                            ui.card_header('Line statistics are only counted by the exact analyses.')
+                        return
+                    ui.card_header(
+                        f'{humanize.intcomma(stats.lines)} lines of '
+                        f'{stats.meanLength:,.1f} code points on average (median '
+                        f'{humanize.intcomma(stats.percentile(0.5))}, 95% up to '
+                        f'{humanize.intcomma(stats.percentile(0.95))}, longest '
+                        f'{humanize.intcomma(stats.maxLength)}), '
+                        f'{humanize.intcomma(stats.blank)} blank, '
+                        f'{humanize.intcomma(stats.trailing)} with trailing whitespace')
+                    ends = (f'Line ends: {humanize.intcomma(stats.lf)} LF, '
+                            f'{humanize.intcomma(stats.crlf)} CR LF, '
+                            f'{humanize.intcomma(stats.cr)} CR')
+                    if stats.mixedEndings:
+                        ui.p(f'{ends}, the line endings are mixed.', class_='text-danger')
+                    else:
+                        ui.p(ends)
+
+                @render_plotly
+                def chartLineLengths():
+                    stats = lineStats()
+                    if stats is None or not stats.lines:
+                        return None
+                    df = stats.lengthFrame()
+                    fig = px.bar(df,
+                                x='length', y='lines',
+                                log_y=True,
+                                labels={'length': 'Line length (code points)',
+                                        'lines': 'Lines'})
+                    if stats.maxLength >= MAX_LINE_LENGTH:
+                        fig.add_annotation(x=MAX_LINE_LENGTH, y=1, yref='paper',
+                                           text=f'≥ {MAX_LINE_LENGTH:,}', showarrow=False)
+                    fig.update_layout(height=400, bargap=0)
+                    return fig
+
+            # ----------------------------------------------------------------------
+            with ui.card(fill=True, class_='border-light'):
+                @render.express
+                def wordsHeader():
+                    stats = lineStats()
+                    if stats is None:
+                        return
+                    ui.card_header(
+                        f'{humanize.intcomma(stats.totalWords)} words in '
+                        f'{len(stats.words)} scripts, by the script of their first character')
+
+                @render_plotly
+                def chartWords():
+                    stats = lineStats()
+                    if stats is None or not stats.words:
+                        return None
+                    fig = px.bar(stats.wordFrame(),
+                                x='script', y='words',
+                                log_y=True,
+                                text='words',
+                                color='script',
+                                labels={'words': 'Words',
+                                        'script': 'Script'},
+                                color_discrete_sequence=px.colors.qualitative.Alphabet)
                     fig.update_traces(texttemplate='%{text:,.0f}',
                                     textposition='inside',
                                     textangle=0)
-                    fig.update_yaxes(categoryorder='category descending')
-                    fig.update_layout(height=len(df)*24)
+                    fig.update_layout(height=400, showlegend=False)
+                    fig.update_xaxes(categoryorder='total descending')
                     return fig
 
+                @render.data_frame
+                def wordsPanel():
+                    stats = lineStats()
+                    if stats is None:
+                        return None
+                    return render.DataGrid(stats.wordFrame(), filters=True)
+
+        # Code Points Panel --------------------------------------------------------
+        with ui.nav_panel("Code Points"):
+
+            # ----------------------------------------------------------------------
+            with ui.card(fill=True, class_='border-light'):
+                ui.card_header('Unicode Character Frequency (Ascending Code Points)')
+                ui.input_numeric("codePointsPage", "Page:", value=1, min=1, width='120px')
+                @render_plotly
+                def chartCodePoints():
+                    agg = charAggregates()
+                    if agg is None:
+                        return None
+
+                    def build(win):
+                        fig = px.bar(win.frame,
+                                    y='unicode', x='count',
+                                    orientation='h',
+                                    log_x=True,
+                                    text='count',
+                                    hover_data=['unicode', 'category'],
+                                    color='category',
+                                    labels={'unicode': 'Unicode',
+                                            'count': 'Frequency',
+                                            'category': 'Category'},
+                                    category_orders={'category': CATEGORIES},
+                                    color_discrete_sequence=px.colors.qualitative.Plotly)
+                        fig.update_traces(texttemplate='%{text:,.0f}',
+                                        textposition='inside',
+                                        textangle=0)
+                        fig.update_yaxes(categoryorder='array',
+                                         categoryarray=win.frame['unicode'].tolist()[::-1])
+                        fig.update_layout(height=chartHeight(len(win.frame)))
+                        return fig
+
+                    fig, stats = budgetedFigure(
+                        build,
+                        lambda rows: agg.window('code', input.codePointsPage(), rows,
+                                                color='category'),
+                        input.chartRows())
+                    chartStats['codePoints'].set(stats)
+                    return fig
+
+                @render.text
+                def codePointsCaption():
+                    stats = chartStats['codePoints']()
+                    return stats.describe() if stats is not None else ''
+
         # Blocks panel -------------------------------------------------------------
         with ui.nav_panel('Blocks'):
 
@@ -177,24 +858,18 @@ def modUtf(input, output, session):
                 ui.card_header('Block Counts')
                 @render_plotly
                 def chartBlockCounts():
-                    df = charDf()
-                    if df is None:
+                    agg = charAggregates()
+                    if agg is None:
                         return None
 
-                    blockCounts = df.groupby('block')['count'].sum().reset_index()
-                    # Filter block names preserving the order of appearance in BLOCKS
-                    BLOCK_NAMES = [b.name for b in BLOCKS]
-                    blocks = blockCounts['block'].unique().tolist()
-                    blocks = [bname for bname in BLOCK_NAMES if bname in blocks]
-
-                    fig = px.bar(blockCounts,
+                    fig = px.bar(agg.blocks,
                                 x='block', y='count',
                                 log_y=True,
                                 text='count',
                                 color='block',
                                 labels={'count': 'Frequency',
                                         'block': 'Block'},
-                                category_orders={'block': blocks},
+                                category_orders={'block': agg.blockNames},
                                 color_discrete_sequence=px.colors.qualitative.Alphabet)
                     fig.update_traces(texttemplate='%{text:,.0f}',
                                     textposition='inside',
@@ -206,31 +881,48 @@ def modUtf(input, output, session):
             # ----------------------------------------------------------------------
             with ui.card(fill=True, class_='border-light'):
                 ui.card_header('Unicode Character Frequency wrt Blocks')
+                ui.input_numeric("unicodeCountsPage", "Page:", value=1, min=1, width='120px')
                 @render_plotly
                 def chartUnicodeCounts():
-                    df = charDf()
-                    if df is None:
+                    agg = charAggregates()
+                    if agg is None:
                         return None
-                    fig = px.bar(df,
-                                y='unicode', x='count',
-                                orientation='h',
-                                log_x=True,
-                                text='count',
-                                hover_data=['unicode', 'block', 'category'],
-                                color='block',
-                                labels={'unicode': 'Unicode',
-                                        'count': 'Frequency',
-                                        'category': 'Category',
-                                        'block': 'Block'},
-                                category_orders={'block': [b.name for b in BLOCKS]},
-                                color_discrete_sequence=px.colors.qualitative.Alphabet)
-                    fig.update_traces(texttemplate='%{text:,.0f}',
-                                    textposition='inside',
-                                    textangle=0)
-                    fig.update_yaxes(categoryorder='category descending')
-                    fig.update_layout(height=len(df)*24)
+
+                    def build(win):
+                        fig = px.bar(win.frame,
+                                    y='unicode', x='count',
+                                    orientation='h',
+                                    log_x=True,
+                                    text='count',
+                                    hover_data=['unicode', 'block', 'category'],
+                                    color='block',
+                                    labels={'unicode': 'Unicode',
+                                            'count': 'Frequency',
+                                            'category': 'Category',
+                                            'block': 'Block'},
+                                    category_orders={'block': [b.name for b in BLOCKS]},
+                                    color_discrete_sequence=px.colors.qualitative.Alphabet)
+                        fig.update_traces(texttemplate='%{text:,.0f}',
+                                        textposition='inside',
+                                        textangle=0)
+                        fig.update_yaxes(categoryorder='array',
+                                         categoryarray=win.frame['unicode'].tolist()[::-1])
+                        fig.update_layout(height=chartHeight(len(win.frame)))
+                        return fig
+
+                    fig, stats = budgetedFigure(
+                        build,
+                        lambda rows: agg.window('code', input.unicodeCountsPage(), rows,
+                                                color='block'),
+                        input.chartRows())
+                    chartStats['unicodeCounts'].set(stats)
                     return fig
 
+                @render.text
+                def unicodeCountsCaption():
+                    stats = chartStats['unicodeCounts']()
+                    return stats.describe() if stats is not None else ''
+
         # Scripts Panel ------------------------------------------------------------
         with ui.nav_panel("Scripts"):
 
@@ -239,22 +931,18 @@ def modUtf(input, output, session):
                 ui.card_header("Script Counts")
                 @render_plotly
                 def chartScriptCounts():
-                    df = charDf()
-                    if df is None:
+                    agg = charAggregates()
+                    if agg is None:
                         return None
 
-                    scriptCounts = df.groupby('script')['count'].sum().reset_index()
-                    scripts = scriptCounts['script'].unique().tolist()
-                    scripts.sort()
-
-                    fig = px.bar(scriptCounts,
+                    fig = px.bar(agg.scripts,
                                 x='script', y='count',
                                 log_y=True,
                                 text='count',
                                 color='script',
                                 labels={'count': 'Frequency',
                                         'script': 'Script'},
-                                category_orders={'script': scripts},
+                                category_orders={'script': agg.scriptNames},
                                 color_discrete_sequence=px.colors.qualitative.Alphabet)
                     fig.update_traces(texttemplate='%{text:,.0f}',
                                     textposition='inside',
@@ -266,42 +954,219 @@ def modUtf(input, output, session):
             # ----------------------------------------------------------------------
             with ui.card(fill=True, class_='border-light'):
                 ui.card_header("Unicode Character Frequency wrt Script")
+                ui.input_numeric("scriptsPage", "Page:", value=1, min=1, width='120px')
                 @render_plotly
                 def chartScripts():
-                    df = charDf()
-                    if df is None:
+                    agg = charAggregates()
+                    if agg is None:
                         return None
 
-                    SCRIPTS: list[str] = (df['script']
-                                        .dropna()
-                                        .sort_values()
-                                        .unique()
-                                        .tolist())
+                    def build(win):
+                        fig = px.bar(win.frame,
+                                    y='unicode', x='count',
+                                    orientation='h',
+                                    title='Unicode Character Frequency',
+                                    log_x=True,
+                                    text='count',
+                                    hover_data=['unicode', 'script', 'block', 'category'],
+                                    color='script',
+                                    labels={
+                                        'unicode': 'Unicode',
+                                        'count': 'Frequency',
+                                        'category': 'Category',
+                                        'block': 'Block',
+                                        'script': 'Script'},
+                                    category_orders={'script': agg.scriptNames},
+                                    color_discrete_sequence=px.colors.qualitative.Alphabet)
+                        fig.update_traces(texttemplate='%{text:,.0f}',
+                                        textposition='inside',
+                                        textangle=0)
+                        fig.update_yaxes(categoryorder='array',
+                                         categoryarray=win.frame['unicode'].tolist()[::-1])
+                        fig.update_layout(height=chartHeight(len(win.frame)))
+                        return fig
+
+                    fig, stats = budgetedFigure(
+                        build,
+                        lambda rows: agg.window('code', input.scriptsPage(), rows,
+                                                color='script'),
+                        input.chartRows())
+                    chartStats['scripts'].set(stats)
+                    return fig
+
+                @render.text
+                def scriptsCaption():
+                    stats = chartStats['scripts']()
+                    return stats.describe() if stats is not None else ''
+
+        # Properties Panel ---------------------------------------------------------
+        with ui.nav_panel("Properties"):
+
+            # ----------------------------------------------------------------------
+            with ui.card(fill=True, class_='border-light'):
+                ui.input_select("propertyName", "Group by:",
+                                {n: p.label for n, p in PROPERTIES.items()},
+                                selected='bidi', width='300px')
+                @render_plotly
+                def chartPropertyCounts():
+                    agg = charAggregates()
+                    if agg is None:
+                        return None
 
+                    name = input.propertyName()
+                    df = agg.groupCounts(name)
+                    label = charProperty(name).label
                     fig = px.bar(df,
-                                y='unicode', x='count',
-                                orientation='h',
-                                title='Unicode Character Frequency',
-                                log_x=True,
+                                x=name, y='count',
+                                log_y=True,
                                 text='count',
-                                hover_data=['unicode', 'script', 'block', 'category'],
-                                color='script',
-                                labels={
-                                    'unicode': 'Unicode',
-                                    'count': 'Frequency',
-                                    'category': 'Category',
-                                    'block': 'Block',
-                                    'script': 'Script'},
-                                category_orders={'script': SCRIPTS},
+                                color=name,
+                                hover_data=['chars'],
+                                labels={'count': 'Frequency',
+                                        'chars': 'Characters',
+                                        name: label},
+                                category_orders={name: df[name].tolist()},
                                 color_discrete_sequence=px.colors.qualitative.Alphabet)
                     fig.update_traces(texttemplate='%{text:,.0f}',
                                     textposition='inside',
                                     textangle=0)
-                    fig.update_yaxes(categoryorder='category descending')
-                    fig.update_layout(height=len(df)*24)
+                    fig.update_layout(height=500)
+                    return fig
+
+            # ----------------------------------------------------------------------
+            with ui.card(fill=True, class_='border-light'):
+                @render.data_frame
+                def propertyPanel():
+                    agg = charAggregates()
+                    if agg is None:
+                        return None
+                    return render.DataGrid(agg.groupCounts(input.propertyName()),
+                                           width='100%')
+
+        # Script Runs Panel --------------------------------------------------------
+        with ui.nav_panel("Script Runs"):
+
+            # ----------------------------------------------------------------------
+            with ui.card(fill=True, class_='border-light'):
+                @render.express
+                def scriptRunsHeader():
+                    stats = scriptRunStats()
+                    if stats is None:
+                        if charCounts() is not None:
+                            ui.card_header('Script runs are only segmented by the exact '
+                                           'analyses, with the option set.')
+                        return
+                    ui.card_header(
+                        f'{humanize.intcomma(stats.runs)} runs of '
+                        f'{len(stats.scripts)} scripts, '
+                        f'{humanize.intcomma(int(stats.transitions.sum()))} script changes')
+                    mixed = (f'{humanize.intcomma(stats.mixed)} mixed-script tokens, '
+                             f'{humanize.intcomma(len(stats.tokens))} distinct ones kept')
+                    if stats.error:
+                        mixed += f', counts within {humanize.intcomma(stats.error)}'
+                    if stats.mixed:
+                        ui.p(mixed, class_='text-danger')
+                    else:
+                        ui.p(mixed)
+
+                @render_plotly
+                def chartRunLengths():
+                    stats = scriptRunStats()
+                    if stats is None or not stats.runs:
+                        return None
+                    df = stats.lengthFrame()
+                    fig = px.bar(df,
+                                x='lengths', y='runs',
+                                log_y=True,
+                                color='script',
+                                barmode='group',
+                                labels={'lengths': 'Run length (code points)',
+                                        'runs': 'Runs',
+                                        'script': 'Script'},
+                                category_orders={'lengths': df.sort_values('bin')['lengths']
+                                                                .unique().tolist()},
+                                color_discrete_sequence=px.colors.qualitative.Alphabet)
+                    fig.update_layout(height=400)
+                    return fig
+
+                @render.data_frame
+                def scriptRunsPanel():
+                    stats = scriptRunStats()
+                    if stats is None:
+                        return None
+                    return render.DataGrid(stats.runFrame(), filters=True)
 
+            # ----------------------------------------------------------------------
+            with ui.card(fill=True, class_='border-light'):
+                ui.card_header('Script Transitions')
+                @render_plotly
+                def chartTransitions():
+                    stats = scriptRunStats()
+                    if stats is None or not stats.transitions.any():
+                        return None
+                    df = pd.DataFrame(stats.transitions, index=stats.scripts,
+                                      columns=stats.scripts)
+                    fig = px.imshow(df,
+                                    text_auto=True,
+                                    color_continuous_scale='Blues',
+                                    labels={'x': 'To', 'y': 'From', 'color': 'Runs'})
+                    fig.update_layout(height=max(400, 40 * len(stats.scripts)))
                     return fig
 
+                @render.data_frame
+                def transitionsPanel():
+                    stats = scriptRunStats()
+                    if stats is None:
+                        return None
+                    return render.DataGrid(stats.transitionFrame(), filters=True)
+
+            # ----------------------------------------------------------------------
+            with ui.card(fill=True, class_='border-light'):
+                ui.card_header('Mixed-Script Tokens')
+                @render.data_frame
+                def mixedTokensPanel():
+                    stats = scriptRunStats()
+                    if stats is None:
+                        return None
+                    return render.DataGrid(stats.tokenFrame(), filters=True)
+
+        # Hidden & Confusable Panel ------------------------------------------------
+        with ui.nav_panel("Hidden & Confusable"):
+
+            # ----------------------------------------------------------------------
+            with ui.card(fill=True, class_='border-light'):
+                @render.express
+                def risksHeader():
+                    report = riskReport()
+                    if report is None:
+                        return
+                    ui.card_header(report.describe())
+
+                @render.data_frame
+                def riskTotalsPanel():
+                    report = riskReport()
+                    if report is None or not len(report.chars):
+                        return None
+                    return render.DataGrid(report.totals[report.totals['chars'] > 0],
+                                           width='100%')
+
+                @render.data_frame
+                def risksPanel():
+                    report = riskReport()
+                    if report is None:
+                        return None
+                    return render.DataGrid(report.chars, filters=True)
+
+            # ----------------------------------------------------------------------
+            with ui.card(fill=True, class_='border-light'):
+                ui.card_header('Look-alike Collisions')
+                @render.data_frame
+                def collisionsPanel():
+                    report = riskReport()
+                    if report is None:
+                        return None
+                    return render.DataGrid(report.collisions, filters=True)
+
         # Normalized CDF -----------------------------------------------------------
         with ui.nav_panel("Normalized CFD"):
 
@@ -310,53 +1175,272 @@ def modUtf(input, output, session):
                 ui.card_header('Normalized Cumulative Frequency Distribution')
                 @render_plotly
                 def chartEcdf():
-                    df = charDf()
-                    if df is None:
+                    agg = charAggregates()
+                    if agg is None:
                         return None
 
-                    df = df.sort_values(by='count', ascending=True)
-                    # Calculate cumulative counts
-                    df['CumCount'] = df['count'].cumsum()
-                    total = df['count'].sum()
-                    df['nCumFreq'] = df['CumCount'] / total
-
-                    # Plot using Plotly Express with step-line
-                    fig = px.line(df,
-                                y='unicode', x='nCumFreq',
-                                labels={'Element': 'Element',
-                                        'CumCount': 'Cumulative Count',
-                                        'nCumFreq': 'Normalized Cumulative Frequency'},
-                                line_shape='vh')
+                    t0 = time.perf_counter()
+                    # Least to most frequent, at most CURVE_POINTS of them
+                    at = curvePoints(agg.nChars)
+                    webgl = len(at) > WEBGL_POINTS
+                    fig = px.line(x=agg.ecdf[at], y=at,
+                                hover_name=agg.ecdfLabels(at),
+                                labels={'x': 'Normalized Cumulative Frequency',
+                                        'y': 'Characters (Least to Most Frequent)'},
+                                line_shape='vh',
+                                render_mode='webgl' if webgl else 'svg')
                     fig.update_xaxes(range=[0, 1.1])
-                    fig.update_layout(height=len(df)*24)
+                    fig.update_layout(height=600)
 
                     for percentile in [round(i * 0.1, 1) for i in range(0, 11, 2)]:
-                        fig.add_hline(y=percentile*len(df)-1,
+                        fig.add_hline(y=percentile*agg.nChars-1,
                                     line=dict(color='green', dash='dot', width=2),
                                     annotation_text=f'{percentile*100}%')
                         fig.add_vline(x=percentile,
                                     line=dict(color='red', dash='dash', width=1),
                                     annotation_text=f'{percentile*100}%')
 
+                    chartStats['ecdf'].set(ChartStats(window=None,
+                                                      payload=len(fig.to_json()),
+                                                      seconds=time.perf_counter() - t0,
+                                                      webgl=webgl))
                     return fig
 
+                @render.text
+                def ecdfCaption():
+                    stats = chartStats['ecdf']()
+                    agg = charAggregates()
+                    if stats is None or agg is None:
+                        return ''
+                    return f'{min(agg.nChars, CURVE_POINTS):,} of {agg.nChars:,} points; '\
+                           + stats.describe()
+
         # Table Panel --------------------------------------------------------------
         with ui.nav_panel("Table"):
 
             # ----------------------------------------------------------------------
             with ui.card(fill=True, class_='border-light'):
+                with ui.layout_columns(col_widths=(4, 2, 2, 2, 2)):
+                    ui.input_text("tableFilter", "Filter:", update_on='blur',
+                                  placeholder='Character, name, category, block or script')
+                    ui.input_select("tableSort", "Sort by:",
+                                    {'code': 'Code point', 'count': 'Count',
+                                     'unicode': 'Name', 'category': 'Category',
+                                     'block': 'Block', 'script': 'Script'})
+                    ui.input_select("tableOrder", "Order:",
+                                    {'ascending': 'Ascending', 'descending': 'Descending'})
+                    ui.input_select("tableRows", "Rows:",
+                                    {str(n): str(n) for n in TABLE_PAGE_SIZES},
+                                    selected=str(TABLE_ROWS))
+                    ui.input_numeric("tablePage", "Page:", value=1, min=1)
+
+                @render.text
+                def tableCaption():
+                    page = tablePage()
+                    return page.describe() if page is not None else ''
+
                 @render.table(classes='table table-hover')
                 def tablePanel():
-                    return charDf()
+                    page = tablePage()
+                    return page.frame if page is not None else None
 
         # Dataframe Panel ----------------------------------------------------------
         with ui.nav_panel("Data frame"):
 
             # ----------------------------------------------------------------------
             with ui.card(fill=True, class_='border-light'):
+                ui.input_selectize("frameProperties", "More property columns:",
+                                   {n: p.label for n, p in PROPERTIES.items()
+                                    if n not in ('category', 'block', 'script')},
+                                   multiple=True, width='100%')
                 @render.data_frame
                 def dataframePanel():
-                    df = charDf()
+                    agg = charAggregates()
+                    if agg is None:
+                        return None
+                    return render.DataTable(agg.withProperties(input.frameProperties()),
+                                            selection_mode="rows")
+
+            # ----------------------------------------------------------------------
+            with ui.card(fill=True, class_='border-light'):
+                @reactive.calc
+                def selectedOccurrences():
+                    result = charCounts()
+                    if result is None or result.positions is None:
+                        return None
+                    selected = dataframePanel.data_view(selected=True)
+                    if selected is None or len(selected) == 0:
+                        return None
+                    row = selected.iloc[0]
+                    job = analysis()
+                    path = getattr(job, 'path', None)
+                    df = occurrenceFrame(result.positions, int(row['code']), path,
+                                         compression=getattr(job, 'compression', None))
+                    return row, df
+
+                @render.express
+                def occurrencesHeader():
+                    result = charCounts()
+                    if result is None or result.positions is None:
+                        ui.card_header('Character positions are not indexed.')
+                        return
+                    selection = selectedOccurrences()
+                    if selection is None:
+                        ui.card_header('Select a row to show where the character occurs.')
+                        return
+                    row, df = selection
+                    shown = 'all of them' if len(df) >= row['count'] else \
+                        f'the first {len(df)} of {humanize.intcomma(row["count"])}'
+                    if len(df) < row['count'] and len(df) < POSITIONS_PER_CODE:
+                        shown += ' (the index is full)'
+                    ui.card_header(f'{row["unicode"]}: {humanize.intcomma(row["count"])} '
+                                   f'occurrence(s), showing {shown}')
+
+                @render.data_frame
+                def occurrencesPanel():
+                    selection = selectedOccurrences()
+                    if selection is None:
+                        return None
+                    return render.DataGrid(selection[1], width='100%')
+
+        # Encoding Errors Panel ----------------------------------------------------
+        with ui.nav_panel("Encoding errors"):
+
+            # ----------------------------------------------------------------------
+            with ui.card(fill=True, class_='border-light'):
+                @render.express
+                def malformedHeader():
+                    result = charCounts()
+                    if result is None or result.malformed is None:
+                        ui.card_header('Malformed sequences are not indexed.')
+                        return
+                    malformed = result.malformed
+                    if malformed.count == 0:
+                        ui.card_header('No malformed UTF-8 sequences.')
+                        return
+                    shown = len(malformed.entries)
+                    ui.card_header(
+                        f'{humanize.intcomma(malformed.count)} malformed sequences '
+                        f'({humanize.naturalsize(malformed.nBytes, binary=True)}) '
+                        f'replaced by U+FFFD'
+                        + (f', the first {humanize.intcomma(shown)} listed'
+                           if shown < malformed.count else ''))
+
+                @render.data_frame
+                def malformedPanel():
+                    result = charCounts()
+                    if result is None or result.malformed is None or not result.malformed.count:
+                        return None
+                    return render.DataGrid(result.malformed.frame(), filters=True)
+
+        # Compare Panel ------------------------------------------------------------
+        with ui.nav_panel("Compare"):
+
+            @reactive.effect
+            def compareChoices():
+                labels = list(history())
+                cached = {f'{CACHED_CHOICE}{key}':
+                          f'{key[:12]}, {humanize.naturalsize(size, binary=True)}, '
+                          f'{humanize.naturaltime(time.time() - mtime)}'
+                          for key, mtime, size in resultCache().keys(COMPARE_CACHED)}
+                choices = {'This session': {label: label for label in labels},
+                           'Cached results': cached}
+                ui.update_select('compareA', choices=choices,
+                                 selected=labels[-2] if len(labels) > 1 else None)
+                ui.update_select('compareB', choices=choices,
+                                 selected=labels[-1] if labels else None)
+
+            def choiceCounts(choice: str | None):
+                """Counts of a result of the session or of the cache."""
+                if choice and choice.startswith(CACHED_CHOICE):
+                    sparse = resultCache().sparseCounts(choice[len(CACHED_CHOICE):])
+                else:
+                    sparse = history().get(choice)
+                return denseCounts(*sparse) if sparse is not None else None
+
+            @reactive.calc
+            def comparison():
+                a, b = choiceCounts(input.compareA()), choiceCounts(input.compareB())
+                if a is None or b is None:
+                    return None
+                return compareCounts(a, b)
+
+            @reactive.calc
+            def comparisonFrame():
+                result = comparison()
+                if result is None:
+                    return None
+                df = {'char': result.chars, 'block': result.blocks,
+                      'script': result.scripts}[input.compareLevel()]
+                return df.sort_values('delta', key=abs, ascending=False, kind='stable')
+
+            # ----------------------------------------------------------------------
+            with ui.card(fill=True, class_='border-light'):
+                ui.card_header('Analyses of this session or cached results, upload '
+                               'another text to compare it with the previous one')
+                with ui.layout_columns(col_widths=(4, 4, 4)):
+                    ui.input_select('compareA', 'A:', choices=[])
+                    ui.input_select('compareB', 'B:', choices=[])
+                    ui.input_radio_buttons('compareLevel', 'By:',
+                                           {'char': 'Character', 'block': 'Block',
+                                            'script': 'Script'}, inline=True)
+
+                @render.express
+                def compareSummary():
+                    result = comparison()
+                    if result is None:
+                        'Two completed analyses are needed.'
+                        return
+                    d = result.divergence
+                    ui.markdown(
+                        f'A has {humanize.intcomma(result.totalA)} characters, '
+                        f'B {humanize.intcomma(result.totalB)}; '
+                        f'{humanize.intcomma(result.onlyA)} distinct characters only in A, '
+                        f'{humanize.intcomma(result.onlyB)} only in B.\n\n'
+                        f'Jensen-Shannon divergence **{d.js:.4f}** bits, '
+                        f'KL(A‖B) {d.klAB:.4f} and KL(B‖A) {d.klBA:.4f} bits, '
+                        f'chi-square {d.chi2:,.1f} with {d.dof:,} degrees of freedom '
+                        f'(p ≈ {d.pValue:.3g}, Cramér\'s V {d.cramersV:.4f}).')
+
+            # ----------------------------------------------------------------------
+            with ui.card(fill=True, class_='border-light'):
+                ui.card_header(f'Largest differences of the shares (B - A), top {TOP_DELTAS}')
+                @render_plotly
+                def chartCompare():
+                    df = comparisonFrame()
                     if df is None:
                         return None
-                    return render.DataTable(df, selection_mode="rows")
+                    level = input.compareLevel()
+                    label = 'unicode' if level == 'char' else level
+                    df = df.head(TOP_DELTAS).iloc[::-1]
+                    fig = px.bar(df, x='delta', y=label, orientation='h',
+                                 color=df['delta'].gt(0).map({True: 'More in B',
+                                                              False: 'More in A'}),
+                                 hover_data=['countA', 'countB', 'shareA', 'shareB'],
+                                 labels={'delta': 'Share difference', label: '',
+                                         'color': ''})
+                    fig.update_layout(height=chartHeight(len(df)))
+                    fig.update_xaxes(tickformat='.2%')
+                    return fig
+
+            # ----------------------------------------------------------------------
+            with ui.card(fill=True, class_='border-light'):
+                @render.data_frame
+                def comparePanel():
+                    df = comparisonFrame()
+                    if df is None:
+                        return None
+                    return render.DataGrid(df, filters=True)
+
+        # Files Panel --------------------------------------------------------------
+        with ui.nav_panel("Files"):
+
+            # ----------------------------------------------------------------------
+            with ui.card(fill=True, class_='border-light'):
+                ui.card_header('Per File Breakdown')
+                @render.data_frame
+                def filesPanel():
+                    snapshot = progress()
+                    if snapshot is None or snapshot.files is None:
+                        return None
+                    return render.DataGrid(snapshot.files, filters=True)
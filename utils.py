@@ -8,6 +8,8 @@
 # ******************************************************************************
 from dataclasses import dataclass
 
+from fontTools import ttLib
+
 # CATEGORIES *******************************************************************
 CATEGORIES = ('Cc|Cf|Cs|Co|Cn|'
               'Ll|Lu|Lt|Lm|Lo|'
@@ -427,6 +429,28 @@ class BBox:
     def __str__(self):
         return f'{self.x1:.2f} {self.y1:.2f} {self.x2:.2f} {self.y2:.2f}'
 
+
+def fontBBox(fontFile: str, margin: float = 100) -> BBox:
+    """The bounding box of all the glyphs of a font, with a margin.
+
+    Every glyph is decompiled, the compute backend runs it in a worker
+    process.
+    """
+    bbMax = BBox()
+    with ttLib.TTFont(fontFile) as tt:
+        glyfTable = tt['glyf']
+        for glyphName in tt.getGlyphOrder():
+            metrics = glyfTable[glyphName]
+
+            xMin = getattr(metrics, 'xMin', 0)
+            yMin = getattr(metrics, 'yMin', 0)
+            xMax = getattr(metrics, 'xMax', 0)
+            yMax = getattr(metrics, 'yMax', 0)
+
+            bbMax.update(x1=xMin, y1=yMin, x2=xMax, y2=yMax)
+
+    return bbMax.addMargin(margin)
+
 # ******************************************************************************
 @dataclass
 class GlyphInfo: